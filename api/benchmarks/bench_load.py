@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Load test: request latency under concurrent clients while snapshots are being loaded
+
+Starts the API with uvicorn (one worker) and runs N client threads against it for a fixed time.
+Each client loops over a mix of cheap requests (dataset listings) and data queries at random
+offsets across every snapshot, so the response cache rarely hits. The server keeps at most
+--cache-snapshots snapshots, so cold loads keep happening while the cheap requests are served.
+Reports the p50, p99 and max latency of each kind of request, and the throughput. Requests
+made in the first --warmup seconds aren't counted.
+
+Point --app-dir at another checkout of the api directory (e.g. a git worktree of an older
+commit) to compare before and after, or --url at a server that is already running.
+
+Run from the api directory: python benchmarks/bench_load.py [--clients 32] [--duration 20]
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import orjson
+
+API_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(os.getenv("DATA_DIR", API_DIR.parent / "data"))
+
+# (kind, weight)
+MIX = (("listing", 5), ("companies", 4), ("founders", 1))
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app_dir, port, cache_snapshots, backend):
+    env = {
+        **os.environ,
+        "DATA_DIR": str(DATA_DIR),
+        "CACHE_MAX_SNAPSHOTS": str(cache_snapshots),
+        "SNAPSHOT_BACKEND": backend,
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, env=env, stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url + "/", timeout=1).read()
+            return server, url
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise SystemExit("Server didn't start")
+
+
+def fetch(url):
+    try:
+        with urllib.request.urlopen(url, timeout=60) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def request_for(kind, dates, rng):
+    date = rng.choice(dates)
+    if kind == "listing":
+        return "/v1/datasets/datasets" if rng.random() < 0.5 else f"/v1/datasets/datasets/{date}"
+    return f"/v1/{kind}?date={date}&limit=20&offset={rng.randrange(2000)}"
+
+
+def client(url, dates, measure_from, deadline, seed, results, lock):
+    rng = random.Random(seed)
+    kinds = [kind for kind, weight in MIX for _ in range(weight)]
+    samples = {kind: [] for kind, _ in MIX}
+    errors = 0
+    while time.perf_counter() < deadline:
+        kind = rng.choice(kinds)
+        started = time.perf_counter()
+        status, _ = fetch(url + request_for(kind, dates, rng))
+        if started >= measure_from:
+            samples[kind].append(time.perf_counter() - started)
+            errors += status >= 500
+    with lock:
+        for kind, values in samples.items():
+            results.setdefault(kind, []).extend(values)
+        results.setdefault("errors", []).append(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API under concurrent clients")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent client threads")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds to run")
+    parser.add_argument("--warmup", type=float, default=0, help="Seconds to run before measuring")
+    parser.add_argument("--cache-snapshots", type=int, default=2, help="CACHE_MAX_SNAPSHOTS for the server")
+    parser.add_argument("--backend", default="memory", help="SNAPSHOT_BACKEND for the server")
+    parser.add_argument("--app-dir", default=str(API_DIR), help="api directory to serve (default: this one)")
+    parser.add_argument("--url", help="Test a running server instead of starting one")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = start_server(args.app_dir, free_port(), args.cache_snapshots, args.backend)
+    try:
+        dates = orjson.loads(fetch(url + "/v1/datasets/datasets")[1])
+        print(f"{args.clients} clients for {args.duration:.0f}s against {url} ({len(dates)} snapshots)")
+        results, lock = {}, threading.Lock()
+        measure_from = time.perf_counter() + args.warmup
+        deadline = measure_from + args.duration
+        threads = [
+            threading.Thread(target=client, args=(url, dates, measure_from, deadline, seed, results, lock))
+            for seed in range(args.clients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    total = sum(len(results.get(kind, [])) for kind, _ in MIX)
+    print(f"\n{'request':<12}{'count':>8}{'p50':>10}{'p99':>10}{'max':>10}")
+    for kind, _ in MIX:
+        samples = results.get(kind)
+        if samples:
+            print(f"{kind:<12}{len(samples):>8}{percentile(samples, 0.5) * 1000:>8.1f}ms"
+                  f"{percentile(samples, 0.99) * 1000:>8.1f}ms{max(samples) * 1000:>8.1f}ms")
+    print(f"\n{total / args.duration:.0f} requests/s, {sum(results.get('errors', []))} server errors")
+
+
+if __name__ == "__main__":
+    main()
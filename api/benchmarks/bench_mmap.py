@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-worker memory and cold start for the snapshot backends
+
+Each mode starts N fresh worker processes that load every snapshot, answer a filtered and
+paginated query against each one, and report their resident memory:
+
+- read_csv: pd.read_csv of every snapshot file, as the API originally did per request
+- memory:   DatasetRegistry(backend="memory"), typed frames and indexes in each worker's heap
+- mmap:     DatasetRegistry(backend="mmap"), Arrow IPC files mapped by every worker
+
+RssAnon is memory private to the worker; RssFile is file-backed pages, which workers mapping the
+same files share. Compiled Arrow files are written to a temporary directory, so the first mmap
+worker pays for compiling them and the rest only map them.
+
+Linux only (reads /proc/self/status). Run from the api directory:
+python benchmarks/bench_mmap.py [--workers 4]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DATA_DIR = Path(os.getenv("DATA_DIR", Path(__file__).resolve().parent.parent.parent / "data"))
+MODES = ("read_csv", "memory", "mmap")
+
+
+def rss_kb():
+    """VmRSS, RssAnon and RssFile of this process in kB"""
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0])
+    return fields
+
+
+def worker(mode, arrow_dir, results):
+    from src.registry import COMPANIES_FILE, FOUNDERS_FILE, DatasetRegistry
+
+    baseline = rss_kb()
+    started = time.perf_counter()
+    registry = DatasetRegistry(DATA_DIR, max_snapshots=64, max_bytes=1 << 40,
+                               backend="mmap" if mode == "mmap" else "memory", arrow_dir=arrow_dir)
+    dates = [d for d in registry.dataset_dates() if (DATA_DIR / d / COMPANIES_FILE).exists()]
+    rows = 0
+    for date in dates:
+        if mode == "read_csv":
+            companies = pd.read_csv(DATA_DIR / date / COMPANIES_FILE)
+            founders = pd.read_csv(DATA_DIR / date / FOUNDERS_FILE)
+            page = companies[companies["Status"] == "Active"].iloc[100:150]
+            page_founders = founders[founders["Industry"].str.contains("saas", case=False, na=False)].iloc[:50]
+            rows += len(page) + len(page_founders)
+        else:
+            snapshot = registry.get(date)
+            page = snapshot.companies.iloc[snapshot.company_index.select(status="Active")[100:150]]
+            page_founders = snapshot.founders.iloc[snapshot.founder_index.select(industry="saas")[:50]]
+            rows += len(page) + len(page_founders)
+    elapsed = time.perf_counter() - started
+    after = rss_kb()
+    results.put({
+        "seconds": elapsed,
+        "snapshots": len(dates),
+        "rows": rows,
+        **{key: after[key] - baseline.get(key, 0) for key in after},
+    })
+
+
+def run(mode, workers, arrow_dir):
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    reports = []
+    for _ in range(workers):
+        # One at a time: the first mmap worker compiles, the others find the files ready
+        process = ctx.Process(target=worker, args=(mode, arrow_dir, results))
+        process.start()
+        reports.append(results.get())
+        process.join()
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark snapshot backends")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes per mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as arrow_dir:
+        print(f"{'mode':<10}{'worker':>7}{'cold start':>12}{'VmRSS':>11}{'RssAnon':>11}{'RssFile':>11}")
+        for mode in MODES:
+            for i, report in enumerate(run(mode, args.workers, arrow_dir)):
+                print(f"{mode:<10}{i:>7}{report['seconds'] * 1000:>10.0f}ms"
+                      f"{report['VmRSS'] / 1024:>9.1f}MB{report['RssAnon'] / 1024:>9.1f}MB"
+                      f"{report['RssFile'] / 1024:>9.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark /v1/companies and /v1/founders queries per snapshot backend
+
+Runs the same filtered and paginated queries against one snapshot through each backend's
+Snapshot.query_companies / query_founders (filters, counts, founder grouping and pagination,
+without HTTP) and reports the median and p99 latency. The sqlite file is built in a temporary
+directory first, and its ingest time is reported separately.
+
+Run from the api directory: python benchmarks/bench_queries.py [--date YYYY-MM-DD] [--repeat 50]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.registry import COMPANIES_FILE, DatasetRegistry
+
+DATA_DIR = Path(os.getenv("DATA_DIR", Path(__file__).resolve().parent.parent.parent / "data"))
+BACKENDS = ("memory", "mmap", "sqlite")
+
+QUERIES = [
+    ("companies, first page", "companies", dict(limit=20)),
+    ("companies, deep page", "companies", dict(limit=20, offset=4000)),
+    ("companies, batch", "companies", dict(limit=20, batch="W21")),
+    ("companies, status+industry", "companies", dict(limit=20, status="Active", industry="saas")),
+    ("founders, first page", "founders", dict(limit=20)),
+    ("founders, deep page", "founders", dict(limit=20, offset=9000)),
+    ("founders, all", "founders", dict()),
+    ("founders, name", "founders", dict(limit=20, first_name="mich")),
+    ("founders, batch+city", "founders", dict(limit=20, batch="S21", city="san")),
+]
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark snapshot query backends")
+    parser.add_argument("--date", help="Snapshot date (default: the newest with a companies file)")
+    parser.add_argument("--repeat", type=int, default=50, help="Runs of each query per backend")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        registries = {
+            backend: DatasetRegistry(DATA_DIR, backend=backend, arrow_dir=Path(cache_dir) / "arrow",
+                                     sqlite_dir=Path(cache_dir) / "sqlite")
+            for backend in BACKENDS
+        }
+        date = args.date or next(d for d in registries["memory"].dataset_dates() if (DATA_DIR / d / COMPANIES_FILE).exists())
+        print(f"Snapshot {date}")
+        snapshots = {}
+        for backend, registry in registries.items():
+            started = time.perf_counter()
+            snapshots[backend] = registry.get(date)
+            print(f"  {backend:<8} load {(time.perf_counter() - started) * 1000:8.1f}ms")
+
+        print(f"\n{'query':<30}" + "".join(f"{backend + ' p50':>14}{'p99':>9}" for backend in BACKENDS))
+        for label, table, params in QUERIES:
+            line = f"{label:<30}"
+            for backend in BACKENDS:
+                query = getattr(snapshots[backend], f"query_{table}")
+                query(**params)
+                samples = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    query(**params)
+                    samples.append(time.perf_counter() - started)
+                line += f"{percentile(samples, 0.5) * 1000:>12.2f}ms{percentile(samples, 0.99) * 1000:>7.2f}ms"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
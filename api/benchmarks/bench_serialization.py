@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark response serialization for the full companies and founders datasets
+
+Compares the previous row-by-row path (iterrows + handle_nan + json.dumps(indent=4)) with the
+column-wise path in src/serialization.py (to_records/group_founders + orjson).
+
+Run from the api directory: python benchmarks/bench_serialization.py [--date YYYY-MM-DD]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import orjson
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.registry import read_typed_csv
+from src.serialization import COMPANY_FIELDS, to_records, group_founders
+
+DATA_DIR = Path(os.getenv("DATA_DIR", Path(__file__).resolve().parent.parent.parent / "data"))
+
+
+def handle_nan(value):
+    if pd.isna(value) or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return value
+
+
+def encode_before(data):
+    return json.dumps(data, ensure_ascii=False, allow_nan=True, indent=4, separators=(", ", ": ")).encode("utf-8")
+
+
+def encode_after(data):
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def companies_before(df):
+    data = []
+    for _, row in df.iterrows():
+        data.append({
+            "name": row.get("Name", ""),
+            "batch": row.get("Batch", ""),
+            "status": row.get("Status", ""),
+            "industry": handle_nan(row.get("Industry")),
+            "team_size": handle_nan(row.get("Team Size")),
+            "city": handle_nan(row.get("Location")),
+        })
+    return encode_before({"data": data})
+
+
+def companies_after(df):
+    return encode_after({"data": to_records(df, COMPANY_FIELDS)})
+
+
+def founders_before(df):
+    founders = {}
+    for _, row in df.iterrows():
+        row_dict = {k: handle_nan(v) for k, v in row.to_dict().items()}
+        first, last = row_dict.get("Founder's First Name"), row_dict.get("Founder's Last Name")
+        key = f"{first}_{last}"
+        if key not in founders:
+            founders[key] = {
+                "first_name": row_dict.get("Founder's First Name"),
+                "last_name": row_dict.get("Founder's Last Name"),
+                "company_count": 1,
+                "founder_linkedin_url": row_dict.get("Founder's LinkedIn"),
+                "founder_twitter_url": row_dict.get("Founder's Twitter"),
+                "companies": [],
+            }
+        else:
+            founders[key]["company_count"] += 1
+        founders[key]["companies"].append({
+            "name": row_dict.get("Name", ""),
+            "batch": row_dict.get("Batch", ""),
+            "status": row_dict.get("Status", ""),
+            "industry": row_dict.get("Industry"),
+            "team_size": row_dict.get("Team Size"),
+            "city": row_dict.get("Location"),
+        })
+    return encode_before({"data": list(founders.values())})
+
+
+def founders_after(df):
+    return encode_after({"data": group_founders(df)})
+
+
+def measure(fn, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(df)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API response serialization")
+    parser.add_argument("--date", type=str, help="Dataset date (default: latest)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    date = args.date or sorted(p.name for p in DATA_DIR.iterdir() if p.is_dir() and p.name[0].isdigit())[-1]
+    companies = read_typed_csv(DATA_DIR / date / "YC_Companies.csv")
+    founders = read_typed_csv(DATA_DIR / date / "YC_Founders.csv")
+
+    print(f"Dataset {date}: {len(companies)} companies, {len(founders)} founder rows")
+    print(f"{'endpoint':<12}{'before (ms)':>14}{'after (ms)':>14}{'rows/s before':>16}{'rows/s after':>16}{'speedup':>10}")
+    for name, df, before, after in [
+        ("companies", companies, companies_before, companies_after),
+        ("founders", founders, founders_before, founders_after),
+    ]:
+        t_before = measure(before, df, args.repeat)
+        t_after = measure(after, df, args.repeat)
+        print(f"{name:<12}{t_before * 1000:>14.1f}{t_after * 1000:>14.1f}"
+              f"{len(df) / t_before:>16,.0f}{len(df) / t_after:>16,.0f}{t_before / t_after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
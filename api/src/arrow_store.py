@@ -0,0 +1,128 @@
+from pathlib import Path
+from typing import List, Optional
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+
+from .concurrency import file_lock
+
+# Schema metadata key recording which source file (name, mtime in ns, size) a compiled file was built from
+SOURCE_KEY = b"yc_vault.source"
+ARROW_SUFFIX = ".arrow"
+
+
+def _source_tag(source: Path) -> bytes:
+    stat = source.stat()
+    return f"{source.name}:{stat.st_mtime_ns}:{stat.st_size}".encode()
+
+
+def _plain_table(df: pd.DataFrame) -> pa.Table:
+    """Arrow table without pandas metadata and with categoricals stored as plain strings"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    fields = [
+        pa.field(f.name, f.type.value_type) if pa.types.is_dictionary(f.type) else f
+        for f in table.schema
+    ]
+    return table.cast(pa.schema(fields)).replace_schema_metadata(None)
+
+
+def is_compiled(target: Path, source: Path) -> bool:
+    """Whether `target` was compiled from the current version of `source`"""
+    try:
+        schema = ipc.open_file(pa.memory_map(str(target))).schema
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return False
+    return (schema.metadata or {}).get(SOURCE_KEY) == _source_tag(source)
+
+
+def compile_table(df: pd.DataFrame, source: Path, target: Path) -> Path:
+    """
+    Write a typed snapshot table as an uncompressed Arrow IPC file that can be memory-mapped.
+
+    Several workers may ask for the same file at once: an exclusive lock next to the target makes
+    one of them compile it while the others wait and then reuse it.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with file_lock(f"{target}.lock"):
+        if is_compiled(target, source):
+            return target
+        table = _plain_table(df)
+        table = table.replace_schema_metadata({SOURCE_KEY: _source_tag(source)})
+        tmp_path = f"{target}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, target)
+    return target
+
+
+def map_table(path: Path) -> pa.Table:
+    """Memory-map a compiled table; its buffers point into the mapping rather than the heap"""
+    return ipc.open_file(pa.memory_map(str(path))).read_all()
+
+
+def mapped_frame(table: pa.Table) -> pd.DataFrame:
+    """
+    A DataFrame over a mapped table without copying it. Columns are Arrow-backed, so the pages are
+    shared by every process that maps the same file and only rows that are taken get copied.
+    """
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _first_column(table: pa.Table, names: List[str]) -> Optional[str]:
+    return next((name for name in names if name in table.column_names), None)
+
+
+class MappedSnapshotIndex:
+    """
+    Same filters as SnapshotIndex, evaluated with Arrow compute kernels over the mapped columns
+    instead of posting lists held in each worker's heap.
+    """
+
+    EXACT = {"batch", "status", "team_size"}
+
+    def __init__(self, table: pa.Table):
+        self.size = table.num_rows
+        names = {
+            "batch": ["Batch"],
+            "status": ["Status"],
+            "industry": ["Industry"],
+            "city": ["City", "Location"],
+            "team_size": ["Team Size", "Team_Size", "team_size"],
+            "first_name": ["Founder's First Name"],
+            "last_name": ["Founder's Last Name"],
+        }
+        self.columns = {}
+        for name, candidates in names.items():
+            column = _first_column(table, candidates)
+            if column:
+                self.columns[name] = table.column(column)
+
+    def _mask(self, name: str, value) -> pa.ChunkedArray:
+        column = self.columns[name]
+        if not pa.types.is_string(column.type) and not pa.types.is_large_string(column.type):
+            column = pc.cast(column, pa.string())
+        if name in self.EXACT:
+            return pc.equal(pc.utf8_lower(column), str(value).lower())
+        return pc.match_substring(column, str(value), ignore_case=True)
+
+    def select(self, **filters) -> Optional[np.ndarray]:
+        """
+        Row ids (sorted) matching every given filter, or None when no filter applies.
+        Filters on columns this table doesn't have are ignored.
+        """
+        masks = [
+            self._mask(name, value)
+            for name, value in filters.items()
+            if value is not None and value != "" and name in self.columns
+        ]
+        if not masks:
+            return None
+        mask = masks[0]
+        for other in masks[1:]:
+            mask = pc.and_(mask, other)
+        mask = pc.fill_null(mask, False)
+        return np.flatnonzero(mask.to_numpy()).astype(np.int32)
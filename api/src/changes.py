@@ -0,0 +1,154 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+
+import pandas as pd
+
+# Written by the scraper's track_changes.py: one file per pair of consecutive snapshots
+CHANGES_DIR = "changes"
+CHANGE_FIELDS = ("company", "status", "team_size", "founder")
+# Composed ranges kept per version of the log, least recently used dropped first
+CHANGE_RANGES = 32
+
+
+def _signature(changes_dir: Path) -> Tuple[Tuple[str, int, int], ...]:
+    if not changes_dir.is_dir():
+        return ()
+    return tuple(sorted(
+        (path.name, path.stat().st_mtime_ns, path.stat().st_size)
+        for path in changes_dir.glob("*.parquet")
+    ))
+
+
+def compose(log: pd.DataFrame) -> pd.DataFrame:
+    """
+    Net changes across several consecutive intervals.
+
+    Added/removed entries (companies, founders) cancel out when they alternate, so only a run that
+    starts and ends on the same change is kept. Changed values keep the first old value and the
+    last new value, and are dropped when the two are the same again.
+    """
+    if log.empty:
+        return log
+    # A company has one entry per field, except founders: one per founder name
+    log = log.assign(Key=log["Old"].fillna(log["New"]).where(log["Field"] == "founder", ""))
+    ordered = log.sort_values("From", kind="stable")
+    keys = ["Company", "Field", "Key"]
+    first = ordered.drop_duplicates(keys, keep="first").set_index(keys)
+    last = ordered.drop_duplicates(keys, keep="last").set_index(keys)
+    net = last.assign(From=first["From"], Old=first["Old"], FirstChange=first["Change"]).reset_index()
+    toggles = net["Change"] != "changed"
+    keep = ~toggles & (net["Old"].fillna("") != net["New"].fillna(""))
+    keep |= toggles & (net["FirstChange"] == net["Change"])
+    return net[keep].drop(columns=["Key", "FirstChange"])
+
+
+class ChangeLog:
+    """
+    The precomputed change log, reloaded when its files change. A range of one interval is that
+    interval's stored diff; longer ranges are composed once per version of the log and kept, so
+    later requests and pages of the same range don't compose it again.
+    """
+
+    def __init__(self, data_dir: Path):
+        self.changes_dir = Path(data_dir) / CHANGES_DIR
+        self._lock = threading.Lock()
+        self._signature = None
+        self._log = pd.DataFrame()
+        self._dates: List[str] = []
+        # (from, to) -> that interval's diff, as written by track_changes.py
+        self._intervals: Dict[Tuple[str, str], pd.DataFrame] = {}
+        # (from, to) -> net changes over the range
+        self._ranges: "OrderedDict[Tuple[str, str], pd.DataFrame]" = OrderedDict()
+
+    def _current(self) -> Tuple[Tuple[Tuple[str, int, int], ...], pd.DataFrame]:
+        signature = _signature(self.changes_dir)
+        with self._lock:
+            if signature != self._signature:
+                frames = {name: pd.read_parquet(self.changes_dir / name) for name, _, _ in signature}
+                self._log = pd.concat(frames.values(), ignore_index=True) if frames else pd.DataFrame()
+                self._dates = sorted(set(self._log["From"]) | set(self._log["To"])) if not self._log.empty else []
+                self._intervals = {
+                    tuple(name[:-len(".parquet")].split("_", 1)): frame.reset_index(drop=True)
+                    for name, frame in frames.items()
+                }
+                self._ranges = OrderedDict()
+                self._signature = signature
+            return self._signature, self._log
+
+    def log(self) -> pd.DataFrame:
+        return self._current()[1]
+
+    def dates(self) -> List[str]:
+        """Snapshot dates the log covers, oldest first"""
+        self._current()
+        return self._dates
+
+    def net(self, from_date: str, to_date: str) -> pd.DataFrame:
+        """Net changes from one covered snapshot date to a later one, for every company and field"""
+        signature, log = self._current()
+        key = (from_date, to_date)
+        with self._lock:
+            if signature == self._signature:
+                if key in self._intervals:
+                    return self._intervals[key]
+                if key in self._ranges:
+                    self._ranges.move_to_end(key)
+                    return self._ranges[key]
+        if log.empty:
+            return log
+        net = compose(log[(log["From"] >= from_date) & (log["To"] <= to_date)]).reset_index(drop=True)
+        with self._lock:
+            if signature == self._signature:
+                self._ranges[key] = net
+                while len(self._ranges) > CHANGE_RANGES:
+                    self._ranges.popitem(last=False)
+        return net
+
+    def between(self, from_date: str, to_date: str, field: Optional[str] = None,
+                company: Optional[str] = None) -> pd.DataFrame:
+        """Net changes from one covered snapshot date to a later one, for one company or field if given"""
+        net = self.net(from_date, to_date)
+        if company and not net.empty:
+            net = net[net["Company"] == company]
+        if field and not net.empty:
+            net = net[net["Field"] == field]
+        return net
+
+
+def change_records(net: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Change rows as API records, with the team size delta worked out"""
+    records = []
+    net = net.astype(object).where(net.notna(), None)
+    for row in net.itertuples(index=False):
+        record = {
+            "company": row.Company,
+            "name": row.Name,
+            "batch": row.Batch,
+            "field": row.Field,
+            "change": row.Change,
+            "old": row.Old,
+            "new": row.New,
+            "from": row.From,
+            "to": row.To,
+        }
+        if row.Field == "team_size":
+            old = pd.to_numeric(row.Old, errors="coerce")
+            new = pd.to_numeric(row.New, errors="coerce")
+            record["delta"] = None if pd.isna(old) or pd.isna(new) else int(new) - int(old)
+        records.append(record)
+    return records
+
+
+def change_summary(net: pd.DataFrame) -> Dict[str, Any]:
+    """Counts per field and change, plus status transitions such as "Active -> Acquired" """
+    if net.empty:
+        return {"counts": {}, "status_transitions": {}}
+    counts = net.groupby(["Field", "Change"]).size()
+    status = net[net["Field"] == "status"]
+    transitions = (status["Old"].fillna("None") + " -> " + status["New"].fillna("None")).value_counts()
+    return {
+        "counts": {f"{field}_{change}": int(count) for (field, change), count in counts.items()},
+        "status_transitions": {transition: int(count) for transition, count in transitions.items()},
+    }
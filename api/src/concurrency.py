@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, TypeVar
+import asyncio
+import contextvars
+import functools
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+T = TypeVar("T")
+
+
+class BlockingPool:
+    """
+    Bounded thread pool for the blocking work async handlers need: stat and directory listings,
+    CSV/Parquet reads, snapshot loads, pandas queries and rendering. The event loop hands the work
+    over and keeps serving other requests until it is done, and at most `max_workers` such calls
+    run at once however many requests are waiting.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="blocking")
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """`fn(*args, **kwargs)` on the pool, in a copy of the caller's context (e.g. ?pretty)"""
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, fn, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one execution: the first caller starts it, the
+    others await its result (or its exception). A caller that goes away doesn't cancel the call
+    for the rest. Keys are forgotten as soon as the call finishes.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Future"] = {}
+        self._stats = {"calls": 0, "shared": 0}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is None:
+            self._stats["calls"] += 1
+            future = asyncio.ensure_future(call())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self._stats["shared"] += 1
+        return await asyncio.shield(future)
+
+    def metrics(self) -> Dict:
+        return {**self._stats, "in_flight": len(self._calls)}
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Exclusive lock on `path` (created if missing) shared with other processes, held for the
+    block: flock on POSIX, a locked first byte on Windows
+    """
+    with open(path, "a+") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+            return
+        lock.seek(0)
+        while True:
+            try:
+                # LK_LOCK itself gives up after ~10 s of retrying, so keep waiting
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+                break
+            except OSError:
+                continue
+        try:
+            yield
+        finally:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
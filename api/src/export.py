@@ -0,0 +1,170 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+import csv
+import io
+import zlib
+
+import numpy as np
+import orjson
+import pandas as pd
+
+from .registry import INTEGER_COLUMNS, PARQUET_SUFFIX, join_list_columns, parquet_columns
+from .serialization import frame_records
+
+# Rows parsed per chunk when filtering, and bytes per read when passing a file through as-is
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_BLOCK_BYTES = 64 * 1024
+
+
+def file_columns(path: Path) -> List[str]:
+    """Column names of a CSV (its header row) or a Parquet file (its schema)"""
+    if path.suffix == PARQUET_SUFFIX:
+        import pyarrow.parquet as pq
+        return parquet_columns(pq.read_schema(path).names)[1]
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def _read_columns(columns: Optional[List[str]], batch: Optional[str], status: Optional[str]) -> Optional[List[str]]:
+    """The requested columns plus whichever filter columns are needed to apply the filters"""
+    if columns is None:
+        return None
+    needed = list(columns)
+    for column, value in (("Batch", batch), ("Status", status)):
+        if value and column not in needed:
+            needed.append(column)
+    return needed
+
+
+def _filter_chunk(chunk: pd.DataFrame, batch: Optional[str], status: Optional[str]) -> pd.DataFrame:
+    if batch and "Batch" in chunk.columns:
+        chunk = chunk[chunk["Batch"].astype("string").str.lower() == batch.lower()]
+    if status and "Status" in chunk.columns:
+        chunk = chunk[chunk["Status"] == status]
+    return chunk
+
+
+def _type_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Integer columns as nullable integers; everything else stays as parsed strings"""
+    for column in INTEGER_COLUMNS:
+        if column in chunk.columns:
+            chunk = chunk.assign(**{column: pd.to_numeric(chunk[column], errors="coerce").astype("Int64")})
+    return chunk
+
+
+def iter_filtered_chunks(
+    path: Path,
+    batch: Optional[str] = None,
+    status: Optional[str] = None,
+    chunksize: int = EXPORT_CHUNK_ROWS,
+    raw: bool = False,
+    columns: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV in chunks, keeping rows that match the batch/status filters (if the file has those
+    columns). With `raw`, values are kept exactly as written; otherwise missing values become NA
+    and integer columns are typed, the same way for every chunk. With `columns`, only those
+    columns are parsed and returned.
+    """
+    read_columns = _read_columns(columns, batch, status)
+    with pd.read_csv(path, dtype=str, chunksize=chunksize, keep_default_na=not raw, usecols=read_columns) as reader:
+        for chunk in reader:
+            chunk = _filter_chunk(chunk, batch, status)
+            if not raw:
+                chunk = _type_chunk(chunk)
+            yield chunk if columns is None else chunk[columns]
+
+
+def iter_parquet_chunks(
+    path: Path,
+    batch: Optional[str] = None,
+    status: Optional[str] = None,
+    chunksize: int = EXPORT_CHUNK_ROWS,
+    columns: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    The Parquet counterpart of iter_filtered_chunks: reads one record batch at a time and only the
+    column chunks that are needed. Industry is read from its CSV text (see parquet_columns), or its
+    tags joined back into the "tag, tag" form in older files.
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    read, names = parquet_columns(parquet_file.schema_arrow.names, _read_columns(columns, batch, status))
+    for record_batch in parquet_file.iter_batches(batch_size=chunksize, columns=read):
+        chunk = record_batch.to_pandas()
+        chunk.columns = names
+        chunk = join_list_columns(_filter_chunk(chunk, batch, status).copy())
+        yield chunk if columns is None else chunk[columns]
+
+
+@lru_cache(maxsize=32)
+def _record_offsets(path: str, mtime_ns: int, size: int) -> np.ndarray:
+    offsets = []
+    in_quotes = False
+    with open(path, "rb") as f:
+        position = len(f.readline())
+        for line in f:
+            # A quoted field may span lines; a record starts on a line outside any quotes
+            if not in_quotes and line.strip():
+                offsets.append(position)
+            if line.count(b'"') % 2:
+                in_quotes = not in_quotes
+            position += len(line)
+    offsets.append(position)
+    return np.asarray(offsets, dtype=np.int64)
+
+
+def csv_record_offsets(path: Path) -> np.ndarray:
+    """
+    Byte offset where each record of a CSV starts, followed by the file's size. Built with one scan
+    per version of the file (mtime and size), so any page can then be read with a single seek.
+    """
+    stat = path.stat()
+    return _record_offsets(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def read_csv_records(path: Path, start: int, stop: int) -> pd.DataFrame:
+    """Records [start, stop) of a CSV, parsed like iter_filtered_chunks, reading only their bytes"""
+    offsets = csv_record_offsets(path)
+    records = len(offsets) - 1
+    start, stop = min(max(start, 0), records), min(max(stop, start), records)
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(offsets[start])
+        body = f.read(int(offsets[stop] - offsets[start]))
+    return _type_chunk(pd.read_csv(io.BytesIO(header + body), dtype=str))
+
+
+def ndjson_stream(chunks: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """One JSON object per line, one chunk at a time"""
+    for chunk in chunks:
+        if not chunk.empty:
+            yield b"".join(orjson.dumps(record) + b"\n" for record in frame_records(chunk))
+
+
+def csv_stream(chunks: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """CSV with a single header row, one chunk at a time"""
+    header = True
+    for chunk in chunks:
+        if header or not chunk.empty:
+            yield chunk.to_csv(index=False, header=header).encode("utf-8")
+            header = False
+
+
+def raw_file_stream(path: Path, block_size: int = EXPORT_BLOCK_BYTES) -> Iterator[bytes]:
+    """The file's bytes as they are on disk"""
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            yield block
+
+
+def gzip_stream(stream: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into a gzip stream as it is produced"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for block in stream:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
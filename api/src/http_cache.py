@@ -0,0 +1,192 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+import gzip
+import hashlib
+import threading
+from urllib.parse import urlencode
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from .serialization import FastJSONResponse
+
+# Content codings we can produce, in order of preference
+ENCODINGS = ("br", "gzip")
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Snapshots never change in place, but "latest" moves when a new one lands: clients keep the body
+# and revalidate it with If-None-Match, which costs a 304 and no body
+CACHE_CONTROL = "no-cache"
+
+
+@lru_cache(maxsize=None)
+def _brotli():
+    """The brotli module, or None when it isn't installed (responses then fall back to gzip)"""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return _brotli().compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def normalized_query(request: Request) -> str:
+    """Query parameters sorted by name and value, so equivalent URLs share an ETag"""
+    return urlencode(sorted(request.query_params.multi_items()))
+
+
+def make_etag(version: str, request: Request) -> str:
+    """Strong ETag for a response: the data version it was built from plus the normalized request"""
+    key = "\0".join((version, request.url.path, normalized_query(request)))
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """
+    The tag in an If-None-Match header that matches `etag`, if any. Compressed representations
+    are tagged with a "-br" / "-gzip" suffix and match the same response.
+    """
+    if not if_none_match:
+        return None
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return etag
+        base = tag[2:] if tag.startswith("W/") else tag
+        for encoding in ENCODINGS:
+            base = base.replace(f"-{encoding}\"", "\"")
+        if base == etag:
+            return tag
+    return None
+
+
+def accepted_encodings(request: Request) -> List[str]:
+    """The codings we produce that the client accepts (q > 0), in our order of preference"""
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return [
+        encoding for encoding in ENCODINGS
+        if (encoding in accepted or "*" in accepted) and (encoding != "br" or _brotli() is not None)
+    ]
+
+
+@dataclass
+class CachedBody:
+    """A rendered JSON body and the compressed copies made of it so far"""
+    body: bytes
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.body) + sum(len(data) for data in self.encoded.values())
+
+
+class ResponseCache:
+    """
+    In-process LRU of rendered JSON responses, keyed by ETag.
+
+    A response's ETag is derived from the content hash of the data it was built from and the
+    normalized query, so it names the body exactly: a matching If-None-Match is answered with 304
+    without building anything, and a cached body is sent without querying or serializing again.
+    Bodies of at least `compress_min_bytes` are sent brotli- or gzip-compressed when the client
+    accepts it; each compressed copy is made once and cached with the body. Entries are evicted
+    least recently used first once more than `max_entries` or `max_bytes` are held.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_entries: int = 2048, compress_min_bytes: int = 1024):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.compress_min_bytes = compress_min_bytes
+        self._entries: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0, "evictions": 0}
+
+    def _get(self, etag: str) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(etag)
+            self._stats["hits"] += 1
+            return entry
+
+    def _put(self, etag: str, entry: CachedBody) -> None:
+        with self._lock:
+            previous = self._entries.pop(etag, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[etag] = entry
+            self._bytes += entry.nbytes
+            # Never evict the entry that was just stored
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._stats["evictions"] += 1
+
+    def _encoded(self, etag: str, entry: CachedBody, encoding: str) -> bytes:
+        data = entry.encoded.get(encoding)
+        if data is None:
+            data = compress(entry.body, encoding)
+            with self._lock:
+                if self._entries.get(etag) is entry and encoding not in entry.encoded:
+                    entry.encoded[encoding] = data
+                    self._bytes += len(data)
+        return data
+
+    def respond(self, request: Request, version: str, build: Callable[[], Any]) -> Response:
+        """
+        The response for `request`, whose content is `build()` for data at `version`: a 304 when
+        the client already has it, else the cached or freshly rendered body.
+        """
+        etag = make_etag(version, request)
+        headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": CACHE_CONTROL}
+        matched = matching_etag(request.headers.get("if-none-match"), etag)
+        if matched is not None:
+            with self._lock:
+                self._stats["not_modified"] += 1
+            return Response(status_code=304, headers={**headers, "ETag": matched})
+
+        entry = self._get(etag)
+        if entry is None:
+            entry = CachedBody(FastJSONResponse(build()).body)
+            self._put(etag, entry)
+
+        body = entry.body
+        if len(body) >= self.compress_min_bytes:
+            encodings = accepted_encodings(request)
+            if encodings:
+                body = self._encoded(etag, entry, encodings[0])
+                headers["Content-Encoding"] = encodings[0]
+                headers["ETag"] = f'{etag[:-1]}-{encodings[0]}"'
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,131 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Written by the scraper's index_founders.py: every founder row of every snapshot with the id of
+# the founder it belongs to (resolved by LinkedIn/Twitter profile, then by name) and of its company
+FOUNDER_INDEX_DIR = "founders"
+FOUNDER_INDEX_FILE = "identities.parquet"
+FOUNDER_INDEX = f"{FOUNDER_INDEX_DIR}/{FOUNDER_INDEX_FILE}"
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value is None or pd.isna(value) else str(value)
+
+
+@dataclass
+class _Identities:
+    """One version of the index file, laid out for lookups"""
+    signature: Tuple[int, int]
+    # Per snapshot date: the founder id of each founders row, in row order
+    rows: Dict[str, np.ndarray] = field(default_factory=dict)
+    # Founder id -> the founder's appearances (rows of the index file), oldest first
+    appearances: Dict[str, np.ndarray] = field(default_factory=dict)
+    # Founder id -> distinct companies across every snapshot
+    company_counts: Dict[str, int] = field(default_factory=dict)
+    table: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+
+class FounderIndex:
+    """
+    Founder identities across all snapshots, reloaded when the index file changes.
+
+    Snapshots group their founders rows by these ids instead of by name, so two people with the
+    same name stay apart and one person stays one founder when their name or profile URL is
+    written differently. A founder's companies across every snapshot, and how many there are,
+    are lookups by id.
+    """
+
+    def __init__(self, data_dir: Path):
+        self.path = Path(data_dir) / FOUNDER_INDEX
+        self._lock = threading.Lock()
+        self._identities: Optional[_Identities] = None
+
+    def stat(self) -> Optional[Tuple[int, int]]:
+        """(mtime in ns, size) of the index file, or None when there is none"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> Optional[_Identities]:
+        signature = self.stat()
+        if signature is None:
+            return None
+        with self._lock:
+            if self._identities is None or self._identities.signature != signature:
+                table = pd.read_parquet(self.path)
+                table = table.sort_values(["Date", "Row"], kind="stable").reset_index(drop=True)
+                founders = table["Founder"].to_numpy(dtype=object)
+                self._identities = _Identities(
+                    signature=signature,
+                    rows={date: founders[rows] for date, rows in table.groupby("Date", sort=False).indices.items()},
+                    appearances=table.groupby("Founder", sort=False).indices,
+                    company_counts=table.groupby("Founder", sort=False)["Company"].nunique().to_dict(),
+                    table=table,
+                )
+            return self._identities
+
+    def snapshot_founders(self, date: str, rows: int, source_mtime_ns: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Founder id and company count (across all snapshots) of each founders row of a snapshot,
+        or None when the index doesn't cover it: no index, a snapshot it wasn't built from, or a
+        founders file changed since.
+        """
+        stat = self.stat()
+        if stat is None or stat[0] < source_mtime_ns:
+            return None
+        identities = self._load()
+        if identities is None:
+            return None
+        ids = identities.rows.get(date)
+        if ids is None or len(ids) != rows:
+            return None
+        counts = np.fromiter((identities.company_counts[founder] for founder in ids), dtype=np.int64, count=len(ids))
+        return ids, counts
+
+    def founder(self, founder_id: str) -> Optional[Dict[str, Any]]:
+        """
+        A founder and every company they appear with across all snapshots, or None for an
+        unknown id. Names and profiles are the latest ones seen.
+        """
+        identities = self._load()
+        if identities is None or founder_id not in identities.appearances:
+            return None
+        rows = identities.table.iloc[identities.appearances[founder_id]]
+        latest = rows.iloc[-1]
+        linkedin = rows["Founder's LinkedIn"].dropna()
+        twitter = rows["Founder's Twitter"].dropna()
+        companies: List[Dict[str, Any]] = []
+        for company, appearances in rows.groupby("Company", sort=False):
+            last = appearances.iloc[-1]
+            dates = sorted(set(appearances["Date"]))
+            companies.append({
+                "company_id": company,
+                "name": _text(last["Name"]),
+                "batch": _text(last["Batch"]),
+                "status": _text(last["Status"]),
+                "first_seen": dates[0],
+                "last_seen": dates[-1],
+                "snapshots": dates,
+            })
+        dates = sorted(set(rows["Date"]))
+        return {
+            "founder_id": founder_id,
+            "first_name": _text(latest["Founder's First Name"]),
+            "last_name": _text(latest["Founder's Last Name"]),
+            "founder_linkedin_url": _text(linkedin.iloc[-1]) if len(linkedin) else None,
+            "founder_twitter_url": _text(twitter.iloc[-1]) if len(twitter) else None,
+            "company_count": len(companies),
+            "first_seen": dates[0],
+            "last_seen": dates[-1],
+            "companies": companies,
+        }
+
+    def available(self) -> bool:
+        return self.stat() is not None
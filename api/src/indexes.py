@@ -0,0 +1,158 @@
+from typing import Dict, Iterable, List, Optional
+import re
+
+import numpy as np
+import pandas as pd
+
+# Tag lists ("saas, b2b") and places ("San Francisco") are split into tokens on these
+TOKEN_SEPARATORS = re.compile(r"[,\s]+")
+EMPTY = np.empty(0, dtype=np.int32)
+
+
+def union(postings: Iterable[np.ndarray]) -> np.ndarray:
+    """Sorted, de-duplicated row ids from several posting lists"""
+    postings = [p for p in postings if len(p)]
+    if not postings:
+        return EMPTY
+    if len(postings) == 1:
+        return postings[0]
+    return np.unique(np.concatenate(postings))
+
+
+def intersect(row_sets: List[np.ndarray]) -> np.ndarray:
+    """Intersect sorted row-id arrays, smallest first"""
+    row_sets = sorted(row_sets, key=len)
+    rows = row_sets[0]
+    for other in row_sets[1:]:
+        if not len(rows):
+            break
+        rows = np.intersect1d(rows, other, assume_unique=True)
+    return rows
+
+
+def _postings(values: pd.Series) -> Dict[str, np.ndarray]:
+    """Distinct lower-cased value -> sorted row ids, skipping missing values"""
+    values = values.astype("string").str.lower()
+    groups = values.groupby(values, observed=True, sort=False).indices
+    return {key: np.asarray(rows, dtype=np.int32) for key, rows in groups.items()}
+
+
+class HashIndex:
+    """Exact-match index (case-insensitive for strings)"""
+
+    def __init__(self, values: pd.Series):
+        self.postings = _postings(values)
+
+    def lookup(self, value) -> np.ndarray:
+        return self.postings.get(str(value).lower(), EMPTY)
+
+
+class TokenIndex:
+    """
+    Case-insensitive substring index over a low-cardinality text column.
+
+    Distinct values map to their rows, and tokens map to the distinct values containing them. A
+    query without separators can only match inside a single token, so only the token vocabulary is
+    scanned; queries spanning tokens scan the distinct values instead.
+    """
+
+    def __init__(self, values: pd.Series):
+        self.postings = _postings(values)
+        self.token_values: Dict[str, List[str]] = {}
+        for value in self.postings:
+            for token in set(TOKEN_SEPARATORS.split(value)):
+                if token:
+                    self.token_values.setdefault(token, []).append(value)
+
+    def lookup(self, query: str) -> np.ndarray:
+        query = query.lower()
+        if TOKEN_SEPARATORS.search(query):
+            values = [value for value in self.postings if query in value]
+        else:
+            values = {
+                value
+                for token, token_values in self.token_values.items() if query in token
+                for value in token_values
+            }
+        return union(self.postings[value] for value in values)
+
+
+class NgramIndex:
+    """
+    Case-insensitive substring index over a high-cardinality text column such as founder names.
+
+    Every 1-, 2- and 3-gram of each distinct value points at that value. A query is answered by
+    intersecting the posting sets of its grams and then verifying the few candidates left.
+    """
+
+    def __init__(self, values: pd.Series, n: int = 3):
+        self.n = n
+        self.postings = _postings(values)
+        self.values = list(self.postings)
+        self.grams: Dict[str, set] = {}
+        for value_id, value in enumerate(self.values):
+            for size in range(1, n + 1):
+                for start in range(len(value) - size + 1):
+                    self.grams.setdefault(value[start:start + size], set()).add(value_id)
+
+    def lookup(self, query: str) -> np.ndarray:
+        query = query.lower()
+        size = min(self.n, len(query))
+        if size == 0:
+            return union(self.postings.values())
+        grams = {query[start:start + size] for start in range(len(query) - size + 1)}
+        candidates = None
+        for gram in sorted(grams, key=lambda g: len(self.grams.get(g, ()))):
+            ids = self.grams.get(gram)
+            if not ids:
+                return EMPTY
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return EMPTY
+        return union(
+            self.postings[self.values[value_id]]
+            for value_id in candidates
+            if query in self.values[value_id]
+        )
+
+
+def _first_column(df: pd.DataFrame, names: List[str]) -> Optional[str]:
+    return next((name for name in names if name in df.columns), None)
+
+
+class SnapshotIndex:
+    """Secondary indexes for one companies or founders table, built once at load"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.size = len(df)
+        self.indexes = {}
+        if "Batch" in df.columns:
+            self.indexes["batch"] = HashIndex(df["Batch"])
+        if "Status" in df.columns:
+            self.indexes["status"] = HashIndex(df["Status"])
+        if "Industry" in df.columns:
+            self.indexes["industry"] = TokenIndex(df["Industry"])
+        city_column = _first_column(df, ["City", "Location"])
+        if city_column:
+            self.indexes["city"] = TokenIndex(df[city_column])
+        team_size_column = _first_column(df, ["Team Size", "Team_Size", "team_size"])
+        if team_size_column:
+            self.indexes["team_size"] = HashIndex(df[team_size_column])
+        if "Founder's First Name" in df.columns:
+            self.indexes["first_name"] = NgramIndex(df["Founder's First Name"])
+        if "Founder's Last Name" in df.columns:
+            self.indexes["last_name"] = NgramIndex(df["Founder's Last Name"])
+
+    def select(self, **filters) -> Optional[np.ndarray]:
+        """
+        Row ids (sorted) matching every given filter, or None when no filter applies.
+        Filters on columns this table doesn't have are ignored.
+        """
+        row_sets = [
+            self.indexes[name].lookup(value)
+            for name, value in filters.items()
+            if value is not None and value != "" and name in self.indexes
+        ]
+        if not row_sets:
+            return None
+        return intersect(row_sets)
@@ -1,17 +1,38 @@
-from fastapi import FastAPI, HTTPException, Query, APIRouter
+from fastapi import FastAPI, HTTPException, Query, APIRouter, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 from pathlib import Path
-import pandas as pd
-import numpy as np
 import os
-import json
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
 import re
 from enum import Enum
 from pydantic_settings import BaseSettings
 
+from .changes import CHANGE_FIELDS, ChangeLog, change_records, change_summary
+from .stats import ROLLUPS_FILE, RollupStore
+from .identities import FounderIndex
+from .registry import DatasetRegistry, Snapshot, PARQUET_SUFFIX, file_digest, snapshot_file
+from .http_cache import ResponseCache
+from .concurrency import BlockingPool, SingleFlight
+from .pagination import Cursor, CursorError, cursor_scope, page_size
+from .export import (
+    csv_record_offsets,
+    read_csv_records,
+    file_columns,
+    iter_filtered_chunks,
+    iter_parquet_chunks,
+    ndjson_stream,
+    csv_stream,
+    raw_file_stream,
+    gzip_stream,
+)
+from .serialization import (
+    FastJSONResponse,
+    pretty_param,
+    frame_records,
+)
+
 # Configuration class for environment-specific settings
 class Settings(BaseSettings):
     # API settings
@@ -27,6 +48,31 @@ class Settings(BaseSettings):
         str(Path(__file__).resolve().parent.parent.parent.parent / "data")
     )
     
+    # Dataset cache settings
+    cache_max_snapshots: int = 4
+    cache_max_mb: int = 512
+    
+    # "memory" parses snapshots into each worker; "mmap" compiles them to Arrow IPC files that
+    # every worker maps (set this when running several uvicorn workers); "sqlite" ingests them
+    # into indexed SQLite files and answers filters and pagination with queries
+    snapshot_backend: str = "memory"
+    arrow_dir: Optional[str] = None
+    sqlite_dir: Optional[str] = None
+    
+    # Most records a page may hold; also the page size when a request gives no limit
+    max_page_size: int = 1000
+    
+    # Rendered responses kept for repeated queries (keyed by ETag), and the smallest body that
+    # is sent brotli/gzip-compressed to clients that accept it
+    response_cache_mb: int = 64
+    response_cache_entries: int = 2048
+    compress_min_bytes: int = 1024
+    
+    # Threads for blocking work (file I/O, pandas queries, rendering) handed off by the async
+    # handlers, and for loading cold snapshots; at most this many of each run at once per process
+    blocking_workers: int = 4
+    load_workers: int = 2
+    
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -40,23 +86,14 @@ class Settings(BaseSettings):
 # Load settings
 settings = Settings()
 
-# Create custom JSON response class with pretty printing
-class PrettyJSONResponse(JSONResponse):
-    def render(self, content: Any) -> bytes:
-        return json.dumps(
-            content,
-            ensure_ascii=False,
-            allow_nan=True,
-            indent=4,
-            separators=(", ", ": "),
-        ).encode("utf-8")
-
 # Initialize FastAPI app
+# Responses are encoded with orjson; every endpoint accepts ?pretty=true for indented output
 app = FastAPI(
     title=settings.api_title,
     description=settings.api_description,
     version=settings.api_version,
-    default_response_class=PrettyJSONResponse
+    default_response_class=FastJSONResponse,
+    dependencies=[Depends(pretty_param)],
 )
 
 # Create a main v1 router
@@ -68,6 +105,9 @@ datasets_router = APIRouter(prefix="/datasets", tags=["Datasets"])
 # Create a new router for companies and founders
 data_router = APIRouter(tags=["Data"])
 
+# Create a router for precomputed aggregates
+stats_router = APIRouter(prefix="/stats", tags=["Stats"])
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -80,6 +120,44 @@ app.add_middleware(
 # Configure base path for data
 DATA_DIR = Path(settings.data_dir)
 
+# Founder identities across all snapshots, resolved by the scraper's index_founders.py
+founder_index = FounderIndex(DATA_DIR)
+
+# Snapshots are parsed once per process and reused until their files change
+registry = DatasetRegistry(
+    DATA_DIR,
+    max_snapshots=settings.cache_max_snapshots,
+    max_bytes=settings.cache_max_mb * 1024 * 1024,
+    backend=settings.snapshot_backend,
+    arrow_dir=settings.arrow_dir,
+    sqlite_dir=settings.sqlite_dir,
+    founder_index=founder_index,
+)
+
+# Per-company changes between consecutive snapshots, precomputed by the scraper's track_changes.py
+change_log = ChangeLog(DATA_DIR)
+
+# Per-snapshot aggregates, precomputed by the scraper's generate_rollups.py
+rollups = RollupStore(DATA_DIR)
+
+# Rendered data responses, keyed by ETags derived from the content hash of the data they come from
+response_cache = ResponseCache(
+    max_bytes=settings.response_cache_mb * 1024 * 1024,
+    max_entries=settings.response_cache_entries,
+    compress_min_bytes=settings.compress_min_bytes,
+)
+
+# File reads and queries run here so the event loop keeps serving other requests meanwhile.
+# Cold snapshots load on their own pool, so loads never take every thread from cheap requests
+blocking = BlockingPool(settings.blocking_workers)
+loading = BlockingPool(settings.load_workers)
+
+# Concurrent requests for a cold snapshot share one load
+snapshot_loads = SingleFlight()
+
+# Part of every response version: settings that change response bodies for the same data
+RESPONSE_VERSION = f"{settings.api_version}:{settings.max_page_size}"
+
 # Define possible status options based on the model
 class CompanyStatus(str, Enum):
     ACTIVE = "Active"
@@ -88,6 +166,23 @@ class CompanyStatus(str, Enum):
     PUBLIC = "Public"
 
 
+# Aggregate tables materialized for each snapshot
+class StatsTable(str, Enum):
+    BATCH_SIZES = "batch_sizes"
+    STATUS_COUNTS = "status_counts"
+    STATUS_BY_BATCH = "status_by_batch"
+    TEAM_SIZE_BY_STATUS = "team_size_by_status"
+    TEAM_SIZE_BY_BATCH_STATUS = "team_size_by_batch_status"
+    INDUSTRY_COUNTS = "industry_counts"
+    CITY_COUNTS = "city_counts"
+
+
+# Formats available for streaming exports
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -111,18 +206,12 @@ def find_nearest_dataset(target_date: str = None) -> str:
     else:
         formatted_date = target_date
     
-    # Get all dataset directories
-    datasets = []
-    for item in DATA_DIR.iterdir():
-        if item.is_dir() and re.match(r'^\d{4}-\d{2}-\d{2}$', item.name):
-            datasets.append(item.name)
+    # Get all dataset directories, sorted by date (newest first)
+    datasets = registry.dataset_dates()
     
     if not datasets:
         raise HTTPException(status_code=404, detail="No datasets found")
     
-    # Sort datasets by date
-    datasets = sorted(datasets, reverse=True)
-    
     if not formatted_date:
         # Return the latest dataset
         return datasets[0]
@@ -140,22 +229,70 @@ def find_nearest_dataset(target_date: str = None) -> str:
     return datasets[-1]
 
 
+async def get_snapshot(date: Optional[str], after: Optional[Cursor]) -> Tuple[str, Snapshot]:
+    """
+    The dataset a request reads (the cursor's, else the nearest to `date`) and its snapshot,
+    loaded first if it is cold: once however many requests want it, and on the load pool
+    """
+    def lookup():
+        if after is None:
+            dataset_date = find_nearest_dataset(date)
+        elif after.dataset in registry.dataset_dates():
+            dataset_date = after.dataset
+        else:
+            # Checked before anything is loaded: a forged cursor mustn't load (and cache) a snapshot
+            raise HTTPException(status_code=400, detail=f"Cursor's dataset {after.dataset} doesn't exist. Start again without a cursor.")
+        return dataset_date, registry.cached(dataset_date)
+    
+    dataset_date, snapshot = await blocking.run(lookup)
+    if snapshot is None:
+        snapshot = await snapshot_loads.do(dataset_date, lambda: loading.run(registry.get, dataset_date))
+    return dataset_date, snapshot
+
+
+def decode_cursor(cursor: Optional[str], offset: int) -> Optional[Cursor]:
+    """The keyset cursor a request continues from, if any (400 when it can't be used)"""
+    if cursor is None:
+        return None
+    if offset:
+        raise HTTPException(status_code=400, detail="offset can't be combined with cursor")
+    try:
+        return Cursor.decode(cursor)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def check_cursor(after: Optional[Cursor], scope: str) -> Optional[int]:
+    """The sort key to continue after, once the cursor is known to belong to this query and data"""
+    if after is None:
+        return None
+    if after.scope != scope:
+        raise HTTPException(
+            status_code=400,
+            detail="Cursor doesn't match this query, or the dataset changed since it was issued. Start again without a cursor."
+        )
+    return after.key
+
+
+def next_cursor(dataset: str, scope: str, last_key: Optional[int]) -> Optional[str]:
+    return Cursor(dataset, scope, last_key).encode() if last_key is not None else None
+
+
 @datasets_router.get("/datasets", response_model=List[str])
 async def list_datasets():
     """List all available dataset dates"""
-    # Get all subdirectories in the data directory that are dates (YYYY-MM-DD format)
-    datasets = []
-    
-    for item in DATA_DIR.iterdir():
-        if item.is_dir() and item.name not in ['archived']:
-            try:
-                # Check if directory name follows date format
-                if item.name[0].isdigit():
-                    datasets.append(item.name)
-            except (ValueError, IndexError):
-                pass
-    
-    return sorted(datasets, reverse=True)
+    # Subdirectories of the data directory that are dates (YYYY-MM-DD format), newest first
+    return await blocking.run(registry.dataset_dates)
+
+
+@datasets_router.get("/cache")
+async def get_cache_metrics():
+    """Dataset and response cache metrics: hits, misses, reloads, evictions and memory held"""
+    return {
+        **registry.metrics(),
+        "responses": response_cache.metrics(),
+        "loads": snapshot_loads.metrics(),
+    }
 
 
 @datasets_router.get("/datasets/{dataset_date}")
@@ -163,172 +300,219 @@ async def get_dataset_files(dataset_date: str):
     """Get available files for a specific dataset date"""
     dataset_dir = DATA_DIR / dataset_date
     
-    if not dataset_dir.exists() or not dataset_dir.is_dir():
-        raise HTTPException(status_code=404, detail=f"Dataset for {dataset_date} not found")
-    
-    files = []
-    for file in dataset_dir.iterdir():
-        if file.is_file():
-            # Get file extension without the dot
-            ext = file.suffix[1:] if file.suffix else ""
-            files.append({
-                "filename": file.name,
-                "size_bytes": file.stat().st_size,
-                "extension": ext
-            })
+    def list_files():
+        if not dataset_dir.exists() or not dataset_dir.is_dir():
+            raise HTTPException(status_code=404, detail=f"Dataset for {dataset_date} not found")
+        
+        files = []
+        for file in dataset_dir.iterdir():
+            if file.is_file():
+                # Get file extension without the dot
+                ext = file.suffix[1:] if file.suffix else ""
+                files.append({
+                    "filename": file.name,
+                    "size_bytes": file.stat().st_size,
+                    "extension": ext
+                })
+        return files
     
-    return {"dataset": dataset_date, "files": files}
+    # The listing and stat calls run on the blocking pool
+    return {"dataset": dataset_date, "files": await blocking.run(list_files)}
 
 
 @datasets_router.get("/datasets/{dataset_date}/{file_name}")
 async def get_dataset_data(
+    request: Request,
     dataset_date: str, 
     file_name: str,
-    limit: Optional[int] = Query(None, description="Limit the number of records returned"),
-    offset: Optional[int] = Query(0, description="Offset for pagination")
+    limit: Optional[int] = Query(None, ge=0, description=f"Limit the number of records returned (at most {settings.max_page_size})"),
+    offset: Optional[int] = Query(0, ge=0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="Continue after the previous page (its next_cursor)")
 ):
-    """Get data from a specific file in a dataset"""
-    file_path = DATA_DIR / dataset_date / file_name
+    """
+    Get data from a specific file in a dataset
     
-    if not file_path.exists() or not file_path.is_file():
-        raise HTTPException(status_code=404, detail=f"File {file_name} not found in dataset {dataset_date}")
+    Pages hold at most MAX_PAGE_SIZE records. Follow next_cursor to read the next page: only that
+    page's bytes are read from the file. Responses carry an ETag of the file's content and the query.
+    """
+    file_path = DATA_DIR / dataset_date / file_name
     
-    try:
-        # Handle different file formats
-        if file_name.endswith('.csv'):
-            df = pd.read_csv(file_path)
-            
-            # Get total records
-            total_records = len(df)
-            
-            # Apply pagination if specified
-            if limit is not None:
-                df = df.iloc[offset:offset+limit]
-            
-            return {
-                "dataset": dataset_date,
-                "file": file_name,
-                "total_records": total_records,
-                "limit": limit,
-                "offset": offset,
-                "data": df.to_dict(orient="records")
-            }
+    def respond():
+        if not file_path.exists() or not file_path.is_file():
+            raise HTTPException(status_code=404, detail=f"File {file_name} not found in dataset {dataset_date}")
         
-        elif file_name.endswith('.xlsx'):
-            raise HTTPException(status_code=400, detail="Excel files cannot be streamed directly via API. Please convert to CSV.")
+        after = decode_cursor(cursor, offset)
+        stat = file_path.stat()
+        scope = cursor_scope("file", dataset_date, file_name, stat.st_mtime_ns, stat.st_size)
+        last = check_cursor(after, scope)
+        page_limit = page_size(limit, settings.max_page_size)
         
-        else:
+        if file_name.endswith('.xlsx'):
+            raise HTTPException(status_code=400, detail="Excel files cannot be streamed directly via API. Please convert to CSV.")
+        if not file_name.endswith('.csv'):
             raise HTTPException(status_code=400, detail=f"Unsupported file format: {file_name}")
-            
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading data: {str(e)}")
-
+        
+        def build():
+            try:
+                # Records are located through a cached index of their byte offsets
+                total_records = len(csv_record_offsets(file_path)) - 1
+                start = offset + (last + 1 if last is not None else 0)
+                df = read_csv_records(file_path, start, start + page_limit)
+                more = start + page_limit < total_records
+                
+                return {
+                    "dataset": dataset_date,
+                    "file": file_name,
+                    "total_records": total_records,
+                    "limit": page_limit,
+                    "offset": offset,
+                    "next_cursor": next_cursor(dataset_date, scope, start + page_limit - 1 if more and page_limit else None),
+                    "data": frame_records(df)
+                }
+                
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error reading data: {str(e)}")
+        
+        return response_cache.respond(request, f"{RESPONSE_VERSION}:{file_digest(file_path)}", build)
+    
+    # Stat, hashing, the offset index and the CSV read all run on the blocking pool
+    return await blocking.run(respond)
 
-def handle_nan(value: Any) -> Any:
-    """Convert NaN values to None for JSON serialization"""
-    if pd.isna(value) or (isinstance(value, float) and np.isnan(value)):
-        return None
-    return value
 
+@datasets_router.get("/datasets/{dataset_date}/{file_name}/export")
+async def export_dataset_data(
+    dataset_date: str,
+    file_name: str,
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="Export format (ndjson or csv)"),
+    gzip: bool = Query(False, description="Compress the stream with gzip"),
+    batch: Optional[str] = Query(None, description="YC batch (e.g., W21, S22)"),
+    status: Optional[CompanyStatus] = Query(None, description="Company status (Active, Acquired, Inactive, Public)"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to include (default: all)")
+):
+    """
+    Stream a dataset file as NDJSON or CSV
+    
+    The file is read in chunks and rows are sent as they are read, so memory use stays flat
+    regardless of the file's size. Supports the same batch and status filters as /v1/companies.
+    NDJSON exports are read from the snapshot's Parquet copy when there is one, decoding only
+    the requested columns.
+    """
+    file_path = DATA_DIR / dataset_date / file_name
+    
+    def resolve_source():
+        if not file_path.exists() or not file_path.is_file():
+            raise HTTPException(status_code=404, detail=f"File {file_name} not found in dataset {dataset_date}")
+        
+        if not file_name.endswith('.csv'):
+            raise HTTPException(status_code=400, detail=f"Unsupported file format: {file_name}")
+        
+        source_path = snapshot_file(file_path.parent, file_name) if format == ExportFormat.NDJSON else file_path
+        
+        selected = None
+        if columns:
+            selected = [column.strip() for column in columns.split(",") if column.strip()]
+            unknown = [column for column in selected if column not in file_columns(source_path)]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}")
+        return source_path, selected
+    
+    # Checks touch the disk, so they run on the blocking pool; the stream itself is iterated
+    # off the event loop by StreamingResponse
+    source_path, selected = await blocking.run(resolve_source)
+    status_value = status.value if status else None
+    
+    if format == ExportFormat.CSV and not batch and not status and not selected:
+        # Nothing to filter: pass the file through without parsing it
+        stream = raw_file_stream(file_path)
+    elif source_path.suffix == PARQUET_SUFFIX:
+        stream = ndjson_stream(iter_parquet_chunks(source_path, batch=batch, status=status_value, columns=selected))
+    elif format == ExportFormat.NDJSON:
+        stream = ndjson_stream(iter_filtered_chunks(file_path, batch=batch, status=status_value, columns=selected))
+    else:
+        stream = csv_stream(iter_filtered_chunks(file_path, batch=batch, status=status_value, raw=True, columns=selected))
+    
+    headers = {}
+    if gzip:
+        stream = gzip_stream(stream)
+        headers["Content-Encoding"] = "gzip"
+    
+    media_type = "application/x-ndjson" if format == ExportFormat.NDJSON else "text/csv"
+    return StreamingResponse(stream, media_type=media_type, headers=headers)
 
 @data_router.get("/companies")
 async def get_companies(
+    request: Request,
     date: Optional[str] = Query(None, description="Date in YYYY-MM-DD format"),
     batch: Optional[str] = Query(None, description="YC batch (e.g., W21, S22)"),
     status: Optional[CompanyStatus] = Query(None, description="Company status (Active, Acquired, Inactive, Public)"),
     industry: Optional[str] = Query(None, description="Industry category"),
     city: Optional[str] = Query(None, description="Company's city location"),
     team_size: Optional[int] = Query(None, description="Team size"),
-    limit: Optional[int] = Query(None, description="Limit the number of records returned"),
-    offset: Optional[int] = Query(0, description="Offset for pagination")
+    limit: Optional[int] = Query(None, ge=0, description=f"Limit the number of records returned (at most {settings.max_page_size})"),
+    offset: Optional[int] = Query(0, ge=0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="Continue after the previous page (its next_cursor)")
 ):
     """
     Get YC companies with filtering options
     
     This endpoint returns YC companies from the dataset closest to the provided date.
     You can filter companies by batch, status, industry, city, and team size.
+    Companies are in snapshot order, at most MAX_PAGE_SIZE per page. Follow next_cursor
+    (with the same filters) for the next page; it stays on the same dataset.
+    Responses carry an ETag of the snapshot's content and the query; send it back in
+    If-None-Match to get a 304 while the data is unchanged.
     """
-    # Find the nearest dataset to the requested date
-    dataset_date = find_nearest_dataset(date)
+    # Find the nearest dataset to the requested date (a cursor pins the dataset it came from)
+    # and get the cached companies data for that snapshot
+    after = decode_cursor(cursor, offset)
+    dataset_date, snapshot = await get_snapshot(date, after)
     
     # Create message when date is different than requested
     date_message = None
     if date and date != dataset_date:
         date_message = f"Requested date {date} not found. Using nearest available date: {dataset_date}"
     
-    # Construct the path to the companies CSV file
-    companies_file = DATA_DIR / dataset_date / "YC_Companies.csv"
-    
-    if not companies_file.exists():
+    if not snapshot.has("companies"):
         raise HTTPException(status_code=404, detail=f"Companies data not found in dataset {dataset_date}")
     
-    try:
-        # Read the companies data
-        df = pd.read_csv(companies_file)
-        
-        # Apply filters
-        if batch:
-            df = df[df['Batch'].str.lower() == batch.lower()]
-        
-        if status:
-            df = df[df['Status'] == status.value]
-        
-        if industry and 'Industry' in df.columns:
-            # Industry might be a comma-separated list, so we search within it
-            df = df[df['Industry'].str.contains(industry, case=False, na=False)]
-        
-        # Check for city in Location column or City column if it exists
-        if city:
-            if 'City' in df.columns:
-                df = df[df['City'].str.contains(city, case=False, na=False)]
-            elif 'Location' in df.columns:
-                df = df[df['Location'].str.contains(city, case=False, na=False)]
-        
-        if team_size is not None:
-            if 'Team Size' in df.columns:
-                df = df[df['Team Size'] == team_size]
-            elif 'Team_Size' in df.columns:
-                df = df[df['Team_Size'] == team_size]
-            elif 'team_size' in df.columns:
-                df = df[df['team_size'] == team_size]
-        
-        # Get total records after filtering
-        total_records = len(df)
-        
-        # Apply pagination
-        if limit is not None:
-            df = df.iloc[offset:offset+limit]
-        else:
-            df = df.iloc[offset:]
-        
-        # Try to convert data to match YC_Company schema
-        data = []
-        for _, row in df.iterrows():
-            company_data = {
-                "name": row.get("Name", ""),
-                "batch": row.get("Batch", ""),
-                "status": row.get("Status", ""),
-                "industry": handle_nan(row.get("Industry")),
-                "team_size": handle_nan(row.get("Team Size")),
-                "city": handle_nan(row.get("Location"))  # Using Location as city if no City column
+    filters = dict(
+        batch=batch,
+        status=status.value if status else None,
+        industry=industry,
+        city=city,
+        team_size=team_size,
+    )
+    scope = cursor_scope("companies", snapshot.signature, filters)
+    last = check_cursor(after, scope)
+    limit = page_size(limit, settings.max_page_size)
+    
+    def build():
+        try:
+            # Filters use the snapshot's indexes (industry and city match case-insensitive substrings,
+            # e.g. within "saas, b2b"); with the sqlite backend they, the count and the page are queries
+            page = snapshot.query_companies(limit=limit, offset=offset, after=last, **filters)
+            
+            return {
+                "dataset": dataset_date,
+                "date_message": date_message,
+                "total_records": page.total,
+                "limit": limit,
+                "offset": offset,
+                "next_cursor": next_cursor(dataset_date, scope, page.last_key),
+                "data": page.data
             }
-            data.append(company_data)
-        
-        return {
-            "dataset": dataset_date,
-            "date_message": date_message,
-            "total_records": total_records,
-            "limit": limit,
-            "offset": offset,
-            "data": data
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing companies data: {str(e)}")
+            
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error processing companies data: {str(e)}")
+    
+    # Rendered once per snapshot version and query; the records skip FastAPI's per-value encoder.
+    # The query and rendering run on the blocking pool
+    return await blocking.run(response_cache.respond, request, f"{RESPONSE_VERSION}:{snapshot.content_hash}", build)
 
 
 @data_router.get("/founders")
 async def get_founders(
+    request: Request,
     date: Optional[str] = Query(None, description="Date in YYYY-MM-DD format"),
     batch: Optional[str] = Query(None, description="YC batch (e.g., W21, S22)"),
     status: Optional[CompanyStatus] = Query(None, description="Company status (Active, Acquired, Inactive, Public)"),
@@ -336,118 +520,234 @@ async def get_founders(
     city: Optional[str] = Query(None, description="Company's city location"),
     first_name: Optional[str] = Query(None, description="Founder's first name"),
     last_name: Optional[str] = Query(None, description="Founder's last name"),
-    limit: Optional[int] = Query(None, description="Limit the number of records returned"),
-    offset: Optional[int] = Query(0, description="Offset for pagination")
+    min_companies: Optional[int] = Query(None, ge=1, description="Only founders with at least this many companies across all snapshots (e.g. 2 for serial founders)"),
+    limit: Optional[int] = Query(None, ge=0, description=f"Limit the number of records returned (at most {settings.max_page_size})"),
+    offset: Optional[int] = Query(0, ge=0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="Continue after the previous page (its next_cursor)")
 ):
     """
     Get YC founders with filtering options
     
     This endpoint returns YC founders from the dataset closest to the provided date.
-    You can filter founders by their company's batch, status, industry, city, and founder's name.
+    You can filter founders by their company's batch, status, industry, city, and founder's name,
+    and keep serial founders with min_companies (counted from the founder index).
+    Founders are ordered by their first matching row, at most MAX_PAGE_SIZE per page, and only
+    the founders on the page are grouped. Follow next_cursor (with the same filters) for the next page.
+    Responses carry an ETag of the snapshot's content and the query.
     """
-    # Find the nearest dataset to the requested date
-    dataset_date = find_nearest_dataset(date)
+    # Find the nearest dataset to the requested date (a cursor pins the dataset it came from)
+    # and get the cached founders data for that snapshot
+    after = decode_cursor(cursor, offset)
+    dataset_date, snapshot = await get_snapshot(date, after)
     
     # Create message when date is different than requested
     date_message = None
     if date and date != dataset_date:
         date_message = f"Requested date {date} not found. Using nearest available date: {dataset_date}"
     
-    # Construct the path to the founders CSV file
-    founders_file = DATA_DIR / dataset_date / "YC_Founders.csv"
-    
-    if not founders_file.exists():
+    if not snapshot.has("founders"):
         raise HTTPException(status_code=404, detail=f"Founders data not found in dataset {dataset_date}")
     
-    try:
-        # Read the founders data
-        df = pd.read_csv(founders_file)
-        
-        # Apply filters
-        if batch:
-            df = df[df['Batch'].str.lower() == batch.lower()]
-        
-        if status:
-            df = df[df['Status'] == status.value]
-        
-        if industry and 'Industry' in df.columns:
-            # Industry might be a comma-separated list, so we search within it
-            df = df[df['Industry'].str.contains(industry, case=False, na=False)]
-        
-        # Check for city in Location column or City column if it exists
-        if city:
-            if 'City' in df.columns:
-                df = df[df['City'].str.contains(city, case=False, na=False)]
-            elif 'Location' in df.columns:
-                df = df[df['Location'].str.contains(city, case=False, na=False)]
-        
-        if first_name and "Founder's First Name" in df.columns:
-            df = df[df["Founder's First Name"].str.contains(first_name, case=False, na=False)]
-        
-        if last_name and "Founder's Last Name" in df.columns:
-            df = df[df["Founder's Last Name"].str.contains(last_name, case=False, na=False)]
-        
-        # Group founders by first and last name to handle multiple companies per founder
-        founders = {}
-        for _, row in df.iterrows():
-            # Convert row to dict and handle all NaN values
-            row_dict = row.to_dict()
-            for k, v in row_dict.items():
-                row_dict[k] = handle_nan(v)
-            
-            first = row_dict.get("Founder's First Name", "")
-            last = row_dict.get("Founder's Last Name", "")
-            founder_key = f"{first}_{last}"
+    filters = dict(
+        batch=batch,
+        status=status.value if status else None,
+        industry=industry,
+        city=city,
+        first_name=first_name,
+        last_name=last_name,
+        min_companies=min_companies,
+    )
+    scope = cursor_scope("founders", snapshot.signature, filters)
+    last = check_cursor(after, scope)
+    limit = page_size(limit, settings.max_page_size)
+    
+    def build():
+        try:
+            # Founders are grouped by the founder index's ids (by first and last name without one)
+            # to handle multiple companies per founder (industry, city and names match
+            # case-insensitive substrings)
+            page = snapshot.query_founders(limit=limit, offset=offset, after=last, **filters)
             
-            if founder_key not in founders:
-                founders[founder_key] = {
-                    "first_name": first,
-                    "last_name": last,
-                    "company_count": 1,
-                    "founder_linkedin_url": row_dict.get("Founder's LinkedIn"),
-                    "founder_twitter_url": row_dict.get("Founder's Twitter"),
-                    "companies": []
-                }
-            else:
-                founders[founder_key]["company_count"] += 1
+            return {
+                "dataset": dataset_date,
+                "date_message": date_message,
+                "total_records": page.total,
+                "limit": limit,
+                "offset": offset,
+                "next_cursor": next_cursor(dataset_date, scope, page.last_key),
+                "data": page.data
+            }
             
-            founders[founder_key]["companies"].append({
-                "name": row_dict.get("Name", ""),
-                "batch": row_dict.get("Batch", ""),
-                "status": row_dict.get("Status", ""),
-                "industry": row_dict.get("Industry"),
-                "team_size": row_dict.get("Team Size"),
-                "city": row_dict.get("Location")
-            })
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error processing founders data: {str(e)}")
+    
+    return await blocking.run(response_cache.respond, request, f"{RESPONSE_VERSION}:{snapshot.content_hash}", build)
+
+
+@data_router.get("/founders/{founder_id}")
+async def get_founder(request: Request, founder_id: str):
+    """
+    Get one founder and every company they appear with across all snapshots
+    
+    Founders are identified by the founder index: rows sharing a LinkedIn or Twitter profile, or
+    a name at the same company, are one founder. Ids are the founder_id of /v1/founders entries.
+    """
+    def respond():
+        if not founder_index.available():
+            raise HTTPException(status_code=404, detail="No founder index found. Run the scraper's index_founders.py first.")
+        founder = founder_index.founder(founder_id)
+        if founder is None:
+            raise HTTPException(status_code=404, detail=f"Founder {founder_id} not found")
+        return response_cache.respond(request, f"{RESPONSE_VERSION}:{file_digest(founder_index.path)}", lambda: founder)
+    
+    # The index is read and looked up on the blocking pool
+    return await blocking.run(respond)
+
+
+@data_router.get("/changes")
+async def get_changes(
+    from_date: Optional[str] = Query(None, alias="from", description="Start date in YYYY-MM-DD format (default: earliest tracked snapshot)"),
+    to_date: Optional[str] = Query(None, alias="to", description="End date in YYYY-MM-DD format (default: latest tracked snapshot)"),
+    field: Optional[str] = Query(None, description=f"Only one kind of change ({', '.join(CHANGE_FIELDS)})"),
+    company: Optional[str] = Query(None, description="Company id (the slug of its YC URL, e.g. airbnb)"),
+    limit: Optional[int] = Query(None, ge=0, description=f"Limit the number of records returned (at most {settings.max_page_size})"),
+    offset: Optional[int] = Query(0, ge=0, description="Offset for pagination")
+):
+    """
+    Get per-company changes between two snapshots
+    
+    Companies added or removed, status transitions (e.g. Active -> Acquired), team size deltas
+    and founders added or removed. Answered from the precomputed change log: changes between
+    consecutive snapshots are composed into the net change over the requested range. Dates that
+    aren't tracked snapshots are moved to the nearest earlier one. Pages hold at most
+    MAX_PAGE_SIZE records.
+    """
+    if field is not None and field not in CHANGE_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Unknown field {field}, expected one of {', '.join(CHANGE_FIELDS)}")
+    
+    def query():
+        dates = change_log.dates()
+        if not dates:
+            raise HTTPException(status_code=404, detail="No change log found. Run the scraper's track_changes.py first.")
         
-        # Convert to list and apply pagination
-        data = list(founders.values())
-        total_records = len(data)
+        def resolve(date: Optional[str], default: str) -> str:
+            if not date:
+                return default
+            if not re.match(r'^\d{4}-\d{2}-\d{2}$', date):
+                raise HTTPException(status_code=400, detail=f"Invalid date {date}, expected YYYY-MM-DD")
+            earlier = [d for d in dates if d <= date]
+            return earlier[-1] if earlier else dates[0]
         
-        # Apply pagination
-        if limit is not None:
-            data = data[offset:offset+limit]
-        else:
-            data = data[offset:]
+        start = resolve(from_date, dates[0])
+        end = resolve(to_date, dates[-1])
+        if start > end:
+            raise HTTPException(status_code=400, detail=f"from ({start}) must not be after to ({end})")
+        
+        changes = change_log.between(start, end, field=field, company=company)
+        total_records = len(changes)
+        page_limit = page_size(limit, settings.max_page_size)
+        page = changes.iloc[offset:offset+page_limit]
         
+        return FastJSONResponse({
+            "from": start,
+            "to": end,
+            "snapshots": [d for d in dates if start <= d <= end],
+            "summary": change_summary(changes),
+            "total_records": total_records,
+            "limit": page_limit,
+            "offset": offset,
+            "data": change_records(page)
+        })
+    
+    # The change log is read and composed on the blocking pool
+    return await blocking.run(query)
+
+
+def get_rollups(date: Optional[str]):
+    """Rollups for the dataset nearest to `date`, with the same date message as the data endpoints"""
+    dataset_date = find_nearest_dataset(date)
+    date_message = None
+    if date and date != dataset_date:
+        date_message = f"Requested date {date} not found. Using nearest available date: {dataset_date}"
+    snapshot_rollups = rollups.get(dataset_date)
+    if snapshot_rollups is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Stats not found for dataset {dataset_date}. Run the scraper's generate_rollups.py first."
+        )
+    return dataset_date, date_message, snapshot_rollups
+
+
+@stats_router.get("")
+async def list_stats(
+    date: Optional[str] = Query(None, description="Date in YYYY-MM-DD format")
+):
+    """
+    List the aggregate tables available for a dataset
+    
+    Aggregates are computed once per snapshot by the pipeline's rollup stage and served as-is.
+    """
+    dataset_date, date_message, snapshot_rollups = await blocking.run(get_rollups, date)
+    return FastJSONResponse({
+        "dataset": dataset_date,
+        "date_message": date_message,
+        "generated_at": snapshot_rollups.get("generated_at"),
+        "companies": snapshot_rollups.get("companies"),
+        "tables": {name: len(rows) for name, rows in snapshot_rollups["tables"].items()},
+    })
+
+
+@stats_router.get("/{table}")
+async def get_stats(
+    request: Request,
+    table: StatsTable,
+    date: Optional[str] = Query(None, description="Date in YYYY-MM-DD format"),
+    batch: Optional[str] = Query(None, description="YC batch (e.g., W21, S22), for tables broken down by batch"),
+    status: Optional[CompanyStatus] = Query(None, description="Company status, for tables broken down by status"),
+    limit: Optional[int] = Query(None, ge=0, description=f"Limit the number of records returned (at most {settings.max_page_size})"),
+    offset: Optional[int] = Query(0, ge=0, description="Offset for pagination"),
+):
+    """
+    Get one precomputed aggregate table for a dataset
+    
+    Batch sizes, status mix per batch, team-size quantiles per batch and status, and industry and
+    city counts. Tables are read from the snapshot's rollups; no request aggregates raw rows.
+    Pages hold at most MAX_PAGE_SIZE rows.
+    """
+    dataset_date, date_message, snapshot_rollups = await blocking.run(get_rollups, date)
+    rows = snapshot_rollups["tables"].get(table.value)
+    if rows is None:
+        raise HTTPException(status_code=404, detail=f"Stats table {table.value} not found for dataset {dataset_date}")
+    
+    page_limit = page_size(limit, settings.max_page_size)
+    
+    def build():
+        selected = rows
+        if batch:
+            selected = [row for row in selected if "batch" not in row or str(row["batch"]).lower() == batch.lower()]
+        if status:
+            selected = [row for row in selected if "status" not in row or row["status"] == status.value]
         return {
             "dataset": dataset_date,
             "date_message": date_message,
-            "total_records": total_records,
-            "limit": limit,
+            "table": table.value,
+            "total_records": len(selected),
+            "limit": page_limit,
             "offset": offset,
-            "data": data
+            "data": selected[offset:offset + page_limit],
         }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing founders data: {str(e)}")
+    
+    version = await blocking.run(file_digest, DATA_DIR / dataset_date / ROLLUPS_FILE)
+    return await blocking.run(response_cache.respond, request, f"{RESPONSE_VERSION}:{version}", build)
 
 
-# Include both routers in the main app
+# Include the routers in the main app
 v1_router.include_router(data_router)
+v1_router.include_router(stats_router)
 v1_router.include_router(datasets_router)
 app.include_router(v1_router)
 
 if __name__ == "__main__":
+    # Run from the api directory: python -m src.main
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    uvicorn.run("src.main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
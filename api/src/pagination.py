@@ -0,0 +1,62 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, NamedTuple, Optional
+import base64
+import binascii
+import hashlib
+
+import orjson
+
+# Bump when the cursor payload changes so old cursors are rejected instead of misread
+CURSOR_VERSION = 1
+
+
+class CursorError(ValueError):
+    """A cursor that can't be decoded, or that belongs to another query or version of the data"""
+
+
+@dataclass
+class Page:
+    """One page of records. `last_key` is the sort key of the last record when more follow."""
+    total: int
+    data: List[Dict[str, Any]] = field(default_factory=list)
+    last_key: Optional[int] = None
+
+
+def cursor_scope(*parts: Any) -> str:
+    """
+    Short digest of what a cursor is valid for: the endpoint, the snapshot's file signature and
+    the filters. A cursor is only accepted by the query (and data) it was issued for.
+    """
+    return hashlib.sha1(orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)).hexdigest()[:16]
+
+
+class Cursor(NamedTuple):
+    """
+    Opaque keyset cursor: the dataset it pages through, its scope and the sort key (row position
+    in the snapshot) of the last record returned. The next page starts right after that key, so
+    every page costs the same however deep it is, and rows stay stable between pages.
+    """
+    dataset: str
+    scope: str
+    key: int
+
+    def encode(self) -> str:
+        payload = orjson.dumps({"v": CURSOR_VERSION, "d": self.dataset, "s": self.scope, "k": self.key})
+        return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+    @classmethod
+    def decode(cls, text: str) -> "Cursor":
+        try:
+            payload = orjson.loads(base64.urlsafe_b64decode(text + "=" * (-len(text) % 4)))
+            version = payload["v"]
+            cursor = cls(str(payload["d"]), str(payload["s"]), int(payload["k"]))
+        except (binascii.Error, orjson.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            raise CursorError("Malformed cursor") from e
+        if version != CURSOR_VERSION:
+            raise CursorError("Cursor is from an older version of the API")
+        return cursor
+
+
+def page_size(limit: Optional[int], max_page_size: int) -> int:
+    """Records per page: the requested limit, never more than the server's maximum"""
+    return max_page_size if limit is None else min(limit, max_page_size)
@@ -0,0 +1,499 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+import hashlib
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .arrow_store import ARROW_SUFFIX, MappedSnapshotIndex, compile_table, is_compiled, map_table, mapped_frame
+from .identities import FOUNDER_INDEX, FounderIndex
+from .indexes import SnapshotIndex
+from .pagination import Page
+from .serialization import COMPANY_FIELDS, founder_codes, group_founders, to_records
+from .sql_store import SQLITE_SUFFIX, SqlSnapshotStore, ingest, is_ingested
+
+DATE_DIR_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+COMPANIES_FILE = "YC_Companies.csv"
+FOUNDERS_FILE = "YC_Founders.csv"
+PARQUET_SUFFIX = ".parquet"
+
+# "memory": tables parsed into each process's heap; "mmap": compiled once to Arrow IPC and mapped;
+# "sqlite": ingested once into an indexed SQLite file that answers each query
+BACKENDS = ("memory", "mmap", "sqlite")
+
+# Low-cardinality columns are stored as categoricals; everything else as strings
+CATEGORY_COLUMNS = ["Batch", "Status", "Location", "Industry"]
+STRING_COLUMNS = ["Name", "Founder's First Name", "Founder's Last Name", "Founder's LinkedIn", "Founder's Twitter", "YC URL"]
+INTEGER_COLUMNS = ["Team Size"]
+# Stored as lists of tags in the Parquet snapshots, next to their CSV text in "<column> Text"
+LIST_COLUMNS = ["Industry"]
+TEXT_SUFFIX = " Text"
+
+# Founder orderings kept per snapshot, one per recent combination of founder filters
+FOUNDER_ORDERS = 16
+
+# (file name, mtime in ns, size in bytes) for every file a snapshot was loaded from (CSV or
+# Parquet, and the founder index as FOUNDER_INDEX)
+Signature = Tuple[Tuple[str, int, int], ...]
+
+
+def type_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Store snapshot columns as categoricals, strings and nullable integers"""
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    for column in STRING_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("string")
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("Int64")
+    return df
+
+
+def read_typed_csv(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read a snapshot CSV into typed, categorical-encoded columns"""
+    return type_columns(pd.read_csv(path, dtype=str, usecols=columns))
+
+
+def parquet_columns(names: List[str], columns: Optional[List[str]] = None) -> Tuple[List[str], List[str]]:
+    """
+    Columns to read from a Parquet snapshot whose schema has `names`, and the CSV column each one
+    stands for. A list column is read from its "<column> Text" copy when the file has one, and the
+    copies aren't columns of their own, so readers see the CSV's columns and strings.
+    """
+    copies = {f"{column}{TEXT_SUFFIX}" for column in LIST_COLUMNS}
+    wanted = list(columns) if columns is not None else [name for name in names if name not in copies]
+    read = [f"{name}{TEXT_SUFFIX}" if f"{name}{TEXT_SUFFIX}" in copies & set(names) else name for name in wanted]
+    return read, wanted
+
+
+def join_list_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turn list-typed Parquet columns back into "tag, tag" strings, for files written before the
+    columns kept their CSV text (columns that are already strings are left as they are)
+    """
+    for column in LIST_COLUMNS:
+        if column in df.columns:
+            df[column] = [
+                ", ".join(tags) if isinstance(tags, (list, np.ndarray)) else tags
+                for tags in df[column].tolist()
+            ]
+    return df
+
+
+def read_typed_parquet(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a typed snapshot written by the scraper. Industry is read from the CSV text stored next to
+    its list of tags, so the API serves the same strings from Parquet as from CSV; older files
+    without that text have their tags joined with ", " inside Arrow before conversion.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    read, names = parquet_columns(pq.read_schema(path).names, columns)
+    table = pq.read_table(path, columns=read).rename_columns(names)
+    for column in LIST_COLUMNS:
+        kind = table.schema.field(column).type if column in table.column_names else None
+        if kind is not None and (pa.types.is_list(kind) or pa.types.is_large_list(kind)):
+            index = table.column_names.index(column)
+            table = table.set_column(index, column, pc.binary_join(table.column(column), ", "))
+    return type_columns(table.to_pandas())
+
+
+def snapshot_file(directory: Path, file_name: str) -> Path:
+    """The Parquet copy of a snapshot CSV when there is one at least as new as the CSV, else the CSV"""
+    csv_path = directory / file_name
+    parquet_path = csv_path.with_suffix(PARQUET_SUFFIX)
+    try:
+        parquet_mtime = parquet_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return csv_path
+    try:
+        if csv_path.stat().st_mtime_ns > parquet_mtime:
+            return csv_path
+    except FileNotFoundError:
+        pass
+    return parquet_path
+
+
+def read_snapshot_table(directory: Path, file_name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read one snapshot table, preferring its Parquet copy and reading only `columns` when given"""
+    path = snapshot_file(directory, file_name)
+    if path.suffix == PARQUET_SUFFIX:
+        return read_typed_parquet(path, columns)
+    return read_typed_csv(path, columns)
+
+
+@lru_cache(maxsize=256)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_digest(path: Path) -> str:
+    """sha256 of a file's content, hashed once per version of the file (mtime and size)"""
+    stat = path.stat()
+    return _file_digest(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+@dataclass
+class FounderOrder:
+    """The founders matching one set of filters, in order of their first matching row"""
+    # Each founder's first matching row, ascending
+    first_rows: np.ndarray
+    # The matching rows, grouped by founder in that order (rows ascending within a founder)
+    rows: np.ndarray
+    # Founder i's rows are rows[bounds[i]:bounds[i + 1]]
+    bounds: np.ndarray
+
+    @classmethod
+    def build(cls, rows: np.ndarray, codes: np.ndarray) -> "FounderOrder":
+        founders, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+        order = np.argsort(first, kind="stable")
+        rank = np.empty(len(founders), dtype=np.int64)
+        rank[order] = np.arange(len(founders))
+        row_ranks = rank[inverse]
+        bounds = np.zeros(len(founders) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_ranks, minlength=len(founders)), out=bounds[1:])
+        return cls(rows[first[order]], rows[np.argsort(row_ranks, kind="stable")], bounds)
+
+    def __len__(self) -> int:
+        return len(self.first_rows)
+
+
+@dataclass
+class Snapshot:
+    """One dated dataset held in memory"""
+    date: str
+    signature: Signature
+    # sha256 over the content of the files the snapshot was loaded from
+    content_hash: str = ""
+    companies: Optional[pd.DataFrame] = None
+    founders: Optional[pd.DataFrame] = None
+    company_index: Optional[Union[SnapshotIndex, MappedSnapshotIndex]] = None
+    founder_index: Optional[Union[SnapshotIndex, MappedSnapshotIndex]] = None
+    # Founder of each founders row (see founder_codes), numbered in order of first appearance
+    founder_groups: Optional[np.ndarray] = None
+    # Founder id of each founders row, when the founder index covers the snapshot
+    founder_ids: Optional[np.ndarray] = None
+    # Companies of each row's founder: across all snapshots with the index, else in this snapshot
+    founder_companies: Optional[np.ndarray] = None
+    store: Optional[SqlSnapshotStore] = None
+    nbytes: int = 0
+    mapped_bytes: int = 0
+    loaded_at: float = field(default_factory=time.time)
+    # Recent founder orderings by filters, so paging through founders doesn't re-sort every page
+    founder_orders: "OrderedDict[Tuple, FounderOrder]" = field(default_factory=OrderedDict, repr=False)
+    _orders_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def has(self, table: str) -> bool:
+        """Whether the snapshot has the "companies" or "founders" table"""
+        if self.store is not None:
+            return self.store.has(table)
+        return getattr(self, table) is not None
+
+    def query_companies(self, limit: Optional[int] = None, offset: int = 0, after: Optional[int] = None, **filters) -> Page:
+        """
+        Companies matching `filters` (see SnapshotIndex.select) as API records, ordered by their
+        row in the snapshot. The page starts after row `after` (a keyset cursor), then skips `offset`.
+        """
+        if self.store is not None:
+            return self.store.companies(limit=limit, offset=offset, after=after, **filters)
+        rows = self.company_index.select(**filters)
+        if rows is None:
+            rows = np.arange(len(self.companies))
+        start = offset + (int(np.searchsorted(rows, after, side="right")) if after is not None else 0)
+        page = rows[start:start + limit if limit is not None else None]
+        more = start + len(page) < len(rows)
+        # Location is served as city
+        data = to_records(self.companies.iloc[page], COMPANY_FIELDS)
+        return Page(len(rows), data, int(page[-1]) if more and len(page) else None)
+
+    def query_founders(self, limit: Optional[int] = None, offset: int = 0, after: Optional[int] = None,
+                       min_companies: Optional[int] = None, **filters) -> Page:
+        """
+        Founders matching `filters`, grouped by founder (see group_founders), ordered by their first
+        matching row. `min_companies` keeps founders with at least that many companies, a lookup
+        in the per-row counts taken from the founder index. The page starts after the founder
+        whose first row is `after`. Only the rows of the founders on the page are grouped, and the
+        ordering is computed once per set of filters, so paging through founders costs each page's size.
+        """
+        if self.store is not None:
+            return self.store.founders(limit=limit, offset=offset, after=after, min_companies=min_companies, **filters)
+        ordered = self.founder_order(min_companies, **filters)
+        start = offset + (int(np.searchsorted(ordered.first_rows, after, side="right")) if after is not None else 0)
+        start = min(start, len(ordered))
+        end = min(start + limit, len(ordered)) if limit is not None else len(ordered)
+        page = np.sort(ordered.rows[ordered.bounds[start]:ordered.bounds[end]])
+        more = end < len(ordered)
+        data = group_founders(self.founders.iloc[page], self.founder_ids[page] if self.founder_ids is not None else None)
+        return Page(len(ordered), data, int(ordered.first_rows[end - 1]) if more and data else None)
+
+    def founder_order(self, min_companies: Optional[int] = None, **filters) -> FounderOrder:
+        """Founders matching the filters in order of their first matching row (see FounderOrder)"""
+        key = (min_companies or None, *sorted((name, value) for name, value in filters.items() if value is not None))
+        with self._orders_lock:
+            ordered = self.founder_orders.get(key)
+            if ordered is not None:
+                self.founder_orders.move_to_end(key)
+                return ordered
+        rows = self.founder_index.select(**filters)
+        if min_companies:
+            serial = np.flatnonzero(self.founder_companies >= min_companies)
+            rows = serial if rows is None else np.intersect1d(rows, serial, assume_unique=True)
+        if rows is None:
+            rows = np.arange(len(self.founders))
+        ordered = FounderOrder.build(rows, self.founder_groups[rows])
+        with self._orders_lock:
+            self.founder_orders[key] = ordered
+            while len(self.founder_orders) > FOUNDER_ORDERS:
+                self.founder_orders.popitem(last=False)
+        return ordered
+
+
+class DatasetRegistry:
+    """
+    Process-level cache of dataset snapshots.
+
+    Each snapshot is parsed and indexed once and kept until one of its files changes (mtime or size) or it is
+    evicted as the least recently used once more than `max_snapshots` snapshots or `max_bytes`
+    are held. The listing of dataset directories is cached until DATA_DIR itself changes.
+
+    With the "mmap" backend each table is compiled once into an Arrow IPC file under `arrow_dir`
+    and memory-mapped, so every worker process shares the same pages and filters run over the
+    mapping. Only the heap each snapshot uses counts towards `max_bytes`.
+
+    With the "sqlite" backend each snapshot is ingested once into a SQLite file under `sqlite_dir`
+    with indexes for every filter. Filters, counts, founder grouping and pagination run as queries,
+    so a worker holds no rows at all between requests.
+
+    With a `founder_index`, founders rows are grouped by the founder ids it resolved (across all
+    snapshots) rather than by name. The index file is part of every snapshot's signature, so
+    snapshots are regrouped when it is rebuilt.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        max_snapshots: int = 4,
+        max_bytes: int = 512 * 1024 * 1024,
+        backend: str = "memory",
+        arrow_dir: Optional[Path] = None,
+        sqlite_dir: Optional[Path] = None,
+        founder_index: Optional[FounderIndex] = None,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown snapshot backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+        self.data_dir = Path(data_dir)
+        self.backend = backend
+        self.arrow_dir = Path(arrow_dir) if arrow_dir else self.data_dir / ".cache" / "arrow"
+        self.sqlite_dir = Path(sqlite_dir) if sqlite_dir else self.data_dir / ".cache" / "sqlite"
+        self.founder_index = founder_index
+        self.max_snapshots = max_snapshots
+        self.max_bytes = max_bytes
+        self._snapshots: "OrderedDict[str, Snapshot]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._dates: Optional[List[str]] = None
+        self._dates_mtime: Optional[int] = None
+        self._stats = {"hits": 0, "misses": 0, "reloads": 0, "evictions": 0, "load_seconds": 0.0}
+
+    def dataset_dates(self) -> List[str]:
+        """Dataset directory names (YYYY-MM-DD), newest first"""
+        mtime = self.data_dir.stat().st_mtime_ns
+        with self._lock:
+            if self._dates is None or self._dates_mtime != mtime:
+                self._dates = sorted(
+                    (item.name for item in self.data_dir.iterdir()
+                     if item.is_dir() and DATE_DIR_PATTERN.match(item.name)),
+                    reverse=True,
+                )
+                self._dates_mtime = mtime
+            return list(self._dates)
+
+    def _signature(self, date: str) -> Signature:
+        signature = []
+        for file_name in (COMPANIES_FILE, FOUNDERS_FILE):
+            path = snapshot_file(self.data_dir / date, file_name)
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            signature.append((path.name, stat.st_mtime_ns, stat.st_size))
+        index = self.founder_index.stat() if self.founder_index is not None else None
+        if index is not None and any(Path(name).stem == Path(FOUNDERS_FILE).stem for name, _, _ in signature):
+            signature.append((FOUNDER_INDEX, *index))
+        return tuple(signature)
+
+    def _source(self, date: str, file_name: str) -> Path:
+        """Path of a file in a snapshot's signature"""
+        if file_name == FOUNDER_INDEX:
+            return self.founder_index.path
+        return self.data_dir / date / file_name
+
+    def _founder_groups(self, date: str, founders: pd.DataFrame):
+        """
+        Founder id (None without a founder index covering the snapshot), founder group and
+        company count of each founders row
+        """
+        identities = None
+        if self.founder_index is not None:
+            source = snapshot_file(self.data_dir / date, FOUNDERS_FILE)
+            identities = self.founder_index.snapshot_founders(date, len(founders), source.stat().st_mtime_ns)
+        if identities is None:
+            codes = founder_codes(founders)
+            return None, codes, np.bincount(codes, minlength=1)[codes]
+        ids, companies = identities
+        return ids, founder_codes(founders, ids), companies
+
+    def _load(self, date: str, signature: Signature) -> Snapshot:
+        tables = {Path(file_name).stem for file_name, _, _ in signature}
+        directory = self.data_dir / date
+        snapshot = Snapshot(date=date, signature=signature)
+        snapshot.content_hash = hashlib.sha256(
+            "".join(file_digest(self._source(date, file_name)) for file_name, _, _ in signature).encode()
+        ).hexdigest()
+        if self.backend == "sqlite":
+            snapshot.store = self._ingest(date, tables)
+            snapshot.mapped_bytes = snapshot.store.nbytes
+        elif self.backend == "mmap":
+            if Path(COMPANIES_FILE).stem in tables:
+                table = self._map(date, COMPANIES_FILE)
+                snapshot.companies = mapped_frame(table)
+                snapshot.company_index = MappedSnapshotIndex(table)
+                snapshot.mapped_bytes += table.nbytes
+            if Path(FOUNDERS_FILE).stem in tables:
+                table = self._map(date, FOUNDERS_FILE)
+                snapshot.founders = mapped_frame(table)
+                snapshot.founder_index = MappedSnapshotIndex(table)
+                snapshot.mapped_bytes += table.nbytes
+        else:
+            if Path(COMPANIES_FILE).stem in tables:
+                snapshot.companies = read_snapshot_table(directory, COMPANIES_FILE)
+                snapshot.company_index = SnapshotIndex(snapshot.companies)
+            if Path(FOUNDERS_FILE).stem in tables:
+                snapshot.founders = read_snapshot_table(directory, FOUNDERS_FILE)
+                snapshot.founder_index = SnapshotIndex(snapshot.founders)
+            snapshot.nbytes = sum(
+                int(df.memory_usage(deep=True).sum())
+                for df in (snapshot.companies, snapshot.founders)
+                if df is not None
+            )
+        if snapshot.founders is not None:
+            snapshot.founder_ids, snapshot.founder_groups, snapshot.founder_companies = self._founder_groups(date, snapshot.founders)
+            snapshot.nbytes += snapshot.founder_groups.nbytes + snapshot.founder_companies.nbytes
+            if snapshot.founder_ids is not None:
+                snapshot.nbytes += int(pd.Series(snapshot.founder_ids).memory_usage(deep=True))
+        return snapshot
+
+    def _map(self, date: str, file_name: str):
+        """Map the compiled Arrow file for a table, compiling it first if its source has changed"""
+        directory = self.data_dir / date
+        source = snapshot_file(directory, file_name)
+        target = self.arrow_dir / date / Path(file_name).with_suffix(ARROW_SUFFIX).name
+        if not is_compiled(target, source):
+            compile_table(read_snapshot_table(directory, file_name), source, target)
+        return map_table(target)
+
+    def _ingest(self, date: str, tables: set) -> SqlSnapshotStore:
+        """Open the SQLite file for a snapshot, ingesting it first if any of its sources changed"""
+        directory = self.data_dir / date
+        files = {
+            name: file_name
+            for name, file_name in (("companies", COMPANIES_FILE), ("founders", FOUNDERS_FILE))
+            if Path(file_name).stem in tables
+        }
+        sources = {name: snapshot_file(directory, file_name) for name, file_name in files.items()}
+        if "founders" in files and self.founder_index is not None and self.founder_index.stat() is not None:
+            sources["identities"] = self.founder_index.path
+        target = self.sqlite_dir / f"{date}{SQLITE_SUFFIX}"
+        if not is_ingested(target, sources):
+            loaders = {
+                name: (lambda file_name=file_name: read_snapshot_table(directory, file_name))
+                for name, file_name in files.items()
+            }
+            if "founders" in loaders:
+                loaders["founders"] = lambda: self._read_founders(date)
+            ingest(loaders, sources, target)
+        return SqlSnapshotStore(target)
+
+    def _read_founders(self, date: str) -> pd.DataFrame:
+        """A snapshot's founders rows with the founder id and company count of each, for ingesting"""
+        founders = read_snapshot_table(self.data_dir / date, FOUNDERS_FILE)
+        ids, _, companies = self._founder_groups(date, founders)
+        if ids is not None:
+            founders["Founder ID"] = ids
+        founders["Founder Companies"] = companies
+        return founders
+
+    def _evict(self) -> None:
+        # Never evict the snapshot that was just loaded (the most recently used one)
+        while len(self._snapshots) > 1 and (
+            len(self._snapshots) > self.max_snapshots
+            or sum(s.nbytes for s in self._snapshots.values()) > self.max_bytes
+        ):
+            self._snapshots.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def cached(self, date: str) -> Optional[Snapshot]:
+        """The snapshot for a dataset date if it is loaded and current, else None (never loads)"""
+        signature = self._signature(date)
+        with self._lock:
+            snapshot = self._snapshots.get(date)
+            if snapshot is None or snapshot.signature != signature:
+                return None
+            self._snapshots.move_to_end(date)
+            self._stats["hits"] += 1
+            return snapshot
+
+    def get(self, date: str) -> Snapshot:
+        """
+        Return the snapshot for a dataset date, loading or reloading it if needed. The lock is
+        never held while loading, so hits and other dates aren't held up by it. Callers that may
+        ask for the same cold snapshot at once share one load through concurrency.SingleFlight.
+        """
+        signature = self._signature(date)
+        with self._lock:
+            snapshot = self._snapshots.get(date)
+            if snapshot is not None and snapshot.signature == signature:
+                self._snapshots.move_to_end(date)
+                self._stats["hits"] += 1
+                return snapshot
+            self._stats["misses" if snapshot is None else "reloads"] += 1
+
+        started = time.perf_counter()
+        snapshot = self._load(date, signature)
+        with self._lock:
+            self._stats["load_seconds"] += time.perf_counter() - started
+            self._snapshots[date] = snapshot
+            self._snapshots.move_to_end(date)
+            self._evict()
+        return snapshot
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"] + self._stats["reloads"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "backend": self.backend,
+                "max_snapshots": self.max_snapshots,
+                "max_bytes": self.max_bytes,
+                "cached_bytes": sum(s.nbytes for s in self._snapshots.values()),
+                "mapped_bytes": sum(s.mapped_bytes for s in self._snapshots.values()),
+                "snapshots": [
+                    {"dataset": s.date, "bytes": s.nbytes, "mapped_bytes": s.mapped_bytes, "loaded_at": s.loaded_at}
+                    for s in self._snapshots.values()
+                ],
+            }
@@ -0,0 +1,113 @@
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi import Query
+from fastapi.responses import JSONResponse
+
+# Column in the snapshot CSV -> field in the API response
+COMPANY_FIELDS = {
+    "Name": "name",
+    "Batch": "batch",
+    "Status": "status",
+    "Industry": "industry",
+    "Team Size": "team_size",
+    "Location": "city",
+}
+FOUNDER_FIELDS = {
+    "Founder's First Name": "first_name",
+    "Founder's Last Name": "last_name",
+    "Founder's LinkedIn": "founder_linkedin_url",
+    "Founder's Twitter": "founder_twitter_url",
+}
+
+# Served as JSON floats, as the API always served them: pandas reads a numeric CSV column with
+# missing values as float64
+FLOAT_COLUMNS = ["Team Size"]
+
+# Set per request by the `pretty` query parameter
+pretty_output: ContextVar[bool] = ContextVar("pretty_output", default=False)
+
+
+async def pretty_param(
+    pretty: bool = Query(False, description="Pretty-print the JSON response")
+) -> None:
+    """App-wide dependency: opt in to indented JSON with ?pretty=true"""
+    pretty_output.set(pretty)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson; indented only when the request asked for ?pretty=true"""
+
+    def render(self, content: Any) -> bytes:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if pretty_output.get():
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(content, option=option)
+
+
+def to_records(df: pd.DataFrame, fields: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Rename columns to API fields and turn every missing value into None, column-wise"""
+    values = []
+    for column in fields:
+        if column in df.columns:
+            series = df[column]
+            if column in FLOAT_COLUMNS:
+                series = pd.to_numeric(series, errors="coerce").astype("float64")
+            series = series.astype(object)
+            values.append(series.where(series.notna(), None).tolist())
+        else:
+            values.append([None] * len(df))
+    names = list(fields.values())
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def frame_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """All columns of a frame as records, keeping the original column names"""
+    return to_records(df, {column: column for column in df.columns})
+
+
+def founder_codes(df: pd.DataFrame, ids: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Founder of each row, numbered in order of first appearance. Founders are the `ids` the
+    founder index resolved for the rows when given, else keyed as f"{first}_{last}" with missing
+    names rendered as "None".
+    """
+    if ids is not None:
+        return pd.factorize(ids)[0]
+    first = df["Founder's First Name"].astype(object).fillna("None").astype(str)
+    last = df["Founder's Last Name"].astype(object).fillna("None").astype(str)
+    codes, _ = pd.factorize(first + "_" + last)
+    return codes
+
+
+def group_founders(df: pd.DataFrame, ids: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+    """
+    One entry per founder (see founder_codes, in order of first appearance) listing every company
+    they appear with in `df`. `ids` are the rows' founder ids, when the founder index covers them.
+    """
+    if df.empty:
+        return []
+    companies = to_records(df, COMPANY_FIELDS)
+    founders = to_records(df, FOUNDER_FIELDS)
+    codes = founder_codes(df, ids)
+
+    # Stable sort keeps rows in file order within each founder
+    order = np.argsort(codes, kind="stable")
+    groups = np.split(order, np.flatnonzero(np.diff(codes[order])) + 1)
+
+    data = []
+    for rows in groups:
+        head = founders[rows[0]]
+        data.append({
+            "founder_id": ids[rows[0]] if ids is not None else None,
+            "first_name": head["first_name"],
+            "last_name": head["last_name"],
+            "company_count": len(rows),
+            "founder_linkedin_url": head["founder_linkedin_url"],
+            "founder_twitter_url": head["founder_twitter_url"],
+            "companies": [companies[row] for row in rows],
+        })
+    return data
@@ -0,0 +1,349 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from .arrow_store import _source_tag
+from .concurrency import file_lock
+from .indexes import TOKEN_SEPARATORS
+from .pagination import Page
+from .serialization import COMPANY_FIELDS, FLOAT_COLUMNS, FOUNDER_FIELDS
+
+SQLITE_SUFFIX = ".sqlite"
+
+# Snapshot column -> SQL column. Industry and Location also get a dictionary of their distinct
+# lowercased values and of the tokens in them (as in TokenIndex), so substring filters scan the
+# vocabulary and then use an index.
+SQL_COLUMNS = {
+    "Name": "name",
+    "Batch": "batch",
+    "Status": "status",
+    "Industry": "industry",
+    "Team Size": "team_size",
+    "Location": "location",
+    "Founder's First Name": "first_name",
+    "Founder's Last Name": "last_name",
+    "Founder's LinkedIn": "linkedin",
+    "Founder's Twitter": "twitter",
+    "YC URL": "yc_url",
+    # Added to founders rows from the founder index
+    "Founder ID": "founder_id",
+    "Founder Companies": "founder_companies",
+}
+DICTIONARY_COLUMNS = ("industry", "location")
+NAME_COLUMNS = ("first_name", "last_name")
+
+# API filter -> SQL column, and how it matches (same semantics as SnapshotIndex)
+FILTERS = {
+    "batch": ("batch", "exact"),
+    "status": ("status", "exact"),
+    "team_size": ("team_size", "exact"),
+    "industry": ("industry", "dictionary"),
+    "city": ("location", "dictionary"),
+    "first_name": ("first_name", "name"),
+    "last_name": ("last_name", "name"),
+    "min_companies": ("founder_companies", "minimum"),
+}
+
+# Shortest query the trigram index can answer; shorter ones scan the lowercased names
+TRIGRAM = 3
+
+
+def source_tag(sources: Dict[str, Path]) -> str:
+    return ";".join(_source_tag(source).decode() for _, source in sorted(sources.items()))
+
+
+def _read_tag(target: Path) -> Optional[str]:
+    try:
+        conn = sqlite3.connect(f"file:{target}?mode=ro", uri=True)
+    except sqlite3.OperationalError:
+        return None
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def is_ingested(target: Path, sources: Dict[str, Path]) -> bool:
+    """Whether `target` was built from the current version of every source file"""
+    return target.exists() and _read_tag(target) == source_tag(sources)
+
+
+def _create_table(conn: sqlite3.Connection, name: str, df: pd.DataFrame) -> List[str]:
+    """Create and fill one table (rows keep their file order as row_id); returns its snapshot columns"""
+    present = [column for column in SQL_COLUMNS if column in df.columns]
+    columns = [SQL_COLUMNS[column] for column in present]
+    definitions = []
+    for column in columns:
+        if column in ("batch", "status"):
+            definitions.append(f"{column} TEXT COLLATE NOCASE")
+        elif column in ("team_size", "founder_companies"):
+            definitions.append(f"{column} INTEGER")
+        else:
+            definitions.append(f"{column} TEXT")
+    extra = [f"{column}_vid INTEGER" for column in DICTIONARY_COLUMNS if column in columns]
+    extra += [f"{column}_lc TEXT" for column in NAME_COLUMNS if column in columns]
+    grouped = "first_name" in columns or "last_name" in columns
+    if grouped:
+        extra.append("grp INTEGER")
+    conn.execute(f"CREATE TABLE {name} (row_id INTEGER PRIMARY KEY, {', '.join(definitions + extra)})")
+
+    values = {}
+    for column, sql_column in zip(present, columns):
+        series = df[column].astype(object)
+        values[sql_column] = series.where(series.notna(), None).tolist()
+    rows = len(df)
+    for column in DICTIONARY_COLUMNS:
+        if column in values:
+            lowered = [value.lower() if value is not None else None for value in values[column]]
+            codes, uniques = pd.factorize(pd.Series(lowered, dtype=object))
+            conn.executemany(
+                "INSERT INTO terms (col, id, value) VALUES (?, ?, ?)",
+                [(f"{name}.{column}", code, value) for code, value in enumerate(uniques)],
+            )
+            conn.executemany(
+                "INSERT INTO tokens (col, token, id) VALUES (?, ?, ?)",
+                [
+                    (f"{name}.{column}", token, code)
+                    for code, value in enumerate(uniques)
+                    for token in set(TOKEN_SEPARATORS.split(value)) if token
+                ],
+            )
+            values[f"{column}_vid"] = [int(code) if code >= 0 else None for code in codes]
+    for column in NAME_COLUMNS:
+        if column in values:
+            values[f"{column}_lc"] = [value.lower() if value is not None else None for value in values[column]]
+    if grouped:
+        # Same key as group_founders: the founder id, else f"{first}_{last}" with missing names rendered as "None"
+        first = values.get("first_name", [None] * rows)
+        last = values.get("last_name", [None] * rows)
+        keys = values.get("founder_id") or [
+            f"{'None' if f is None else f}_{'None' if l is None else l}" for f, l in zip(first, last)
+        ]
+        values["grp"] = [int(code) for code in pd.factorize(pd.Series(keys, dtype=object))[0]]
+
+    names = list(values)
+    conn.executemany(
+        f"INSERT INTO {name} (row_id, {', '.join(names)}) VALUES (?, {', '.join('?' * len(names))})",
+        zip(range(rows), *(values[column] for column in names)),
+    )
+
+    for column in ("batch", "status", "team_size", "founder_companies"):
+        if column in columns:
+            conn.execute(f"CREATE INDEX {name}_{column} ON {name} ({column})")
+    for column in DICTIONARY_COLUMNS:
+        if column in columns:
+            conn.execute(f"CREATE INDEX {name}_{column}_vid ON {name} ({column}_vid)")
+    if grouped:
+        conn.execute(f"CREATE INDEX {name}_grp ON {name} (grp, row_id)")
+    name_columns = [column for column in NAME_COLUMNS if column in columns]
+    if name_columns:
+        conn.execute(
+            f"CREATE VIRTUAL TABLE {name}_names USING fts5({', '.join(name_columns)}, "
+            "content='', tokenize='trigram')"
+        )
+        conn.execute(
+            f"INSERT INTO {name}_names (rowid, {', '.join(name_columns)}) "
+            f"SELECT row_id, {', '.join(name_columns)} FROM {name}"
+        )
+    return present
+
+
+def ingest(tables: Dict[str, Callable[[], pd.DataFrame]], sources: Dict[str, Path], target: Path) -> Path:
+    """
+    Ingest a snapshot's tables (read by the given loaders) into one SQLite file with the indexes
+    the API's filters use. Like compile_table, a lock next to the target makes one worker build
+    it while the others wait and then reuse it, and the file is swapped in atomically.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with file_lock(f"{target}.lock"):
+        if is_ingested(target, sources):
+            return target
+        tmp_path = f"{target}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE terms (col TEXT, id INTEGER, value TEXT, PRIMARY KEY (col, id))")
+            conn.execute("CREATE TABLE tokens (col TEXT, token TEXT, id INTEGER)")
+            with conn:
+                for name, load in tables.items():
+                    present = _create_table(conn, name, load())
+                    conn.execute("INSERT INTO meta VALUES (?, ?)", (f"columns:{name}", "\n".join(present)))
+                conn.execute("CREATE INDEX tokens_col ON tokens (col, token, id)")
+                conn.execute("INSERT INTO meta VALUES ('source', ?)", (source_tag(sources),))
+            conn.execute("ANALYZE")
+        finally:
+            conn.close()
+        os.replace(tmp_path, target)
+    return target
+
+
+class SqlSnapshotStore:
+    """
+    Read-only queries over an ingested snapshot. Filters, counts, founder grouping and LIMIT/OFFSET
+    pagination run inside SQLite, so only the rows on the requested page are materialised and
+    nothing per row is held in the worker. The file is memory-mapped by SQLite and, like the Arrow
+    files, shared by every worker. Each thread gets its own connection.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.nbytes = self.path.stat().st_size
+        self._local = threading.local()
+        conn = self._conn()
+        self.tables = {}
+        for key, value in conn.execute("SELECT key, value FROM meta WHERE key LIKE 'columns:%'"):
+            self.tables[key.split(":", 1)[1]] = {SQL_COLUMNS[column] for column in value.split("\n") if column}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # The file is replaced, never modified, once ingested: skip locking altogether
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size={self.nbytes}")
+            self._local.conn = conn
+        return conn
+
+    def has(self, table: str) -> bool:
+        return table in self.tables
+
+    def _where(self, table: str, filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """WHERE clause for the given filters; filters on columns this table doesn't have are ignored"""
+        clauses, params = [], []
+        for name, value in filters.items():
+            if value is None or value == "" or name not in FILTERS:
+                continue
+            column, kind = FILTERS[name]
+            if column not in self.tables[table]:
+                continue
+            if kind == "exact":
+                # batch and status compare NOCASE; team_size compares as a number
+                clauses.append(f"{column} = ?")
+                params.append(str(value))
+            elif kind == "minimum":
+                clauses.append(f"{column} >= ?")
+                params.append(int(value))
+            elif kind == "dictionary":
+                # A query without separators can only match inside one token: scan the tokens
+                query = str(value).lower()
+                vocabulary = "terms" if TOKEN_SEPARATORS.search(query) else "tokens"
+                field = "value" if vocabulary == "terms" else "token"
+                clauses.append(f"{column}_vid IN (SELECT id FROM {vocabulary} "
+                               f"WHERE col = '{table}.{column}' AND instr({field}, ?) > 0)")
+                params.append(query)
+            else:
+                query = str(value).lower()
+                if len(query) >= TRIGRAM and query.isascii():
+                    # The trigram index narrows the rows; instr() keeps str.lower() semantics exact
+                    clauses.append(f"row_id IN (SELECT rowid FROM {table}_names WHERE {table}_names MATCH ?)")
+                    params.append(f'{column} : "{query.replace(chr(34), chr(34) * 2)}"')
+                clauses.append(f"instr({column}_lc, ?) > 0")
+                params.append(query)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def _page(limit: Optional[int], offset: Optional[int]) -> Tuple[int, int]:
+        """LIMIT (one extra row, to tell whether more follow; -1 for no limit) and OFFSET"""
+        return (-1 if limit is None else limit + 1), max(offset or 0, 0)
+
+    def _select(self, table: str, fields: Dict[str, str]) -> str:
+        selected = []
+        for column, field in fields.items():
+            sql_column = SQL_COLUMNS[column]
+            if sql_column not in self.tables[table]:
+                selected.append(f"NULL AS {field}")
+            elif column in FLOAT_COLUMNS:
+                selected.append(f"CAST({sql_column} AS REAL) AS {field}")
+            else:
+                selected.append(f"{sql_column} AS {field}")
+        return ", ".join(selected)
+
+    def companies(self, limit: Optional[int] = None, offset: int = 0, after: Optional[int] = None, **filters) -> Page:
+        """Matching companies in row order, starting after row `after` (a keyset cursor) then skipping `offset`"""
+        conn = self._conn()
+        where, params = self._where("companies", filters)
+        total = conn.execute(f"SELECT count(*) FROM companies{where}", params).fetchone()[0]
+        seek = where
+        if after is not None:
+            seek = f"{where} AND row_id > ?" if where else " WHERE row_id > ?"
+            params = [*params, after]
+        rows = conn.execute(
+            f"SELECT row_id, {self._select('companies', COMPANY_FIELDS)} FROM companies{seek} "
+            "ORDER BY row_id LIMIT ? OFFSET ?",
+            [*params, *self._page(limit, offset)],
+        ).fetchall()
+        more = limit is not None and len(rows) > limit
+        rows = rows[:limit] if more else rows
+        names = list(COMPANY_FIELDS.values())
+        data = [dict(zip(names, row[1:])) for row in rows]
+        return Page(total, data, rows[-1][0] if more and rows else None)
+
+    def founders(self, limit: Optional[int] = None, offset: int = 0, after: Optional[int] = None, **filters) -> Page:
+        """
+        Matching founders, grouped as group_founders does: one entry per founder id (or first and
+        last name without a founder index), in order of first matching row. The page starts after the founder whose first matching row is
+        `after`, then skips `offset`. Only the page's founders are grouped.
+        """
+        conn = self._conn()
+        where, params = self._where("founders", filters)
+        fetch, offset = self._page(limit, offset)
+        if where:
+            total = conn.execute(f"SELECT count(DISTINCT grp) FROM founders{where}", params).fetchone()[0]
+            having = " HAVING first_row > ?" if after is not None else ""
+            page = (f"SELECT grp, min(row_id) AS first_row FROM founders{where} "
+                    f"GROUP BY grp{having} ORDER BY first_row LIMIT ? OFFSET ?")
+            page_params = [*params, *([after] if after is not None else []), fetch, offset]
+        else:
+            # Group ids are numbered in order of first appearance, so an unfiltered page is a range of ids
+            total = conn.execute("SELECT coalesce(max(grp) + 1, 0) FROM founders").fetchone()[0]
+            start = offset
+            if after is not None:
+                row = conn.execute("SELECT grp FROM founders WHERE row_id = ?", (after,)).fetchone()
+                start += row[0] + 1 if row else total
+            page = "SELECT DISTINCT grp, grp AS first_row FROM founders WHERE grp >= ? AND grp < ?"
+            page_params = [start, total if fetch < 0 else start + fetch]
+        # The page's groups come from the (grp, row_id) index; only their rows are read in full
+        also = where.replace(" WHERE ", " AND ", 1)
+        cursor = conn.execute(
+            f"WITH page AS ({page}) "
+            f"SELECT page.first_row, founders.row_id, {self._select('founders', {'Founder ID': 'founder_id'})}, "
+            f"{self._select('founders', FOUNDER_FIELDS)}, "
+            f"{self._select('founders', COMPANY_FIELDS)} "
+            f"FROM page JOIN founders ON founders.grp = page.grp{also} ORDER BY page.first_row, founders.row_id",
+            [*page_params, *params],
+        )
+        company_fields = list(COMPANY_FIELDS.values())
+        founder_fields = list(FOUNDER_FIELDS.values())
+        data = []
+        first_rows = []
+        current = None
+        for first_row, row_id, founder_id, *row in cursor:
+            if first_row != current:
+                if limit is not None and len(data) == limit:
+                    # The extra founder fetched only to tell that more follow
+                    return Page(total, data, first_rows[-1] if first_rows else None)
+                current = first_row
+                first_rows.append(row_id)
+                head = dict(zip(founder_fields, row[:len(founder_fields)]))
+                data.append({
+                    "founder_id": founder_id,
+                    "first_name": head["first_name"],
+                    "last_name": head["last_name"],
+                    "company_count": 0,
+                    "founder_linkedin_url": head["founder_linkedin_url"],
+                    "founder_twitter_url": head["founder_twitter_url"],
+                    "companies": [],
+                })
+            data[-1]["company_count"] += 1
+            data[-1]["companies"].append(dict(zip(company_fields, row[len(founder_fields):])))
+        return Page(total, data)
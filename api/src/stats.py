@@ -0,0 +1,35 @@
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import threading
+
+import orjson
+
+# Written per snapshot by the scraper's generate_rollups.py
+ROLLUPS_FILE = "YC_Rollups.json"
+
+
+class RollupStore:
+    """
+    Per-snapshot aggregate tables, read once and kept until their file changes. Lookups never
+    touch the snapshot's rows, only the small precomputed tables.
+    """
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self._lock = threading.Lock()
+        self._rollups: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+    def get(self, date: str) -> Optional[Dict[str, Any]]:
+        """The rollups for a dataset date, or None when they haven't been generated"""
+        path = self.data_dir / date / ROLLUPS_FILE
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._rollups.get(date)
+            if cached is None or cached[0] != signature:
+                cached = (signature, orjson.loads(path.read_bytes()))
+                self._rollups[date] = cached
+            return cached[1]
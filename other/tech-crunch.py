@@ -1,8 +1,14 @@
 import stealth_requests as requests
 import csv
+import os
+import sys
 from pydantic import BaseModel, HttpUrl, ValidationError, Field
 from typing import Optional
 
+# Shared rate limiting / retry scheduler from the scraper
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraper", "src"))
+from tools.scheduler import Scheduler, check_status
+
 class Company(BaseModel):
     name: str
     link: HttpUrl
@@ -17,6 +23,8 @@ base_url = "https://techcrunch.com/wp-json/tc/v1/get-companies-data?pg="
 total_pages = 75
 csv_file = "techcrunch_disrupt_company_data.csv"
 
+scheduler = Scheduler(rate=2, max_concurrency=1)
+
 csv_headers = ["name", "link", "industry", "event", "image", "location", "money_raised", "status"]
 
 def extract_data(company_json):
@@ -45,7 +53,12 @@ with open(csv_file, mode="w", newline='', encoding="utf-8") as file:
     for page in range(1, total_pages + 1):
         print(f"Processing page {page}...")
         url = f"{base_url}{page}"
-        response = requests.get(url)
+        try:
+            # Throttled (429) and failed (5xx) pages are retried with backoff
+            response = scheduler.for_url(url).call(requests.get, url, check=check_status)
+        except Exception as e:
+            print(f"Failed to retrieve data from page {page} ({e})")
+            continue
         
         if response.status_code == 200:
             data = response.json()
@@ -62,4 +75,5 @@ with open(csv_file, mode="w", newline='', encoding="utf-8") as file:
         else:
             print(f"Failed to retrieve data from page {page} (status code {response.status_code})")
 
+print(f"Scheduler: {scheduler.stats()}")
 print(f"Data successfully validated and saved to {csv_file}")
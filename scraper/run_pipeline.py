@@ -1,30 +1,288 @@
-from datetime import datetime
-import subprocess
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import argparse
+import asyncio
+import hashlib
+import importlib
+import json
 import os
+import sys
+import threading
+import time
+import traceback
 from pathlib import Path
 
-current_date = datetime.now().strftime('%Y-%m-%d')
-# Create path reference to the data directory in parent folder
-data_dir = Path(__file__).resolve().parent.parent / "data" / current_date
-os.makedirs(data_dir, exist_ok=True)
+SCRAPER_DIR = Path(__file__).resolve().parent
+SRC_DIR = SCRAPER_DIR / "src"
+DATA_DIR = SCRAPER_DIR.parent / "data"
+PIPELINE_DIR = ".pipeline"
+MANIFEST_FILE = "manifest.json"
 
-pipeline_steps = [
-    f"uv run python -u src/get_yc_urls.py --date {current_date}",
-    f"uv run python -u src/get_yc_data.py --date {current_date}",
-    #f"uv run python src/generate_statistics.py --date {current_date}",
-    #f"uv run python src/generate_charts.py --date {current_date}",
+class Stage:
+    """
+    One step of the pipeline: the `main(argv)` of a script in src/, the stages it depends on, and
+    the files it reads and writes. Paths are relative to the data directory; "{date}" is filled in.
+    """
+
+    def __init__(self, name, module, argv=(), deps=(), inputs=(), outputs=()):
+        self.name = name
+        self.module = module
+        self.argv = list(argv)
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+
+    def paths(self, patterns, date):
+        return [pattern.format(date=date) for pattern in patterns]
+
+    def run(self, date):
+        module = importlib.import_module(self.module)
+        result = module.main([arg.format(date=date) for arg in self.argv])
+        if asyncio.iscoroutine(result):
+            asyncio.run(result)
+
+# Stages read snapshots through load_snapshot_table, which prefers the Parquet copy, so both
+# formats are declared as inputs.
+COMPANIES = ["{date}/YC_Companies.csv", "{date}/YC_Companies.parquet"]
+FOUNDERS = ["{date}/YC_Founders.csv", "{date}/YC_Founders.parquet"]
+
+STAGES = [
+    Stage("urls", "get_yc_urls", ["--date", "{date}"],
+          outputs=["{date}/YC_URLs.csv"]),
+    Stage("data", "get_yc_data", ["--date", "{date}"], deps=["urls"],
+          inputs=["{date}/YC_URLs.csv"],
+          outputs=COMPANIES + FOUNDERS),
+    Stage("rollups", "generate_rollups", ["--date", "{date}"], deps=["data"],
+          inputs=COMPANIES,
+          outputs=["{date}/YC_Rollups.json"]),
+    # Prints its report rather than writing a file; the report is the stage's log
+    Stage("statistics", "generate_statistics", ["--date", "{date}"], deps=["rollups"],
+          inputs=COMPANIES + ["{date}/YC_Rollups.json"],
+          outputs=[f"{{date}}/{PIPELINE_DIR}/statistics.log"]),
+    Stage("changes", "track_changes", deps=["data"],
+          inputs=COMPANIES + FOUNDERS,
+          outputs=["changes"]),
+    Stage("founders", "index_founders", deps=["data"],
+          inputs=COMPANIES + FOUNDERS,
+          outputs=["founders"]),
+    Stage("charts", "generate_charts", ["--date", "{date}"], deps=["rollups"],
+          inputs=COMPANIES + ["{date}/YC_Rollups.json"],
+          outputs=["{date}/charts"]),
 ]
 
-def run_pipeline_steps(steps):
-    for step in steps:
-        result = subprocess.run(step, shell=True)
-        if result.returncode == 0:
-            print(f"Step succeeded: {step}")
-            print("Output:", result.stdout)
-        else:
-            print(f"Step failed: {step}")
-            print("Error:", result.stderr)
-            break
-
-if __name__=="__main__":
-    run_pipeline_steps(pipeline_steps)
\ No newline at end of file
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class Fingerprints:
+    """
+    Content hashes of stage inputs and outputs. A file whose size and mtime match the previous run
+    reuses its recorded hash instead of being read again.
+    """
+
+    def __init__(self, known=None):
+        self.known = dict(known or {})
+        self._lock = threading.Lock()
+
+    def file(self, path):
+        stat = path.stat()
+        key = str(path)
+        with self._lock:
+            known = self.known.get(key)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+        sha = sha256_file(path)
+        with self._lock:
+            self.known[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha}
+        return sha
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.known)
+
+    def state(self, paths):
+        """relative path -> hash for each declared file, or each file under a declared directory (None if missing)"""
+        state = {}
+        for relative in paths:
+            path = DATA_DIR / relative
+            if path.is_dir():
+                for child in sorted(path.rglob("*")):
+                    if child.is_file() and not child.name.endswith(".tmp"):
+                        state[child.relative_to(DATA_DIR).as_posix()] = self.file(child)
+            else:
+                state[relative] = self.file(path) if path.is_file() else None
+        return state
+
+class StageOutput:
+    """
+    Stand-in for sys.stdout / sys.stderr while stages run in threads: lines written by a stage are
+    echoed with a [stage] prefix and saved to its log file, so output is captured per stage.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+        self._lock = threading.Lock()
+
+    def attach(self, name, log):
+        self.local.name = name
+        self.local.log = log
+        self.local.line_start = True
+
+    def detach(self):
+        self.local.name = None
+
+    def write(self, text):
+        name = getattr(self.local, "name", None)
+        if name is None:
+            return self.stream.write(text)
+        self.local.log.write(text)
+        prefixed = []
+        for line in text.splitlines(keepends=True):
+            if self.local.line_start:
+                prefixed.append(f"[{name}] ")
+            prefixed.append(line)
+            self.local.line_start = line.endswith("\n")
+        with self._lock:
+            self.stream.write("".join(prefixed))
+        return len(text)
+
+    def flush(self):
+        if getattr(self.local, "name", None) is not None:
+            self.local.log.flush()
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+class Pipeline:
+    """
+    Runs the stages as a DAG for one snapshot date. A stage runs once its dependencies succeeded,
+    concurrently with any other stage that is ready. A stage is skipped when its inputs hash the
+    same as on its last successful run and its outputs are still exactly what that run produced.
+    So a re-run after a failure only redoes the failed stage and whatever depends on it.
+    """
+
+    def __init__(self, stages, date, workers=4, force=()):
+        self.stages = {stage.name: stage for stage in stages}
+        self.date = date
+        self.workers = workers
+        self.force = set(force)
+        self.dir = DATA_DIR / date / PIPELINE_DIR
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = self.read_manifest()
+        self.fingerprints = Fingerprints(self.manifest.get("files"))
+        self.streams = ()
+        self._lock = threading.Lock()
+
+    def read_manifest(self):
+        try:
+            with open(self.dir / MANIFEST_FILE, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def write_manifest(self):
+        with self._lock:
+            self.manifest["files"] = self.fingerprints.snapshot()
+            tmp_path = self.dir / f"{MANIFEST_FILE}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(tmp_path, self.dir / MANIFEST_FILE)
+
+    def up_to_date(self, stage, inputs):
+        if stage.name in self.force or "all" in self.force:
+            return False
+        record = self.manifest.get("stages", {}).get(stage.name)
+        if not record or record.get("status") != "ok" or record.get("inputs") != inputs:
+            return False
+        outputs = self.fingerprints.state(stage.paths(stage.outputs, self.date))
+        return bool(outputs) and None not in outputs.values() and record.get("outputs") == outputs
+
+    def run_stage(self, stage):
+        """Run one stage (in a worker thread) and record its hashes and timing. Returns its status."""
+        inputs = self.fingerprints.state(stage.paths(stage.inputs, self.date))
+        if self.up_to_date(stage, inputs):
+            return "skipped", 0.0
+        missing = [path for path, sha in inputs.items() if sha is None]
+        started = time.perf_counter()
+        record = {"started_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+        with open(self.dir / f"{stage.name}.log", 'w', encoding='utf-8') as log:
+            for stream in self.streams:
+                stream.attach(stage.name, log)
+            try:
+                if missing:
+                    raise FileNotFoundError(f"missing inputs: {', '.join(missing)}")
+                stage.run(self.date)
+                record["status"] = "ok"
+            except SystemExit as e:
+                record["status"] = "ok" if not e.code else "failed"
+                record["error"] = None if not e.code else f"exit status {e.code}"
+            except Exception as e:
+                traceback.print_exc()
+                record["status"] = "failed"
+                record["error"] = f"{type(e).__name__}: {e}"
+            finally:
+                for stream in self.streams:
+                    stream.detach()
+        record["seconds"] = round(time.perf_counter() - started, 3)
+        record["inputs"] = inputs
+        record["outputs"] = self.fingerprints.state(stage.paths(stage.outputs, self.date))
+        with self._lock:
+            self.manifest.setdefault("stages", {})[stage.name] = record
+        self.write_manifest()
+        return record["status"], record["seconds"]
+
+    def run(self):
+        """Run every stage that isn't up to date; returns {stage: (status, seconds)}"""
+        results = {}
+        pending = dict(self.stages)
+        self.streams = sys.stdout, sys.stderr = StageOutput(sys.stdout), StageOutput(sys.stderr)
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                running = {}
+                while pending or running:
+                    for name, stage in list(pending.items()):
+                        if any(results.get(dep, ("",))[0] in ("failed", "blocked") for dep in stage.deps):
+                            results[name] = ("blocked", 0.0)
+                            del pending[name]
+                        elif all(dep in results or dep not in self.stages for dep in stage.deps):
+                            running[pool.submit(self.run_stage, stage)] = name
+                            del pending[name]
+                    if not running:
+                        continue
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results[running.pop(future)] = future.result()
+        finally:
+            sys.stdout, sys.stderr = (stream.stream for stream in self.streams)
+        return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the scraping pipeline as a DAG of stages.")
+    parser.add_argument('--date', type=str, default=datetime.now().strftime('%Y-%m-%d'), help="Snapshot date in YYYY-MM-DD format (default: today)")
+    parser.add_argument('--only', nargs='+', choices=[stage.name for stage in STAGES], help="Run only these stages")
+    parser.add_argument('--force', nargs='*', choices=["all"] + [stage.name for stage in STAGES],
+                        help="Re-run these stages (all when no stage is named) even if they are up to date")
+    parser.add_argument('--workers', type=int, default=4, help="Stages that may run at the same time")
+    args = parser.parse_args(argv)
+
+    # The scripts resolve ../data from the scraper directory
+    os.chdir(SCRAPER_DIR)
+    sys.path.insert(0, str(SRC_DIR))
+    stages = [stage for stage in STAGES if not args.only or stage.name in args.only]
+    force = ["all"] if args.force == [] else args.force or []
+    pipeline = Pipeline(stages, args.date, workers=args.workers, force=force)
+    results = pipeline.run()
+
+    print(f"\nPipeline for {args.date} (logs in {pipeline.dir}):")
+    for name, (status, seconds) in results.items():
+        print(f"  {name:<10} {status:<8} {seconds:8.2f}s")
+    if any(status in ("failed", "blocked") for status, _ in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
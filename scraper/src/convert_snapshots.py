@@ -0,0 +1,20 @@
+import os
+import argparse
+
+from tools.snapshots import convert_snapshot, snapshot_directories
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write typed Parquet copies of the snapshot CSVs.")
+    parser.add_argument('--date', type=str, help="Only convert this snapshot (YYYY-MM-DD); default is every snapshot")
+    parser.add_argument('--data-dir', type=str, default='../data', help="Directory holding the dated snapshots")
+    args = parser.parse_args(argv)
+
+    directories = [os.path.join(args.data_dir, args.date)] if args.date else snapshot_directories(args.data_dir)
+    for directory in directories:
+        for parquet_path in convert_snapshot(directory):
+            csv_path = parquet_path[:-len(".parquet")] + ".csv"
+            print(f"{parquet_path}: {os.path.getsize(csv_path) / 1024:.0f} KB -> "
+                  f"{os.path.getsize(parquet_path) / 1024:.0f} KB", flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,51 @@
 import os
+import json
+import hashlib
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import pandas as pd
+import matplotlib
 import matplotlib.pyplot as plt
-from collections import Counter
+
+from tools.rollups import read_rollups
+from tools.snapshots import load_snapshot_table
+
+CHARTS_DIR = "charts"
+MANIFEST_FILE = "manifest.json"
+# Bump when a chart's drawing code changes so existing output is re-rendered
+CHARTS_VERSION = 1
 
 def setup_file_paths(date=None):
     if date:
-        directory = f'data/{date}'
-        directory_file_path = f"data/{date}/YC_Companies.csv"
+        directory = f'../data/{date}'
     else:
-        directory = 'data/'
-        directory_file_path = "data/YC_Companies.csv"
+        directory = '../data/'
     os.makedirs(directory, exist_ok=True)
-    return directory_file_path
-
-def main():
-    parser = argparse.ArgumentParser(description="Fetch YC URLs with date.")
-    parser.add_argument('--date', type=str, help="Current date in YYYY-MM-DD format")
-    args = parser.parse_args()
-    date = args.date
-
-    file_path = setup_file_paths(date=date)
-    data = pd.read_csv(file_path)
+    return directory
 
-    # Set 'Batch' as a categorical type with the original order
-    batches = data['Batch'].unique()  # Get unique batches in the order they appear
-    data['Batch'] = pd.Categorical(data['Batch'], categories=batches, ordered=True)
+def batch_order(rollups):
+    """Batches in the order they appear in the snapshot"""
+    return [row['batch'] for row in rollups['batch_sizes']]
 
+def draw_batch_sizes(directory, rollups):
     # YC Batch Size Over Time
-    batches = data['Batch']
-    batch_counts = Counter(batches)
-    batch_names, counts = zip(*batch_counts.items())
-
-    plt.figure(figsize=(12, 6))
-    plt.bar(batch_names, counts, color='skyblue')
+    batch_sizes = pd.DataFrame(rollups['batch_sizes'])
+    fig = plt.figure(figsize=(12, 6))
+    plt.bar(batch_sizes['batch'], batch_sizes['companies'], color='skyblue')
     plt.title('YC Batch Size Over Time', fontsize=16)
     plt.xlabel('Batch', fontsize=12)
     plt.ylabel('Number of Companies', fontsize=12)
     plt.xticks(rotation=45, ha='right')
     plt.grid(axis='y', linestyle='--', alpha=0.7)
     plt.tight_layout()
-    plt.show()
+    return fig
 
+def draw_status_by_batch(directory, rollups):
     # Batches vs Status
-    batch_status_counts = data.groupby(['Batch', 'Status']).size().unstack()
-    batch_status_percentages = batch_status_counts.div(batch_status_counts.sum(axis=1), axis=0) * 100
-    batch_status_percentages.plot(kind='bar', stacked=True, figsize=(12, 6), colormap='viridis')
+    status_by_batch = pd.DataFrame(rollups['status_by_batch'])
+    batch_status_percentages = status_by_batch.pivot(index='batch', columns='status', values='share').reindex(batch_order(rollups)) * 100
+    ax = batch_status_percentages.plot(kind='bar', stacked=True, figsize=(12, 6), colormap='viridis')
 
     plt.title('Batches vs Status (Percentage)', fontsize=16)
     plt.xlabel('Batch', fontsize=12)
@@ -54,11 +54,13 @@ def main():
     plt.legend(title='Status')
     plt.grid(axis='y', linestyle='--', alpha=0.7)
     plt.tight_layout()
-    plt.show()
+    return ax.get_figure()
 
+def draw_team_size_by_status(directory, rollups):
     # % of Team Size by Status Over Time
-    team_size_by_status = data.groupby(['Batch', 'Status'])['Team Size'].sum()
-    team_size_by_status.plot(kind='bar', stacked=True, figsize=(12, 6))
+    team_size_stats = pd.DataFrame(rollups['team_size_by_batch_status'])
+    team_size_by_status = team_size_stats.pivot(index='batch', columns='status', values='sum').reindex(batch_order(rollups))
+    ax = team_size_by_status.plot(kind='bar', stacked=True, figsize=(12, 6))
 
     plt.title('% of Team Size by Status Over Time', fontsize=16)
     plt.xlabel('Batch', fontsize=12)
@@ -67,19 +69,133 @@ def main():
     plt.legend(title='Status')
     plt.grid(axis='y', linestyle='--', alpha=0.7)
     plt.tight_layout()
-    plt.show()
+    return ax.get_figure()
 
-    # Most common company first letter by status
-    data['First Letter'] = data['Name'].str[0]
-    most_common_letter = data.groupby('Status')['First Letter'].apply(lambda x: x.mode()[0])
-    most_common_letter.plot(kind='bar', figsize=(12, 6), color='purple')
+def draw_first_letter_by_status(directory, rollups):
+    # Most common company first letter by status, with how many companies share it
+    data = load_snapshot_table(directory, "YC_Companies", columns=['Name', 'Status'])
+    data['First Letter'] = data['Name'].str[0].str.upper()
+    letter_counts = data.groupby('Status', observed=True)['First Letter'].value_counts()
+    most_common = letter_counts.groupby(level=0).head(1).reset_index(level=1)
+    ax = most_common['count'].plot(kind='bar', figsize=(12, 6), color='purple')
+    for bar, letter in zip(ax.patches, most_common['First Letter']):
+        ax.annotate(letter, (bar.get_x() + bar.get_width() / 2, bar.get_height()), ha='center', va='bottom', fontsize=12)
     plt.title('Most Common Company First Letter by Status', fontsize=16)
     plt.xlabel('Status', fontsize=12)
-    plt.ylabel('Most Common First Letter', fontsize=12)
+    plt.ylabel('Companies Starting With It', fontsize=12)
     plt.xticks(rotation=0)
     plt.grid(axis='y', linestyle='--', alpha=0.7)
     plt.tight_layout()
-    plt.show()
+    return ax.get_figure()
+
+CHARTS = {
+    "batch_sizes": draw_batch_sizes,
+    "status_by_batch": draw_status_by_batch,
+    "team_size_by_status": draw_team_size_by_status,
+    "first_letter_by_status": draw_first_letter_by_status,
+}
+
+def snapshot_hash(directory):
+    """Content hash of the snapshot the charts are drawn from"""
+    digest = hashlib.sha256()
+    for name in ("YC_Companies.csv", "YC_Companies.parquet"):
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            break
+    return digest.hexdigest()
+
+def render_chart(directory, name, formats):
+    """Render one chart to files under charts/. Runs in a worker process."""
+    plt.switch_backend('Agg')
+    rollups = read_rollups(directory)["tables"]
+    fig = CHARTS[name](directory, rollups)
+    charts_dir = os.path.join(directory, CHARTS_DIR)
+    paths = []
+    for fmt in formats:
+        path = os.path.join(charts_dir, f"{name}.{fmt}")
+        fig.savefig(path, format=fmt, dpi=150)
+        paths.append(path)
+    plt.close(fig)
+    return paths
+
+def read_manifest(charts_dir):
+    try:
+        with open(os.path.join(charts_dir, MANIFEST_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def render_charts(directory, formats=("png", "svg"), workers=None, force=False):
+    """
+    Render every chart for a snapshot into `<snapshot>/charts/`, one process per chart.
+
+    Skipped when the manifest from the last run records the same snapshot hash, chart version and
+    formats and all its files are still there. Returns the files written (empty when skipped).
+    """
+    charts_dir = os.path.join(directory, CHARTS_DIR)
+    os.makedirs(charts_dir, exist_ok=True)
+    manifest = {
+        "snapshot_hash": snapshot_hash(directory),
+        "version": CHARTS_VERSION,
+        "formats": list(formats),
+        "charts": {name: [f"{name}.{fmt}" for fmt in formats] for name in CHARTS},
+    }
+    previous = read_manifest(charts_dir)
+    if not force and previous == manifest and all(
+        os.path.exists(os.path.join(charts_dir, file_name))
+        for files in manifest["charts"].values() for file_name in files
+    ):
+        return []
+
+    # Rollups are shared by the workers, so make sure they are current before fanning out
+    read_rollups(directory)
+    written = []
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers or min(len(CHARTS), os.cpu_count() or 1), mp_context=context) as pool:
+        futures = [pool.submit(render_chart, directory, name, list(formats)) for name in CHARTS]
+        for future in futures:
+            written.extend(future.result())
+
+    tmp_path = os.path.join(charts_dir, f"{MANIFEST_FILE}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(charts_dir, MANIFEST_FILE))
+    return written
+
+def show_charts(directory):
+    """Interactive mode: draw the charts one after another in windows"""
+    rollups = read_rollups(directory)["tables"]
+    for draw in CHARTS.values():
+        draw(directory, rollups)
+        plt.show()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render charts for a YC snapshot.")
+    parser.add_argument('--date', type=str, help="Current date in YYYY-MM-DD format")
+    parser.add_argument('--formats', type=str, default="png,svg", help="Comma-separated output formats")
+    parser.add_argument('--workers', type=int, default=None, help="Rendering processes (default: one per chart, up to the CPU count)")
+    parser.add_argument('--force', action='store_true', help="Re-render even if the snapshot hasn't changed")
+    parser.add_argument('--show', action='store_true', help="Open the charts in windows instead of writing files")
+    args = parser.parse_args(argv)
+    date = args.date
+
+    directory = setup_file_paths(date=date)
+    if args.show:
+        show_charts(directory)
+        return
+
+    # Headless: workers inherit the backend through the environment
+    os.environ['MPLBACKEND'] = 'Agg'
+    matplotlib.use('Agg')
+    formats = tuple(fmt.strip() for fmt in args.formats.split(',') if fmt.strip())
+    written = render_charts(directory, formats=formats, workers=args.workers, force=args.force)
+    if written:
+        print(f"Charts saved to {os.path.join(directory, CHARTS_DIR)} ({len(written)} files)", flush=True)
+    else:
+        print("Snapshot unchanged since the last render, charts are up to date", flush=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
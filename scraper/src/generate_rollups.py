@@ -0,0 +1,21 @@
+import os
+import argparse
+
+from tools.rollups import write_rollups
+from tools.snapshots import snapshot_directories
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Materialize per-snapshot aggregates for the stats API.")
+    parser.add_argument('--date', type=str, help="Only this snapshot (YYYY-MM-DD); default is every snapshot")
+    parser.add_argument('--data-dir', type=str, default='../data', help="Directory holding the dated snapshots")
+    args = parser.parse_args(argv)
+
+    directories = [os.path.join(args.data_dir, args.date)] if args.date else [
+        directory for directory in snapshot_directories(args.data_dir)
+        if any(os.path.exists(os.path.join(directory, f"YC_Companies.{ext}")) for ext in ("csv", "parquet"))
+    ]
+    for directory in directories:
+        print(f"Rollups saved to {write_rollups(directory)}", flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -2,34 +2,34 @@ import os
 import argparse
 import pandas as pd
 
+from tools.rollups import read_rollups
+from tools.snapshots import load_snapshot_table
+
 def setup_file_paths(date=None):
     if date:
-        directory = f'data/{date}'
-        directory_file_path = f"data/{date}/YC_Companies.csv"
+        directory = f'../data/{date}'
     else:
-        directory = 'data/'
-        directory_file_path = "data/YC_Companies.csv"
+        directory = '../data/'
     os.makedirs(directory, exist_ok=True)
-    return directory_file_path
+    return directory
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Fetch YC URLs with date.")
     parser.add_argument('--date', type=str, help="Current date in YYYY-MM-DD format")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     date = args.date
 
-    file_path = setup_file_paths(date=date)
-    yc_data = pd.read_csv(file_path)
-
-    yc_data['Team Size'] = pd.to_numeric(yc_data['Team Size'], errors='coerce')
-    yc_data['Batch'] = yc_data['Batch'].str.strip()
+    directory = setup_file_paths(date=date)
+    # Aggregates come from the snapshot's precomputed rollups
+    rollups = read_rollups(directory)["tables"]
 
-    status_distribution = yc_data['Status'].value_counts()
+    status_distribution = pd.DataFrame(rollups['status_counts']).set_index('status')['companies']
 
     print(f'{status_distribution}')
 
-    team_size_by_status = yc_data.groupby('Status')['Team Size'].describe()
+    team_size_by_status = pd.DataFrame(rollups['team_size_by_status']).set_index('status')
 
+    yc_data = load_snapshot_table(directory, "YC_Companies", columns=['Name', 'Batch', 'Status', 'Team Size'])
     acquisition_data = yc_data[yc_data['Status'].isin(['Acquired', 'Public'])]
     return acquisition_data
 
@@ -1,17 +1,30 @@
 import os
 import argparse
-from pydantic import ValidationError
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode, LXMLWebScrapingStrategy
-from litellm import completion
+from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode, LXMLWebScrapingStrategy, DefaultMarkdownGenerator
+from litellm import acompletion
 import instructor
 import pandas as pd
 import csv
 import asyncio
 
-from tools.extract import extract_company_details
+from tools.extract import aextract_company_batch, pack_batches
+from tools.cache import ExtractionCache
+from tools.parse import FastPathExtractor
+from tools.snapshots import convert_snapshot
+from tools.changes import resolve_company_ids, resolve_founder_companies, url_slug
+from tools.checkpoint import CheckpointJournal, CHECKPOINT_FILE, truncate_to
+from tools.scheduler import Scheduler, check_status, llm_provider
+from tools.metrics import METRICS
+from tools.slim import PageSlimmer, PAGE_TOKEN_BUDGET
 
-COMPANY_HEADER = "Name,Batch,Status,Industry,Team Size,Location\n"
-FOUNDER_HEADER = "Name,Batch,Status,Industry,Team Size,Location,Founder's First Name,Founder's Last Name,Founder's LinkedIn,Founder's Twitter\n"
+COMPANY_HEADER = "Name,Batch,Status,Industry,Team Size,Location,YC URL\n"
+FOUNDER_HEADER = "Name,Batch,Status,Industry,Team Size,Location,Founder's First Name,Founder's Last Name,Founder's LinkedIn,Founder's Twitter,YC URL\n"
+MODEL = "openai/gpt-4o-mini"
+SESSION_PREFIX = "yc_page_session"
+CACHE_DIR = "../data/.cache/extractions"
+BATCH_TOKEN_BUDGET = 48000
+BATCH_LINGER = 0.5  # seconds an extraction worker waits to fill a batch
+REPORTS_DIR = "reports"
 
 def setup_file_paths(date=None):
     if date:
@@ -28,6 +41,7 @@ def setup_file_paths(date=None):
     return Companies_file_path, Founders_file_path, URL_file_path
 
 def get_last_processed_company(file_path):
+    """Row-count resume used before the checkpoint journal; only needed to migrate older outputs."""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             reader = csv.reader(f)
@@ -43,83 +57,372 @@ def get_last_processed_company(file_path):
     except FileNotFoundError:
         return -1
 
-async def main():
+class TimedScrapingStrategy(LXMLWebScrapingStrategy):
+    """HTML cleaning inside crawler.arun, timed on its own"""
+
+    def scrap(self, *args, **kwargs):
+        with METRICS.timer("html_scrape"):
+            return super().scrap(*args, **kwargs)
+
+class TimedMarkdownGenerator(DefaultMarkdownGenerator):
+    """HTML -> markdown conversion inside crawler.arun, timed on its own"""
+
+    def generate_markdown(self, *args, **kwargs):
+        with METRICS.timer("markdown"):
+            return super().generate_markdown(*args, **kwargs)
+
+def build_crawler_config(session_id):
+    """Crawler config for one fetch worker. Each worker gets its own browser session (page)."""
+    return CrawlerRunConfig(only_text=True,
+                            cache_mode=CacheMode.BYPASS,
+                            exclude_external_images=True,
+                            excluded_tags=["header", "footer"],
+                            session_id=session_id,
+                            scraping_strategy=TimedScrapingStrategy(),
+                            markdown_generator=TimedMarkdownGenerator())
+
+def format_company_row(company_extract, company_url):
+    return (
+        f'"{company_extract.get("name")}",{company_extract.get("batch")},'
+        f'{company_extract.get("status")},"{company_extract.get("industry")}",'
+        f'{company_extract.get("team_size")},{company_extract.get("city")},{company_url}\n'
+    )
+
+def format_founder_rows(company_extract, company_url):
+    if company_extract.get("founders") is None:
+        return []
+    return [
+        f'"{company_extract.get("name")}",{company_extract.get("batch")},'
+        f'{company_extract.get("status")},"{company_extract.get("industry")}",'
+        f'{company_extract.get("team_size")},{company_extract.get("city")},'
+        f'{founder.get("first_name")},{founder.get("last_name")},'
+        f'{founder.get("founder_linkedin_url", "")},{founder.get("founder_twitter_url", "")},{company_url}\n'
+        for founder in company_extract["founders"]
+    ]
+
+async def produce_urls(jobs, url_queue, window, fetch_workers):
+    """Feed (seq, index, url) jobs to the fetch stage. The window caps how far ahead of the writer we run."""
+    for seq, (index, company_url) in enumerate(jobs):
+        await window.acquire()
+        await url_queue.put((seq, index, company_url))
+    for _ in range(fetch_workers):
+        await url_queue.put(None)
+
+async def fetch_pages(worker_id, crawler, url_queue, page_queue, total, scheduler):
+    """
+    Fetch stage: crawl company pages and pass their markdown on to the extract stage. Page loads
+    share the host's scheduler lane, which paces them and retries throttled or failed loads.
+    """
+    session_id = f"{SESSION_PREFIX}_{worker_id}"
+    crawler_conf = build_crawler_config(session_id)
+    arun = METRICS.timed("page_fetch")(crawler.arun)
+    try:
+        while True:
+            job = await url_queue.get()
+            if job is None:
+                break
+            seq, index, company_url = job
+            print(f"({index + 1}/{total}) Extracting {company_url}...", flush=True)
+            markdown = None
+            try:
+                result = await scheduler.for_url(company_url).acall(
+                    arun, url=company_url, config=crawler_conf, check=check_status)
+                markdown = result.markdown
+            except Exception as e:
+                print(f"Crawl error for {company_url}: {e}", flush=True)
+            await page_queue.put((seq, company_url, markdown))
+    finally:
+        await crawler.crawler_strategy.kill_session(session_id)
+
+async def extract_pages(client, page_queue, result_queue, cache=None, fast_path=None,
+                        batch_size=1, token_budget=BATCH_TOKEN_BUDGET, lane=None, slimmer=None):
+    """
+    Extract stage: parse the page with the rule-based fast path, then reuse cached extractions
+    for unchanged pages. Pages that miss both are collected into batches of up to `batch_size`
+    and sent to the LLM together, through the provider's scheduler `lane`. With a `slimmer`, each
+    of those pages is first trimmed to the sections the schema uses. Cache keys stay the full page.
+    """
+    finished = False
+    while not finished:
+        llm_pages = []
+        while len(llm_pages) < batch_size:
+            try:
+                # Block for the first page of a batch, then linger briefly to fill it.
+                if llm_pages:
+                    page = await asyncio.wait_for(page_queue.get(), BATCH_LINGER)
+                else:
+                    page = await page_queue.get()
+            except asyncio.TimeoutError:
+                break
+            if page is None:
+                finished = True
+                break
+            seq, company_url, markdown = page
+            company_extract = None
+            if markdown is None:
+                await result_queue.put((seq, company_url, None, "crawl failed"))
+                continue
+            if not markdown.strip():
+                # Nothing to extract from: recorded as skipped, not failed
+                await result_queue.put((seq, company_url, None, None))
+                continue
+            if fast_path is not None:
+                with METRICS.timer("fast_path"):
+                    company_extract = fast_path.extract(markdown)
+            if company_extract is None and cache is not None:
+                with METRICS.timer("cache_lookup"):
+                    company_extract = cache.get(markdown)
+            if company_extract is None:
+                llm_pages.append(page)
+                continue
+            await result_queue.put((seq, company_url, company_extract, None))
+
+        if not llm_pages:
+            continue
+        extracts = {}
+        prompts = [(company_url, slimmer.slim(company_url, markdown) if slimmer is not None else markdown)
+                   for _, company_url, markdown in llm_pages]
+        for batch in pack_batches(prompts, batch_size, token_budget):
+            extracts.update(await aextract_company_batch(client, batch, model=MODEL, lane=lane))
+        for seq, company_url, markdown in llm_pages:
+            company_extract = extracts.get(company_url)
+            if company_extract is not None and cache is not None:
+                # The cache only saves later LLM calls; failing to write it must not lose this result
+                try:
+                    cache.put(markdown, company_extract)
+                except (OSError, ValueError) as e:
+                    METRICS.count("cache_put_errors")
+                    print(f"Could not cache the extraction for {company_url}: {e}", flush=True)
+            error = None if company_extract is not None else "extraction failed"
+            await result_queue.put((seq, company_url, company_extract, error))
+
+def checkpoint_offsets(company_list, founder_list):
+    """Flush both outputs and return their sizes, as recorded in the checkpoint journal"""
+    company_list.flush()
+    founder_list.flush()
+    return {"companies": company_list.tell(), "founders": founder_list.tell()}
+
+async def write_results(result_queue, window, total_jobs, company_list, founder_list, journal=None):
+    """
+    Single writer: re-orders results by seq so the CSVs keep the YC_URLs.csv order, and checkpoints
+    each URL together with the file sizes after its rows.
+    """
+    pending = {}
+    next_seq = 0
+    while next_seq < total_jobs:
+        seq, company_url, company_extract, error = await result_queue.get()
+        pending[seq] = (company_url, company_extract, error)
+        while next_seq in pending:
+            company_url, company_extract, error = pending.pop(next_seq)
+            if company_extract is not None:
+                with METRICS.timer("csv_write"):
+                    company_list.write(format_company_row(company_extract, company_url))
+                    founder_list.writelines(format_founder_rows(company_extract, company_url))
+                status = "ok"
+            else:
+                status = "failed" if error else "skipped"
+            with METRICS.timer("checkpoint"):
+                offsets = checkpoint_offsets(company_list, founder_list)
+                if journal is not None:
+                    journal.record(company_url, status, offsets, error)
+            METRICS.count("companies", status=status)
+            next_seq += 1
+            window.release()
+
+async def run_extraction(jobs, total, client, crawler, company_list, founder_list, concurrency,
+                         cache=None, fast_path=None, batch_size=1, token_budget=BATCH_TOKEN_BUDGET,
+                         journal=None, scheduler=None, slimmer=None):
+    """Run the fetch -> extract -> write pipeline with `concurrency` workers per stage."""
+    url_queue = asyncio.Queue(maxsize=concurrency * 2)
+    page_queue = asyncio.Queue(maxsize=concurrency * batch_size * 2)
+    result_queue = asyncio.Queue(maxsize=concurrency * batch_size * 2)
+    window = asyncio.Semaphore(concurrency * max(4, batch_size * 2))
+    scheduler = scheduler or Scheduler(max_concurrency=concurrency)
+
+    async def fetch_stage():
+        await asyncio.gather(*(fetch_pages(worker_id, crawler, url_queue, page_queue, total, scheduler)
+                               for worker_id in range(concurrency)))
+        for _ in range(concurrency):
+            await page_queue.put(None)
+
+    await asyncio.gather(
+        produce_urls(jobs, url_queue, window, concurrency),
+        fetch_stage(),
+        *(extract_pages(client, page_queue, result_queue, cache, fast_path, batch_size, token_budget,
+                        scheduler.for_model(MODEL), slimmer)
+          for _ in range(concurrency)),
+        write_results(result_queue, window, len(jobs), company_list, founder_list, journal),
+    )
+
+def read_header(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.readline()
+
+def read_legacy_output(path, header):
+    """Rows of an output CSV written before the YC URL column, with or without its old header"""
+    columns = header.strip().split(",")[:-1]
+    if os.path.getsize(path) == 0:
+        return pd.DataFrame(columns=columns)
+    df = pd.read_csv(path, header=None, dtype=str, keep_default_na=False)
+    if df.shape[1] != len(columns):
+        raise SystemExit(f"{path} has {df.shape[1]} columns, expected {len(columns)}: can't resume into it")
+    df.columns = columns
+    if len(df) and df.iloc[0, 0] == columns[0] and df.iloc[0, 1] == columns[1]:
+        df = df.iloc[1:].reset_index(drop=True)
+    return df
+
+def add_url_column(Companies_file_path, Founders_file_path, urls):
+    """
+    Rewrite outputs from before the YC URL column with the current headers, so rows appended on
+    resume have the same columns. Rows are matched to their URL the way the change log matches
+    old snapshots; rows that can't be placed get an empty URL.
+    """
+    companies = read_legacy_output(Companies_file_path, COMPANY_HEADER)
+    founders = read_legacy_output(Founders_file_path, FOUNDER_HEADER)
+    by_slug = {url_slug(url): url for url in urls}
+    company_ids = resolve_company_ids(companies, urls)
+    founder_ids = resolve_founder_companies(founders, companies, company_ids)
+    companies["YC URL"] = [by_slug.get(company_id, "") for company_id in company_ids]
+    founders["YC URL"] = [by_slug.get(company_id, "") for company_id in founder_ids]
+    for df, path in ((companies, Companies_file_path), (founders, Founders_file_path)):
+        tmp_path = f"{path}.tmp"
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    print(f"Added the YC URL column to {Companies_file_path} and {Founders_file_path}", flush=True)
+
+def prepare_outputs(journal, Companies_file_path, Founders_file_path, urls):
+    """
+    Bring the output CSVs in line with the checkpoint journal before resuming.
+
+    With a journal, each file is truncated to the size recorded with the last checkpointed URL,
+    dropping anything written after it. Without one, new files get their headers, and outputs
+    from before the journal existed are migrated: URLs are read from their YC URL column, or
+    for the oldest files inferred from the row count the way resume used to work, and those
+    files are rewritten with the YC URL column first. Outputs with a checkpoint but an old
+    header can't be rewritten without invalidating the checkpoint, so resume is refused.
+    """
+    files = {"companies": (Companies_file_path, COMPANY_HEADER), "founders": (Founders_file_path, FOUNDER_HEADER)}
+    for path, _ in files.values():
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8'):
+                pass
+
+    offsets = journal.offsets()
+    if offsets:
+        for name, (path, _) in files.items():
+            dropped = truncate_to(path, offsets.get(name, 0))
+            if dropped:
+                print(f"Dropped {dropped} bytes written after the last checkpoint from {path}", flush=True)
+
+    sizes = {name: os.path.getsize(path) for name, (path, _) in files.items()}
+    if offsets and any(size and read_header(path) != header for (path, header), size in zip(files.values(), sizes.values())):
+        raise SystemExit("The outputs have an older header than the checkpoint journal expects. "
+                         "Move them (and the journal) aside to start over.")
+    if sizes["companies"] == 0:
+        for path, header in files.values():
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(header)
+        journal.set_offsets({name: os.path.getsize(path) for name, (path, _) in files.items()})
+    elif not offsets:
+        existing = pd.read_csv(Companies_file_path, dtype=str)
+        if "YC URL" in existing.columns:
+            done = existing["YC URL"].dropna().tolist()
+        else:
+            done = urls[:max(0, get_last_processed_company(Companies_file_path) - 1)]
+            add_url_column(Companies_file_path, Founders_file_path, urls)
+            sizes = {name: os.path.getsize(path) for name, (path, _) in files.items()}
+        journal.record_many(done, "ok", offsets=sizes)
+        print(f"Migrated {len(done)} processed companies into the checkpoint journal", flush=True)
+
+async def main(argv=None):
     parser = argparse.ArgumentParser(description="Fetch YC URLs with date.")
     parser.add_argument('--date', type=str, help="Current date in YYYY-MM-DD format")
-    args = parser.parse_args()
+    parser.add_argument('--concurrency', type=int, default=8, help="Number of parallel fetch and extraction workers")
+    parser.add_argument('--cache-dir', type=str, default=CACHE_DIR, help="Directory of the extraction cache")
+    parser.add_argument('--no-cache', action='store_true', help="Always call the LLM, ignoring cached extractions")
+    parser.add_argument('--cache-max-age-days', type=float, default=30, help="Cached extractions older than this are re-extracted")
+    parser.add_argument('--cache-max-mb', type=float, default=200, help="Maximum size of the extraction cache")
+    parser.add_argument('--batch-size', type=int, default=1, help="Number of company pages per LLM request")
+    parser.add_argument('--batch-token-budget', type=int, default=BATCH_TOKEN_BUDGET, help="Approximate input tokens per LLM request")
+    parser.add_argument('--no-fast-path', action='store_true', help="Skip the rule-based parser and always use the LLM")
+    parser.add_argument('--page-token-budget', type=int, default=PAGE_TOKEN_BUDGET, help="Trim each page sent to the LLM to about this many tokens")
+    parser.add_argument('--no-slim', action='store_true', help="Send whole pages to the LLM instead of the relevant sections")
+    parser.add_argument('--retry-failed', action='store_true', help="Only re-process URLs the checkpoint journal recorded as failed")
+    parser.add_argument('--crawl-rate', type=float, default=4, help="Page loads per second per host (lowered automatically on 429s)")
+    parser.add_argument('--llm-rate', type=float, default=5, help="LLM requests per second per provider")
+    parser.add_argument('--llm-tpm', type=int, default=200000, help="LLM input tokens per minute per provider (0 for no limit)")
+    parser.add_argument('--report', type=str, help="Where to write the JSON run report (default: <snapshot>/reports/get_yc_data.json)")
+    parser.add_argument('--prometheus', type=str, help="Also write the run's metrics in Prometheus text format to this file")
+    args = parser.parse_args(argv)
     date = args.date
+    concurrency = max(1, args.concurrency)
 
     Companies_file_path, Founders_file_path, YC_URL_file_path = setup_file_paths(date)
     df = pd.read_csv(YC_URL_file_path)
+    urls = df['YC URL'].tolist()
 
-    # Create files if they don't exist.
-    if not os.path.exists(Companies_file_path):
-        with open(Companies_file_path, 'w', encoding='utf-8') as company_list:
-            pass
-    if not os.path.exists(Founders_file_path):
-        with open(Founders_file_path, 'w', encoding='utf-8') as founder_list:
-            pass
+    # Resume from the checkpoint journal kept next to the outputs
+    journal = CheckpointJournal(os.path.join(os.path.dirname(Companies_file_path), CHECKPOINT_FILE))
+    prepare_outputs(journal, Companies_file_path, Founders_file_path, urls)
+    print(f"Companies processed so far: {journal.stats()}", flush=True)
 
-    completed_company_count = get_last_processed_company(Companies_file_path)
-    print(f"Companies processed so far: {completed_company_count}", flush=True)
-
-    client = instructor.from_litellm(completion)
+    client = instructor.from_litellm(acompletion)
+    cache = None
+    if not args.no_cache:
+        cache = ExtractionCache(args.cache_dir, model=MODEL,
+                                max_age_days=args.cache_max_age_days,
+                                max_bytes=int(args.cache_max_mb * 1024 * 1024))
+    fast_path = None if args.no_fast_path else FastPathExtractor()
+    slimmer = None if args.no_slim else PageSlimmer(args.page_token_budget)
 
     # Crawl4ai setup
     browser_conf = BrowserConfig(headless=True)
-    session_id = "yc_page_session"
-    crawler_conf = CrawlerRunConfig(only_text=True,
-                              cache_mode=CacheMode.BYPASS,
-                              exclude_external_images=True,
-                              excluded_tags=["header", "footer"],
-                              session_id=session_id,
-                              scraping_strategy=LXMLWebScrapingStrategy())
 
+    # Each URL is looked up once in the journal; duplicates in YC_URLs.csv are processed once
+    statuses = journal.statuses()
+    jobs, queued = [], set()
+    for index, company_url in enumerate(urls):
+        status = statuses.get(company_url)
+        wanted = status == "failed" if args.retry_failed else status is None
+        if wanted and company_url not in queued:
+            queued.add(company_url)
+            jobs.append((index, company_url))
+    print(f"Extracting {len(jobs)} companies with {concurrency} workers...", flush=True)
+
+    # Rate limits and adaptive concurrency shared by all workers, per host and per LLM provider
+    scheduler = Scheduler(
+        limits={f"llm:{llm_provider(MODEL)}": {"rate": args.llm_rate, "tokens_per_minute": args.llm_tpm or None}},
+        rate=args.crawl_rate, max_concurrency=concurrency,
+    )
+
+    METRICS.reset()
     # Open the output files once.
     with open(Companies_file_path, 'a', encoding='utf-8') as company_list, \
          open(Founders_file_path, 'a', encoding='utf-8') as founder_list:
-        if completed_company_count == -1:
-            company_list.write(COMPANY_HEADER)
-            founder_list.write(FOUNDER_HEADER)
-
-        # Loop over each URL in the CSV.
         async with AsyncWebCrawler(config=browser_conf) as crawler:
-            for index, row in df.iterrows():
-                if index < completed_company_count - 1:
-                    continue
-
-                company_url = row['YC URL']
-                print(f"({index + 1}/{len(df)}) Extracting {company_url}...", flush=True)
-                try:
-                    result = await crawler.arun(url=company_url, config=crawler_conf)
-                    #print(result.markdown)
-                    if result.markdown is None:
-                        continue
-
-                    company_extract = extract_company_details(client, result.markdown, model="openai/gpt-4o-mini")
-                    
-                    # Write company data.
-                    company_list.write(
-                        f'"{company_extract.get("name")}",{company_extract.get("batch")},'
-                        f'{company_extract.get("status")},"{company_extract.get("industry")}",'
-                        f'{company_extract.get("team_size")},{company_extract.get("city")}\n'
-                    )
-                    
-                    if company_extract.get("founders") is not None:
-                        for founder in company_extract["founders"]:
-                            founder_list.write(
-                                f'"{company_extract.get("name")}",{company_extract.get("batch")},'
-                                f'{company_extract.get("status")},"{company_extract.get("industry")}",'
-                                f'{company_extract.get("team_size")},{company_extract.get("city")},'
-                                f'{founder.get("first_name")},{founder.get("last_name")},'
-                                f'{founder.get("founder_linkedin_url", "")},{founder.get("founder_twitter_url", "")}\n'
-                            )
-                except ValidationError as e:
-                    print(f"Validation error for {company_url}: {e}", flush=True)
-        await crawler.crawler_strategy.kill_session(session_id)
+            await run_extraction(jobs, len(df), client, crawler, company_list, founder_list, concurrency,
+                                 cache, fast_path, max(1, args.batch_size), args.batch_token_budget, journal, scheduler, slimmer)
 
     print(f"Data saved to {Companies_file_path} and {Founders_file_path}", flush=True)
+    print(f"Checkpoint: {journal.stats()}", flush=True)
+    print(f"Scheduler: {scheduler.stats()}", flush=True)
+    journal.close()
+    for parquet_path in convert_snapshot(os.path.dirname(Companies_file_path)):
+        print(f"Typed snapshot saved to {parquet_path}", flush=True)
+    if fast_path is not None:
+        print(fast_path.stats(), flush=True)
+    if slimmer is not None:
+        print(slimmer.stats(), flush=True)
+    if cache is not None:
+        cache.evict()
+        print(cache.stats(), flush=True)
+
+    report_path = args.report or os.path.join(os.path.dirname(Companies_file_path), REPORTS_DIR, "get_yc_data.json")
+    METRICS.write(report_path, args.prometheus, script="get_yc_data", date=date, companies=len(jobs),
+                  concurrency=concurrency, scheduler=scheduler.stats(),
+                  slimming={"pages": slimmer.pages, "tokens_in": slimmer.tokens_in, "tokens_out": slimmer.tokens_out} if slimmer else None)
+    print(f"Run report saved to {report_path}", flush=True)
 
 if __name__ == "__main__":
     # Run the async main function.
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -2,58 +2,66 @@ import os
 import pandas as pd
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException
-from tools.web_driver import setup_driver, scroll_to_bottom
+from tools.web_driver import DriverPool, scroll_to_bottom
+from tools.directory_api import DirectoryClient, FixtureSession, RecordingSession
+from tools.scheduler import Scheduler
+from tools.metrics import METRICS
 import argparse
 import concurrent.futures
 import time
 from tqdm import tqdm
 
-def get_all_urls(batch_code):
-    """Fetch all startup URLs for a given YC batch."""
-    driver = setup_driver()
-    try:
-        url = f'https://www.ycombinator.com/companies?batch={batch_code}'
-        driver.get(url)
-        
-        time.sleep(1)
+EXCLUDED_CATEGORIES = {"founders", "black-founders", "hispanic-latino-founders", "women-founders"}
 
-        # Scroll to load all companies on the page
-        scroll_to_bottom(driver, pause_before=0.4, pause_after=0.2)
+def company_urls(driver):
+    """Company links on the current page, reading each href once."""
+    hrefs = (link.get_attribute("href") for link in driver.find_elements(By.TAG_NAME, "a"))
+    return [
+        href for href in hrefs
+        if href and "/companies/" in href
+           and not any(category in href for category in EXCLUDED_CATEGORIES)
+    ]
 
-        # Extract and filter URLs
-        links = driver.find_elements(By.TAG_NAME, "a")
-        excluded_categories = {"founders", "black-founders", "hispanic-latino-founders", "women-founders"}
-        urls = [
-            link.get_attribute("href")
-            for link in links
-            if link.get_attribute("href") and "/companies/" in link.get_attribute("href")
-               and not any(category in link.get_attribute("href") for category in excluded_categories)
-        ]
+def load_batch_page(driver, url):
+    driver.get(url)
+    time.sleep(1)
+    # Scroll to load all companies on the page
+    scroll_to_bottom(driver, pause_before=0.4, pause_after=0.2)
+    return company_urls(driver)
 
-        return batch_code, urls
-    except TimeoutException:
-        print(f"Timeout while loading batch {batch_code}. Retrying...")
-        # Simple retry logic
-        time.sleep(2)
+@METRICS.timed("batch_urls", backend="selenium")
+def get_all_urls(batch_code, pool, scheduler):
+    """
+    Fetch all startup URLs for a given YC batch using a driver from the pool. Page loads go
+    through the directory host's scheduler lane, which retries timeouts with backoff.
+    """
+    url = f'https://www.ycombinator.com/companies?batch={batch_code}'
+    with pool.driver() as driver:
         try:
-            # Second attempt
-            driver.get(url)
-            driver.wai
-            scroll_to_bottom(driver, pause_before=0.3, pause_after=0.3)
-            links = driver.find_elements(By.TAG_NAME, "a")
-            urls = [link.get_attribute("href") for link in links
-                    if link.get_attribute("href") and "/companies/" in link.get_attribute("href")
-                    and not any(category in link.get_attribute("href") for category in excluded_categories)]
-            return batch_code, urls
-        except Exception:
+            return batch_code, scheduler.for_url(url).call(load_batch_page, driver, url)
+        except Exception as e:
+            print(f"Error retrieving URLs for batch {batch_code}: {e}")
+            pool.mark_broken(driver)
             return batch_code, []
+
+@METRICS.timed("batch_urls", backend="http")
+def get_all_urls_http(batch_code, client):
+    """Fetch all startup URLs for a given YC batch from the directory's search endpoint."""
+    try:
+        return batch_code, client.get_batch_urls(batch_code)
     except Exception as e:
         print(f"Error retrieving URLs for batch {batch_code}: {e}")
         return batch_code, []
-    finally:
-        driver.quit()
 
-def main():
+def build_directory_client(fixtures_dir=None, record_dir=None, scheduler=None):
+    if fixtures_dir:
+        return DirectoryClient(FixtureSession(fixtures_dir), scheduler=scheduler)
+    if record_dir:
+        import stealth_requests
+        return DirectoryClient(RecordingSession(stealth_requests, record_dir), scheduler=scheduler)
+    return DirectoryClient(scheduler=scheduler)
+
+def main(argv=None):
     """Main script to fetch and save YC company URLs."""
     batch_file_path = "../data/YC_Batches.csv"
 
@@ -61,7 +69,15 @@ def main():
     parser = argparse.ArgumentParser(description="Fetch YC URLs with date.")
     parser.add_argument('--date', type=str, help="Current date in YYYY-MM-DD format")
     parser.add_argument('--workers', type=int, default=6, help="Number of parallel workers")
-    args = parser.parse_args()
+    parser.add_argument('--driver-max-uses', type=int, default=10, help="Recycle a browser after this many batches (selenium backend)")
+    parser.add_argument('--backend', choices=['selenium', 'http'], default='selenium',
+                        help="Scroll the directory in Chrome, or query its search endpoint over HTTP")
+    parser.add_argument('--fixtures', type=str, help="Replay recorded HTTP responses from this directory (http backend)")
+    parser.add_argument('--record-fixtures', type=str, help="Record HTTP responses into this directory (http backend)")
+    parser.add_argument('--rate', type=float, default=4, help="Requests per second per host (lowered automatically on 429s)")
+    parser.add_argument('--report', type=str, help="Where to write the JSON run report (default: <snapshot>/reports/get_yc_urls.json)")
+    parser.add_argument('--prometheus', type=str, help="Also write the run's metrics in Prometheus text format to this file")
+    args = parser.parse_args(argv)
     date = args.date
     max_workers = args.workers
 
@@ -89,10 +105,26 @@ def main():
 
     # Process batches in parallel
     batches = list(df_batches['Batch'])
-    print(f"Processing {len(batches)} batches with {max_workers} workers...")
-    
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        results = list(tqdm(executor.map(get_all_urls, batches), total=len(batches), desc="Fetching batches"))
+    print(f"Processing {len(batches)} batches with {max_workers} workers ({args.backend} backend)...")
+
+    METRICS.reset()
+    # Shared by the workers: per-host rate limit, adaptive concurrency and retries with backoff
+    scheduler = Scheduler(rate=args.rate, max_concurrency=max_workers)
+    if args.backend == 'http':
+        client = build_directory_client(args.fixtures, args.record_fixtures, scheduler)
+        fetch_batch = lambda batch: get_all_urls_http(batch, client)
+    else:
+        pool = DriverPool(size=max_workers, max_uses=args.driver_max_uses)
+        fetch_batch = lambda batch: get_all_urls(batch, pool, scheduler)
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(tqdm(executor.map(fetch_batch, batches), total=len(batches), desc="Fetching batches"))
+    finally:
+        print(f"Scheduler: {scheduler.stats()}")
+        if args.backend == 'selenium':
+            print(f"Driver pool: {pool.stats()}")
+            pool.close()
     
     # Process results
     for batch, urls in results:
@@ -127,5 +159,11 @@ def main():
     df_batches.to_csv(batch_file_path, index=False)
     print(f"Batch counts updated in {batch_file_path}.")
 
+    METRICS.count("urls", len(all_urls))
+    report_path = args.report or os.path.join(output_dir, "reports", "get_yc_urls.json")
+    METRICS.write(report_path, args.prometheus, script="get_yc_urls", date=date, batches=len(batches),
+                  backend=args.backend, scheduler=scheduler.stats())
+    print(f"Run report saved to {report_path}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,18 @@
+import argparse
+
+from tools.founders import update_founder_index
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve founder identities across every snapshot into the founder index.")
+    parser.add_argument('--data-dir', type=str, default='../data', help="Directory holding the dated snapshots")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild the index even if it is newer than every snapshot")
+    args = parser.parse_args(argv)
+
+    path = update_founder_index(args.data_dir, rebuild=args.rebuild)
+    if path:
+        print(f"Founder index saved to {path}", flush=True)
+    else:
+        print("Founder index is up to date", flush=True)
+
+if __name__ == "__main__":
+    main()
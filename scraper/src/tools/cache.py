@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from pydantic import ValidationError
+
+from .models import YC_Company
+
+def normalize_markdown(markdown: str) -> str:
+    """Collapse whitespace so cosmetic re-renders of the same page hash identically."""
+    lines = (re.sub(r"[ \t]+", " ", line).strip() for line in markdown.splitlines())
+    return "\n".join(line for line in lines if line)
+
+def markdown_key(markdown: str, model: str) -> str:
+    """Content address of a page: hash of the normalized markdown and the model that extracted it."""
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\n")
+    digest.update(normalize_markdown(markdown).encode("utf-8"))
+    return digest.hexdigest()
+
+class ExtractionCache:
+    """
+    On-disk cache of YC_Company extractions keyed by the normalized page markdown.
+
+    Entries are JSON files sharded by the first two hex digits of the key. Entries older than
+    `max_age_days` are treated as misses. `evict()` drops entries that have not been used within
+    `max_age_days`, then the least recently used ones until the cache fits in `max_bytes`.
+    """
+
+    def __init__(self, cache_dir, model: str, max_age_days: float = 30, max_bytes: int = 200 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.model = model
+        self.max_age = max_age_days * 24 * 60 * 60
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, markdown: str):
+        """Return the cached extraction for this page, or None on a miss."""
+        path = self._path(markdown_key(markdown, self.model))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if time.time() - entry["created_at"] > self.max_age:
+                raise KeyError("expired")
+            company = YC_Company.model_validate(entry["company"])
+        except (FileNotFoundError, KeyError, ValueError, ValidationError):
+            self.misses += 1
+            return None
+        # Bump the mtime so size-based eviction is least-recently-used.
+        os.utime(path)
+        self.hits += 1
+        return company.model_dump()
+
+    def put(self, markdown: str, company_extract: dict):
+        """Store an extraction. Written to a temp file and renamed so readers never see partial JSON."""
+        path = self._path(markdown_key(markdown, self.model))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "created_at": time.time(),
+            "model": self.model,
+            "company": YC_Company.model_validate(company_extract).model_dump(mode="json"),
+        }
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def evict(self):
+        """Drop entries unused for max_age_days, then the least recently used ones until under max_bytes."""
+        now = time.time()
+        entries = []
+        for path in self.cache_dir.glob("*/*.json"):
+            stat = path.stat()
+            if now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                self.evictions += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> str:
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups * 100 if lookups else 0.0
+        return (f"Extraction cache: {self.hits} hits, {self.misses} misses "
+                f"({hit_rate:.1f}% hit rate), {self.evictions} evicted")
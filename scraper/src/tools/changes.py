@@ -0,0 +1,179 @@
+import os
+import re
+import difflib
+import pandas as pd
+
+from tools.snapshots import load_snapshot_table, snapshot_directories, write_snapshot_parquet
+
+URL_COLUMN = "YC URL"
+CHANGES_DIR = "changes"
+CHANGE_COLUMNS = ["From", "To", "Company", "Name", "Batch", "Field", "Change", "Old", "New"]
+
+def url_slug(url):
+    """https://www.ycombinator.com/companies/weave-2 -> weave-2"""
+    return str(url).rstrip("/").rsplit("/", 1)[-1]
+
+def name_slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", str(name).lower()).strip("-")
+
+def resolve_company_ids(companies, urls):
+    """
+    Stable identity for each company row: the slug of its YC URL.
+
+    Snapshots written before the CSVs carried a YC URL column list companies in YC_URLs.csv order,
+    minus pages that failed to extract. Those rows are aligned with the URL list on name slugs,
+    and rows between two aligned anchors are paired up by position when both sides have the same
+    count (this is what tells "Weave" apart from weave-2). Rows that still can't be placed fall back
+    to a name-based id.
+    """
+    if URL_COLUMN in companies.columns and companies[URL_COLUMN].notna().all():
+        return [url_slug(url) for url in companies[URL_COLUMN]]
+    names = [name_slug(name) for name in companies["Name"]]
+    slugs = [url_slug(url) for url in urls]
+    ids = [None] * len(names)
+    matcher = difflib.SequenceMatcher(None, names, slugs, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal" or (tag == "replace" and i2 - i1 == j2 - j1):
+            ids[i1:i2] = slugs[j1:j2]
+    return [company_id or f"name:{name}" for company_id, name in zip(ids, names)]
+
+def resolve_founder_companies(founders, companies, company_ids):
+    """
+    Company id for each founder row. Founder rows follow the company rows in the same order, so
+    each one is matched to the next company row with the same name.
+    """
+    if URL_COLUMN in founders.columns and founders[URL_COLUMN].notna().all():
+        return [url_slug(url) for url in founders[URL_COLUMN]]
+    names = companies["Name"].tolist()
+    by_name = dict(zip(reversed(names), reversed(company_ids)))
+    ids = []
+    position = 0
+    for name in founders["Name"]:
+        match = position
+        while match < len(names) and names[match] != name:
+            match += 1
+        if match < len(names):
+            position = match
+            ids.append(company_ids[match])
+        else:
+            ids.append(by_name.get(name))
+    return ids
+
+def founder_name(first, last):
+    return " ".join(str(part) for part in (first, last) if isinstance(part, str) and part)
+
+def load_identified_snapshot(directory):
+    """Companies indexed by company id, and each company's set of founder names"""
+    companies = load_snapshot_table(directory, "YC_Companies")
+    urls = pd.read_csv(os.path.join(directory, "YC_URLs.csv"))["YC URL"].tolist()
+    company_ids = resolve_company_ids(companies, urls)
+
+    founders = {}
+    try:
+        founder_rows = load_snapshot_table(directory, "YC_Founders")
+    except FileNotFoundError:
+        founder_rows = None
+    if founder_rows is not None:
+        owners = resolve_founder_companies(founder_rows, companies, company_ids)
+        for owner, first, last in zip(owners, founder_rows["Founder's First Name"], founder_rows["Founder's Last Name"]):
+            name = founder_name(first, last)
+            if owner is not None and name:
+                founders.setdefault(owner, set()).add(name)
+
+    companies = companies.assign(Company=company_ids).drop_duplicates("Company").set_index("Company")
+    return companies, founders
+
+def _text(value):
+    return None if pd.isna(value) else str(value)
+
+def diff_snapshots(old, new, from_date, to_date):
+    """
+    Change rows between two identified snapshots: companies added or removed, status and team
+    size changes, and founders added or removed. Founder lists are only compared when both
+    snapshots have founders for the company, so a page whose founders failed to extract doesn't
+    read as everyone leaving.
+    """
+    old_companies, old_founders = old
+    new_companies, new_founders = new
+    rows = []
+
+    def add(company_id, record, field, change, old_value=None, new_value=None):
+        rows.append([from_date, to_date, company_id, _text(record["Name"]), _text(record["Batch"]),
+                     field, change, old_value, new_value])
+
+    for company_id in new_companies.index.difference(old_companies.index, sort=False):
+        record = new_companies.loc[company_id]
+        add(company_id, record, "company", "added", None, _text(record["Name"]))
+    for company_id in old_companies.index.difference(new_companies.index, sort=False):
+        record = old_companies.loc[company_id]
+        add(company_id, record, "company", "removed", _text(record["Name"]), None)
+
+    common = new_companies.index.intersection(old_companies.index, sort=False)
+    before = old_companies.loc[common]
+    after = new_companies.loc[common]
+    for field, column in (("status", "Status"), ("team_size", "Team Size")):
+        old_values = before[column].astype(object)
+        new_values = after[column].astype(object)
+        changed = (old_values.fillna("").astype(str) != new_values.fillna("").astype(str)).to_numpy()
+        for company_id, old_value, new_value in zip(common[changed], old_values[changed], new_values[changed]):
+            add(company_id, after.loc[company_id], field, "changed", _text(old_value), _text(new_value))
+
+    for company_id in common:
+        before_names = old_founders.get(company_id)
+        after_names = new_founders.get(company_id)
+        if not before_names or not after_names:
+            continue
+        record = after.loc[company_id]
+        for name in sorted(after_names - before_names):
+            add(company_id, record, "founder", "added", None, name)
+        for name in sorted(before_names - after_names):
+            add(company_id, record, "founder", "removed", name, None)
+
+    return pd.DataFrame(rows, columns=CHANGE_COLUMNS, dtype=object)
+
+def change_file(changes_dir, from_date, to_date):
+    return os.path.join(changes_dir, f"{from_date}_{to_date}.parquet")
+
+def _snapshot_mtime(directory):
+    return max(
+        os.path.getmtime(os.path.join(directory, name))
+        for name in os.listdir(directory)
+        if name.startswith(("YC_Companies", "YC_Founders", "YC_URLs"))
+    )
+
+def update_change_log(data_dir, rebuild=False):
+    """
+    Bring the change log under `data_dir/changes` up to date: one file per pair of consecutive
+    snapshots, built only if it is missing or older than either snapshot. Adding a snapshot
+    therefore diffs it against its predecessor only. Files for pairs that are no longer
+    consecutive are removed. Returns the files written.
+    """
+    directories = [
+        directory for directory in snapshot_directories(data_dir)
+        if os.path.exists(os.path.join(directory, "YC_URLs.csv"))
+        and any(os.path.exists(os.path.join(directory, f"YC_Companies.{ext}")) for ext in ("csv", "parquet"))
+    ]
+    changes_dir = os.path.join(data_dir, CHANGES_DIR)
+    os.makedirs(changes_dir, exist_ok=True)
+
+    expected = set()
+    written = []
+    loaded = {}
+    for old_dir, new_dir in zip(directories, directories[1:]):
+        from_date, to_date = os.path.basename(old_dir), os.path.basename(new_dir)
+        path = change_file(changes_dir, from_date, to_date)
+        expected.add(os.path.basename(path))
+        if not rebuild and os.path.exists(path) and \
+                os.path.getmtime(path) >= max(_snapshot_mtime(old_dir), _snapshot_mtime(new_dir)):
+            continue
+        for directory in (old_dir, new_dir):
+            if directory not in loaded:
+                loaded[directory] = load_identified_snapshot(directory)
+        changes = diff_snapshots(loaded[old_dir], loaded[new_dir], from_date, to_date)
+        write_snapshot_parquet(changes, path)
+        written.append(path)
+
+    for name in os.listdir(changes_dir):
+        if name.endswith(".parquet") and name not in expected:
+            os.remove(os.path.join(changes_dir, name))
+    return written
@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import time
+
+CHECKPOINT_FILE = ".checkpoint.sqlite"
+DONE_STATUSES = ("ok", "skipped")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed (
+    url TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS offsets (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+"""
+
+class CheckpointJournal:
+    """
+    Per-snapshot journal of processed YC URLs (ok / failed / skipped) kept in SQLite.
+
+    Every URL is recorded in the same transaction as the byte size of each output CSV after its
+    rows were written, so the journal always describes a consistent prefix of the files. After a
+    crash the CSVs are truncated back to that prefix (dropping a row written just before the crash)
+    and its URL is fetched again. Lookups are by primary key, and WAL mode lets several processes
+    read and write the journal safely.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def statuses(self):
+        """url -> status for every URL seen so far"""
+        return dict(self.conn.execute("SELECT url, status FROM processed"))
+
+    def status(self, url):
+        row = self.conn.execute("SELECT status FROM processed WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def offsets(self):
+        """Committed size in bytes of each output file, by name"""
+        return dict(self.conn.execute("SELECT name, size FROM offsets"))
+
+    def set_offsets(self, offsets):
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._write_offsets(offsets)
+
+    def _write_offsets(self, offsets):
+        self.conn.executemany(
+            "INSERT INTO offsets (name, size) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET size = excluded.size",
+            offsets.items(),
+        )
+
+    def record(self, url, status, offsets=None, error=None):
+        """Record a URL's outcome, together with the output file sizes after its rows, atomically."""
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute(
+                "INSERT INTO processed (url, status, error, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET status = excluded.status, error = excluded.error, "
+                "attempts = attempts + 1, updated_at = excluded.updated_at",
+                (url, status, error, time.time()),
+            )
+            if offsets:
+                self._write_offsets(offsets)
+
+    def record_many(self, urls, status, offsets=None):
+        """Seed the journal, e.g. from the URLs already present in an existing CSV"""
+        now = time.time()
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO processed (url, status, updated_at) VALUES (?, ?, ?)",
+                [(url, status, now) for url in urls],
+            )
+            if offsets:
+                self._write_offsets(offsets)
+
+    def stats(self):
+        counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM processed GROUP BY status"))
+        return {status: counts.get(status, 0) for status in ("ok", "failed", "skipped")}
+
+    def close(self):
+        self.conn.close()
+
+def truncate_to(path, size):
+    """Cut a file back to `size` bytes if it grew past it. Returns the number of bytes dropped."""
+    current = os.path.getsize(path)
+    if current <= size:
+        return 0
+    with open(path, 'r+b') as f:
+        f.truncate(size)
+    return current - size
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from urllib.parse import urlencode
+
+from .scheduler import check_status
+
+DIRECTORY_URL = "https://www.ycombinator.com/companies"
+COMPANY_URL = "https://www.ycombinator.com/companies/{slug}"
+SEARCH_URL = "https://{app}-dsn.algolia.net/1/indexes/*/queries"
+INDEX_NAME = "YCCompany_production"
+HITS_PER_PAGE = 1000
+ALGOLIA_OPTS_RE = re.compile(r"AlgoliaOpts\s*=\s*(\{.*?\})", re.S)
+SEASONS = {"W": "Winter", "S": "Summer", "F": "Fall", "X": "Spring"}
+
+def batch_facet_values(batch_code):
+    """The directory has labelled batches both as 'W09' and as 'Winter 2009'; try both."""
+    values = [batch_code]
+    if len(batch_code) == 3 and batch_code[0] in SEASONS and batch_code[1:].isdigit():
+        values.append(f"{SEASONS[batch_code[0]]} 20{batch_code[1:]}")
+    return values
+
+class DirectoryClient:
+    """
+    Fetches the company list of a batch from the search index behind ycombinator.com/companies,
+    the same JSON endpoint the directory page queries while scrolling.
+
+    `session` needs requests-style `get(url)` and `post(url, data=..., headers=...)`. It defaults
+    to stealth_requests; pass a FixtureSession to replay recorded responses. With a `scheduler`,
+    requests are rate limited per host and throttled or failed responses are retried.
+    """
+
+    def __init__(self, session=None, scheduler=None):
+        if session is None:
+            import stealth_requests as session
+        self.session = session
+        self.scheduler = scheduler
+        self._credentials = None
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        send = getattr(self.session, method)
+        if self.scheduler is None:
+            return send(url, **kwargs)
+        return self.scheduler.for_url(url).call(send, url, check=check_status, **kwargs)
+
+    def credentials(self):
+        """Public search credentials embedded in the directory page (fetched once per client)."""
+        with self._lock:
+            if self._credentials is None:
+                response = self.request("get", DIRECTORY_URL)
+                response.raise_for_status()
+                match = ALGOLIA_OPTS_RE.search(response.text)
+                if not match:
+                    raise ValueError("Search credentials not found on the directory page")
+                opts = json.loads(match.group(1))
+                self._credentials = (opts["app"], opts["key"])
+            return self._credentials
+
+    def search(self, facet_filter, page):
+        app, key = self.credentials()
+        params = urlencode({
+            "facetFilters": json.dumps([facet_filter]),
+            "hitsPerPage": HITS_PER_PAGE,
+            "page": page,
+            "query": "",
+        })
+        body = json.dumps({"requests": [{"indexName": INDEX_NAME, "params": params}]})
+        response = self.request(
+            "post", SEARCH_URL.format(app=app.lower()),
+            data=body,
+            headers={"x-algolia-application-id": app, "x-algolia-api-key": key,
+                     "content-type": "application/json"},
+        )
+        response.raise_for_status()
+        return response.json()["results"][0]
+
+    def get_batch_urls(self, batch_code):
+        """All company URLs of a batch, following the result pages."""
+        for value in batch_facet_values(batch_code):
+            urls = []
+            page, pages = 0, 1
+            while page < pages:
+                result = self.search(f"batch:{value}", page)
+                urls.extend(COMPANY_URL.format(slug=hit["slug"]) for hit in result["hits"] if hit.get("slug"))
+                pages = result.get("nbPages", 0)
+                page += 1
+            if urls:
+                return urls
+        return []
+
+class FixtureResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+def fixture_name(method, url, data=None):
+    digest = hashlib.sha1(f"{method} {url}\n{data or ''}".encode("utf-8")).hexdigest()
+    return f"{method.lower()}_{digest[:16]}.json"
+
+class FixtureSession:
+    """Replays responses recorded by RecordingSession, so the HTTP backend runs offline."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def _load(self, method, url, data=None):
+        path = self.directory / fixture_name(method, url, data)
+        if not path.exists():
+            raise FileNotFoundError(f"No recorded fixture for {method} {url} ({path.name})")
+        with open(path, "r", encoding="utf-8") as f:
+            fixture = json.load(f)
+        return FixtureResponse(fixture["status_code"], fixture["text"])
+
+    def get(self, url, **kwargs):
+        return self._load("GET", url)
+
+    def post(self, url, data=None, **kwargs):
+        return self._load("POST", url, data)
+
+class RecordingSession:
+    """Wraps a live session and saves every response as a fixture for FixtureSession."""
+
+    def __init__(self, session, directory):
+        self.session = session
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _save(self, method, url, data, response):
+        fixture = {"method": method, "url": url, "data": data,
+                   "status_code": response.status_code, "text": response.text}
+        with open(self.directory / fixture_name(method, url, data), "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=2)
+        return response
+
+    def get(self, url, **kwargs):
+        return self._save("GET", url, None, self.session.get(url, **kwargs))
+
+    def post(self, url, data=None, **kwargs):
+        return self._save("POST", url, data, self.session.post(url, data=data, **kwargs))
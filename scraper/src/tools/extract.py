@@ -1,4 +1,17 @@
-from .models import Company_Path, YC_Company
+from json import JSONDecodeError
+from pydantic import ValidationError
+from tenacity import AsyncRetrying, Retrying, retry_if_exception_type, stop_after_attempt
+from .models import Company_Path, YC_Company, YC_Company_Batch
+from .metrics import METRICS
+
+# Re-asks after a response fails validation. Rate limits and transient API errors are not retried
+# here: they surface to the caller's scheduler lane, which backs off and retries the request.
+VALIDATION_RETRIES = 3
+
+def validation_retries(attempts=VALIDATION_RETRIES, is_async=True):
+    retrying = AsyncRetrying if is_async else Retrying
+    return retrying(stop=stop_after_attempt(attempts), reraise=True,
+                    retry=retry_if_exception_type((ValidationError, JSONDecodeError)))
 
 def extract_urls(client, input, model: str = "openai/gpt-4o-mini"):
     data, resp = client.chat.completions.create_with_completion(
@@ -17,20 +30,130 @@ def extract_urls(client, input, model: str = "openai/gpt-4o-mini"):
     )
     return resp.model_dump()
 
-def extract_company_details(client, input, model: str = "openai/gpt-4o-mini"):
-    resp = client.chat.completions.create(
+def company_details_messages(input):
+    return [
+        {
+            "role": "system",
+            "content": "Extract the relevant company information without any additional commentary:"
+        },
+        {
+            "role": "user",
+            "content": f"{input}"
+        }
+    ]
+
+def extract_company_details(client, input, model: str = "openai/gpt-4o-mini", lane=None):
+    """`lane` is an optional scheduler Lane that rate limits the request and retries API errors."""
+    def send():
+        with METRICS.timer("llm_call", model=model):
+            return client.chat.completions.create(
+                model=model,
+                response_model=YC_Company,
+                max_retries=validation_retries(is_async=False),
+                messages=company_details_messages(input),
+            )
+    resp = send() if lane is None else lane.call(send, tokens=estimate_tokens(input))
+    METRICS.record_usage(model, resp)
+    return resp.model_dump()
+
+async def acreate(client, lane, tokens, attempts=VALIDATION_RETRIES, **request):
+    """
+    client.chat.completions.create through the scheduler lane, when there is one. Each attempt is
+    timed as an llm_call (round trip plus validation), and token usage and cost are recorded.
+    """
+    async def send():
+        # A fresh retry policy for every call, as the lane may send the request more than once
+        with METRICS.timer("llm_call", model=request["model"]):
+            return await client.chat.completions.create(**request, max_retries=validation_retries(attempts))
+    resp = await send() if lane is None else await lane.acall(send, tokens=tokens)
+    METRICS.record_usage(request["model"], resp)
+    return resp
+
+async def aextract_company_details(client, input, model: str = "openai/gpt-4o-mini", lane=None):
+    """Async variant of extract_company_details for clients built with instructor.from_litellm(acompletion)."""
+    resp = await acreate(
+        client, lane, estimate_tokens(input),
         model=model,
         response_model=YC_Company,
-        max_retries=10,
-        messages=[
-            {
-                "role": "system",
-                "content": "Extract the relevant company information without any additional commentary:"
-            },
-            {
-                "role": "user",
-                "content": f"{input}"
-            }
-        ],
+        messages=company_details_messages(input),
     )
     return resp.model_dump()
+
+# Rough size of a token for budgeting batch prompts.
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def pack_batches(pages, batch_size, token_budget):
+    """
+    Group (source_url, markdown) pages into batches of at most `batch_size` pages and roughly
+    `token_budget` input tokens. Pages longer than their share of the budget are truncated.
+    """
+    per_page_budget = max(1, token_budget // batch_size)
+    batches, current, current_tokens = [], [], 0
+    for source_url, markdown in pages:
+        if estimate_tokens(markdown) > per_page_budget:
+            markdown = markdown[:per_page_budget * CHARS_PER_TOKEN]
+        tokens = estimate_tokens(markdown)
+        if current and (len(current) == batch_size or current_tokens + tokens > token_budget):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append((source_url, markdown))
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def company_batch_messages(pages):
+    blocks = "\n\n".join(f"=== PAGE {i} ===\n{markdown}" for i, (_, markdown) in enumerate(pages))
+    return [
+        {
+            "role": "system",
+            "content": "Each PAGE block is a different company page. Extract the relevant company information "
+                       "for every PAGE, set `page` to its PAGE number, without any additional commentary:"
+        },
+        {
+            "role": "user",
+            "content": blocks
+        }
+    ]
+
+async def aextract_company_batch(client, pages, model: str = "openai/gpt-4o-mini", max_retries: int = 2, lane=None):
+    """
+    Extract several company pages in one request.
+
+    `pages` is a list of (source_url, markdown). Returns a dict of source_url -> company details
+    (None when a page could not be extracted). A batch that fails validation, or that does not
+    return exactly one company per page, is split in half and each half retried; single pages
+    fall back to aextract_company_details(). Requests go through the scheduler `lane` if given.
+    """
+    if len(pages) == 1:
+        source_url, markdown = pages[0]
+        try:
+            return {source_url: await aextract_company_details(client, markdown, model=model, lane=lane)}
+        except Exception as e:
+            print(f"Extraction error for {source_url}: {e}", flush=True)
+            return {source_url: None}
+
+    try:
+        resp = await acreate(
+            client, lane, sum(estimate_tokens(markdown) for _, markdown in pages), attempts=max_retries,
+            model=model,
+            response_model=YC_Company_Batch,
+            messages=company_batch_messages(pages),
+        )
+        companies = {company.page: company for company in resp.companies}
+        if sorted(companies) != list(range(len(pages))):
+            raise ValueError(f"expected pages 0-{len(pages) - 1}, got {sorted(companies)}")
+    except Exception as e:
+        print(f"Batch of {len(pages)} failed ({e}). Splitting...", flush=True)
+        middle = len(pages) // 2
+        left = await aextract_company_batch(client, pages[:middle], model=model, max_retries=max_retries, lane=lane)
+        right = await aextract_company_batch(client, pages[middle:], model=model, max_retries=max_retries, lane=lane)
+        return {**left, **right}
+
+    return {
+        source_url: companies[i].model_dump(exclude={"page"})
+        for i, (source_url, _) in enumerate(pages)
+    }
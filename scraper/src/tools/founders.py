@@ -0,0 +1,218 @@
+import os
+import re
+import difflib
+import unicodedata
+from urllib.parse import unquote, urlsplit, parse_qs
+import pandas as pd
+
+from tools.changes import name_slug, resolve_company_ids, resolve_founder_companies
+from tools.snapshots import load_snapshot_table, snapshot_directories, write_snapshot_parquet
+
+FOUNDER_INDEX_DIR = "founders"
+FOUNDER_INDEX_FILE = "identities.parquet"
+INDEX_COLUMNS = ["Founder", "Date", "Row", "Company", "Name", "Batch", "Status",
+                 "Founder's First Name", "Founder's Last Name", "Founder's LinkedIn", "Founder's Twitter"]
+
+# Two spellings of a name at the same company are one person from this similarity up
+NAME_SIMILARITY = 0.85
+# First path segments that aren't a person's profile
+LINKEDIN_RESERVED = {"company", "school", "feed", "jobs", "groups", "showcase", "posts", "pulse", "search", "profile", "in", "pub"}
+TWITTER_RESERVED = {"intent", "share", "home", "i", "search", "hashtag", "in", "login", "messages", "explore", "settings"}
+
+def _split(url):
+    """Lowercased host and the parts of a URL; the host is "" for anything that isn't a URL"""
+    if not isinstance(url, str) or not url.strip():
+        return "", None
+    url = url.strip()
+    try:
+        parts = urlsplit(url if "//" in url else f"https://{url}")
+    except ValueError:
+        return "", None
+    return (parts.hostname or "").lower(), parts
+
+def linkedin_key(url):
+    """
+    Identity key of a LinkedIn profile URL, or None when it isn't one (company pages, the feed,
+    settings links). Scheme, www/country subdomains, query strings, case and trailing slashes are
+    ignored: https://uk.linkedin.com/in/Tom-B/?trk=x -> "in/tom-b".
+    """
+    host, parts = _split(url)
+    if not (host == "linkedin.com" or host.endswith(".linkedin.com")):
+        return None
+    segments = [unquote(segment).lower() for segment in parts.path.split("/") if segment]
+    if len(segments) >= 2 and segments[0] in ("in", "pub"):
+        return "/".join(segments[:2] if segments[0] == "in" else segments[:5])
+    if segments[:2] == ["profile", "view"]:
+        profile_id = parse_qs(parts.query).get("id")
+        return f"id/{profile_id[0]}" if profile_id else None
+    if len(segments) == 1 and segments[0] not in LINKEDIN_RESERVED:
+        return f"in/{segments[0]}"
+    return None
+
+def twitter_key(url):
+    """Identity key of a Twitter/X profile URL (the lowercased handle), or None when it isn't one"""
+    host, parts = _split(url)
+    if host not in ("twitter.com", "x.com") and not host.endswith((".twitter.com", ".x.com")):
+        return None
+    segments = [unquote(segment) for segment in parts.path.split("/") if segment]
+    if not segments or segments[0].lower() in TWITTER_RESERVED:
+        return None
+    handle = segments[0].lstrip("@").lower()
+    return handle if re.fullmatch(r"\w{1,15}", handle) else None
+
+def name_key(first, last):
+    """Lowercased first and last name without accents or punctuation: "José  O'Neil" -> "jose oneil" """
+    text = " ".join(part for part in (first, last) if isinstance(part, str) and part and part != "None")
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    return " ".join(re.sub(r"[^a-z0-9 ]+", "", text).split())
+
+class _Clusters:
+    """Union-find over appearance rows"""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, row):
+        while self.parent[row] != row:
+            self.parent[row] = self.parent[self.parent[row]]
+            row = self.parent[row]
+        return row
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            # The earlier row stays the root, so a cluster is named after its first appearance
+            self.parent[max(a, b)] = min(a, b)
+
+def _usable_keys(appearances, column):
+    """
+    Keys that identify one person: within any one snapshot every row carrying the key has the same
+    name, and across snapshots its names share a word (a respelling, not someone else). A handle
+    pasted for two co-founders, or a company page used as a profile, is dropped.
+    """
+    keyed = appearances[appearances[column].notna()]
+    per_snapshot = keyed.groupby([column, "Date"])["name_key"].nunique()
+    ambiguous = set(per_snapshot[per_snapshot > 1].index.get_level_values(column))
+    names = {}
+    for key, name in zip(keyed[column], keyed["name_key"]):
+        names.setdefault(key, set()).add(name)
+    usable = set()
+    for key, spellings in names.items():
+        words = [set(name.split()) for name in spellings]
+        if key not in ambiguous and all(words[0] & other for other in words[1:]):
+            usable.add(key)
+    return usable
+
+def resolve_founders(appearances):
+    """
+    Founder id for each appearance (one founder row in one snapshot), in a stable order.
+
+    Rows are merged into one founder when they share a LinkedIn or Twitter profile, or when they
+    belong to the same company and their names match exactly or closely (a changed profile URL, a
+    corrected spelling) unless both spellings appear at that company in the same snapshot. A name
+    alone never links two companies: people with the same name at different companies stay apart
+    unless a shared profile says they are one. Ids are the slug of the founder's first profile key
+    (or name) in snapshot order.
+    """
+    appearances = appearances.reset_index(drop=True).assign(
+        name_key=[name_key(first, last) for first, last in
+                  zip(appearances["Founder's First Name"], appearances["Founder's Last Name"])],
+        linkedin_key=[linkedin_key(url) for url in appearances["Founder's LinkedIn"]],
+        twitter_key=[twitter_key(url) for url in appearances["Founder's Twitter"]],
+    )
+    for column in ("linkedin_key", "twitter_key"):
+        usable = _usable_keys(appearances, column)
+        appearances[column] = pd.Series([key if key in usable else None for key in appearances[column]], dtype=object)
+    clusters = _Clusters(len(appearances))
+
+    for column in ("linkedin_key", "twitter_key"):
+        for rows in appearances.groupby(column, sort=False).indices.values():
+            for row in rows[1:]:
+                clusters.union(rows[0], row)
+
+    # company -> name -> (rows, snapshot dates)
+    spellings = {}
+    for row, (company, name, date) in enumerate(zip(appearances["Company"], appearances["name_key"], appearances["Date"])):
+        if name:
+            rows, dates = spellings.setdefault(company, {}).setdefault(name, ([], set()))
+            rows.append(row)
+            dates.add(date)
+    for names in spellings.values():
+        for rows, _ in names.values():
+            for row in rows[1:]:
+                clusters.union(rows[0], row)
+        names = list(names.items())
+        for i, (a, (rows_a, dates_a)) in enumerate(names):
+            for b, (rows_b, dates_b) in names[i + 1:]:
+                if not dates_a & dates_b and difflib.SequenceMatcher(None, a, b).ratio() >= NAME_SIMILARITY:
+                    clusters.union(rows_a[0], rows_b[0])
+
+    # Each founder's first LinkedIn key, else first Twitter handle, else first name
+    roots = [clusters.find(row) for row in range(len(appearances))]
+    keys = {}
+    for column in ("linkedin_key", "twitter_key", "name_key"):
+        for root, key in zip(roots, appearances[column]):
+            if key and root not in keys:
+                keys[root] = key.split("/", 1)[-1] if column == "linkedin_key" else key
+    ids = {}
+    taken = set()
+    for root in roots:
+        if root not in ids:
+            base = name_slug(keys.get(root, "")) or f"row-{root}"
+            founder_id, suffix = base, 2
+            while founder_id in taken:
+                founder_id, suffix = f"{base}-{suffix}", suffix + 1
+            taken.add(founder_id)
+            ids[root] = founder_id
+    return [ids[root] for root in roots]
+
+def load_appearances(directory):
+    """Every founder row of one snapshot, with the id of its company and its row number"""
+    founders = load_snapshot_table(directory, "YC_Founders")
+    companies = load_snapshot_table(directory, "YC_Companies")
+    urls_path = os.path.join(directory, "YC_URLs.csv")
+    urls = pd.read_csv(urls_path)["YC URL"].tolist() if os.path.exists(urls_path) else []
+    company_ids = resolve_founder_companies(founders, companies, resolve_company_ids(companies, urls))
+    names = founders["Name"].astype(object)
+    return pd.DataFrame({
+        "Date": os.path.basename(os.path.normpath(directory)),
+        "Row": range(len(founders)),
+        "Company": [company_id or f"name:{name_slug(name)}" for company_id, name in zip(company_ids, names)],
+        "Name": names.to_numpy(),
+        **{column: founders[column].astype(object).to_numpy() for column in INDEX_COLUMNS[5:] if column in founders},
+    })
+
+def founder_index_path(data_dir):
+    return os.path.join(data_dir, FOUNDER_INDEX_DIR, FOUNDER_INDEX_FILE)
+
+def _has_founders(directory):
+    return any(os.path.exists(os.path.join(directory, f"YC_Founders.{ext}")) for ext in ("csv", "parquet")) \
+        and any(os.path.exists(os.path.join(directory, f"YC_Companies.{ext}")) for ext in ("csv", "parquet"))
+
+def update_founder_index(data_dir, rebuild=False):
+    """
+    Resolve founder identities across every snapshot under `data_dir` into
+    `data_dir/founders/identities.parquet`: one row per founder row per snapshot, with the founder's
+    id and the company's id. Rebuilt only when it is missing or older than a snapshot's founder or
+    company files. Returns the file written, or None when it was up to date.
+    """
+    directories = [directory for directory in snapshot_directories(data_dir) if _has_founders(directory)]
+    path = founder_index_path(data_dir)
+    sources = [
+        os.path.join(directory, f"{table}.{ext}")
+        for directory in directories for table in ("YC_Companies", "YC_Founders", "YC_URLs") for ext in ("csv", "parquet")
+    ]
+    newest = max((os.path.getmtime(source) for source in sources if os.path.exists(source)), default=0)
+    if not rebuild and os.path.exists(path) and os.path.getmtime(path) >= newest:
+        return None
+
+    frames = [load_appearances(directory) for directory in directories]
+    appearances = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=INDEX_COLUMNS[1:])
+    for column in INDEX_COLUMNS[4:]:
+        if column not in appearances:
+            appearances[column] = None
+        appearances[column] = appearances[column].astype(object)
+    appearances.insert(0, "Founder", resolve_founders(appearances) if len(appearances) else [])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_snapshot_parquet(appearances[INDEX_COLUMNS], path)
+    return path
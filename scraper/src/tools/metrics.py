@@ -0,0 +1,201 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Histogram bucket bounds in seconds, from fast in-process steps up to slow page loads and LLM calls
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+MAX_SAMPLES = 100_000
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+# USD per million tokens (input, output); models missing here are costed through litellm if it knows them
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+PROMETHEUS_PREFIX = "yc_scraper"
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def _label_text(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in pairs) + "}"
+
+def token_cost(model, prompt_tokens, completion_tokens):
+    """USD cost of a call, or None when the model's price is unknown"""
+    prices = MODEL_PRICES.get(model.split("/", 1)[-1])
+    if prices is not None:
+        return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+    try:
+        from litellm import cost_per_token
+        prompt_cost, completion_cost = cost_per_token(model=model, prompt_tokens=prompt_tokens,
+                                                      completion_tokens=completion_tokens)
+        return prompt_cost + completion_cost
+    except Exception:
+        return None
+
+class Histogram:
+    """Latencies of one timer: Prometheus-style cumulative buckets plus raw samples for percentiles"""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        summary = {"count": self.count, "sum": round(self.sum, 6),
+                   "mean": round(self.sum / self.count, 6) if self.count else None,
+                   "max": round(self.max, 6)}
+        for name, q in PERCENTILES.items():
+            summary[name] = round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 6) if ordered else None
+        summary["buckets"] = {str(bound): count for bound, count in zip(BUCKETS, self.buckets)}
+        return summary
+
+class Metrics:
+    """
+    Timers, counters and LLM token usage for one scraper run. Thread-safe, and usable around
+    awaits since timers are plain context managers. Exported as a JSON run report and, optionally,
+    in the Prometheus text format (for node_exporter's textfile collector).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.histograms = {}
+            self.counters = {}
+            self.usage = {}
+
+    def observe(self, name, seconds, **labels):
+        with self._lock:
+            self.histograms.setdefault(_key(name, labels), Histogram()).observe(seconds)
+
+    def count(self, name, n=1, **labels):
+        with self._lock:
+            key = _key(name, labels)
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time the block; failed blocks are timed too and counted as `<name>_errors`"""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.count(f"{name}_errors", **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name, **labels):
+        """Decorator form of timer(), for plain and coroutine functions"""
+        def decorate(fn):
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def wrapper(*args, **kwargs):
+                    with self.timer(name, **labels):
+                        return await fn(*args, **kwargs)
+            else:
+                @functools.wraps(fn)
+                def wrapper(*args, **kwargs):
+                    with self.timer(name, **labels):
+                        return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def record_usage(self, model, response):
+        """Token usage and cost of an LLM call, from the raw completion instructor keeps on its result"""
+        raw = getattr(response, "_raw_response", response)
+        usage = getattr(raw, "usage", None)
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        cost = token_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            totals = self.usage.setdefault(model, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0})
+            totals["calls"] += 1
+            totals["prompt_tokens"] += prompt_tokens
+            totals["completion_tokens"] += completion_tokens
+            if cost is not None:
+                totals["cost_usd"] += cost
+
+    def report(self, **extra):
+        """The run report: timers as latency summaries, counters, and tokens and cost per model"""
+        with self._lock:
+            def label_name(key):
+                name, labels = key
+                return name + _label_text(labels)
+            return {
+                "started_at": datetime.fromtimestamp(self.started, timezone.utc).isoformat(timespec="seconds"),
+                "duration_seconds": round(time.time() - self.started, 3),
+                **extra,
+                "timers": {label_name(key): histogram.summary() for key, histogram in sorted(self.histograms.items())},
+                "counters": {label_name(key): value for key, value in sorted(self.counters.items())},
+                "llm": {model: {**totals, "cost_usd": round(totals["cost_usd"], 6)} for model, totals in self.usage.items()},
+            }
+
+    def prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        stage = f"{PROMETHEUS_PREFIX}_stage_seconds"
+        lines = [f"# HELP {stage} Latency of instrumented scraper steps.", f"# TYPE {stage} histogram"]
+        with self._lock:
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                series = (("stage", name), *labels)
+                for bound, count in zip(BUCKETS, histogram.buckets):
+                    lines.append(f"{stage}_bucket{_label_text(series, le=bound)} {count}")
+                lines.append(f"{stage}_bucket{_label_text(series, le='+Inf')} {histogram.count}")
+                lines.append(f"{stage}_sum{_label_text(series)} {histogram.sum}")
+                lines.append(f"{stage}_count{_label_text(series)} {histogram.count}")
+            typed = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                metric = f"{PROMETHEUS_PREFIX}_{name}_total"
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} counter")
+                    typed.add(metric)
+                lines.append(f"{metric}{_label_text(labels)} {value}")
+            for metric, field in (("llm_prompt_tokens_total", "prompt_tokens"),
+                                  ("llm_completion_tokens_total", "completion_tokens"),
+                                  ("llm_cost_usd_total", "cost_usd")):
+                if self.usage:
+                    lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{metric} counter")
+                for model, totals in self.usage.items():
+                    lines.append(f"{PROMETHEUS_PREFIX}_{metric}{_label_text((('model', model),))} {totals[field]}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, report_path, prometheus_path=None, **extra):
+        """Write the JSON report (and the Prometheus text file if a path is given), each atomically"""
+        outputs = [(report_path, json.dumps(self.report(**extra), indent=2))]
+        if prometheus_path:
+            outputs.append((prometheus_path, self.prometheus()))
+        for path, text in outputs:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+
+# Process-wide metrics, shared by the scraper's modules like a default registry
+METRICS = Metrics()
@@ -1,7 +1,9 @@
 from typing import Optional, Literal, List
-from pydantic import BaseModel, ValidationError, AfterValidator, Field, HttpUrl
+from pydantic import BaseModel, ValidationError, AfterValidator, Field, HttpUrl, model_validator
 from typing import Annotated
 
+from .metrics import METRICS
+
 def exclude_commas(text: Optional[str]) -> str:
     if text is None:
         return text
@@ -27,6 +29,19 @@ class YC_Company(BaseModel):
     city: Annotated[Optional[str], AfterValidator(exclude_commas), Field(description="Name of the company's HQ city only.", default=None)]
     founders: Optional[List[Founder]] = Field(default=None)
 
+    @model_validator(mode="wrap")
+    @classmethod
+    def _timed_validation(cls, data, handler):
+        # Time pydantic validation of each extracted company (also covers instructor's subclasses)
+        with METRICS.timer("validation", model=cls.__name__):
+            return handler(data)
+
+class YC_Company_Page(YC_Company):
+    page: int = Field(description="Number of the PAGE block the company was extracted from.")
+
+class YC_Company_Batch(BaseModel):
+    companies: List[YC_Company_Page] = Field(description="One entry per PAGE block, in any order.")
+
 if __name__ == "__main__":
     try:
         company = YC_Company(
@@ -0,0 +1,215 @@
+import re
+from typing import Optional
+from pydantic import ValidationError
+
+from .models import YC_Company
+
+STATUSES = ("Active", "Inactive", "Acquired", "Public")
+SEASONS = {"winter": "W", "summer": "S", "fall": "F", "spring": "X"}
+
+LINK_RE = re.compile(r"\[([^\]]*)\]\(([^)\s]+)[^)]*\)")
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*$")
+BATCH_LINK_RE = re.compile(r"/companies\?batch=([^)&\s]+)")
+INDUSTRY_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)\s]*/companies/industry/([^)?#\s]+)[^)]*\)")
+LINKEDIN_RE = re.compile(r"https?://(?:[a-z]{2,3}\.)?linkedin\.com/in/[^)\s\"']+", re.IGNORECASE)
+TWITTER_RE = re.compile(r"https?://(?:www\.)?(?:twitter|x)\.com/[A-Za-z0-9_]+/?(?=[)\s\"']|$)", re.IGNORECASE)
+BATCH_CODE_RE = re.compile(r"^[WSFX]\d{2}$")
+BATCH_NAME_RE = re.compile(r"^(Winter|Summer|Fall|Spring)\s+(?:19|20)?(\d{2})$", re.IGNORECASE)
+
+# Words of industry slugs that aren't written in title case in the directory's own labels.
+INDUSTRY_WORDS = {"ai": "AI", "b2b": "B2B", "saas": "SaaS", "api": "API", "ar": "AR", "vr": "VR", "iot": "IoT",
+                  "hr": "HR", "web3": "Web3", "ml": "ML", "crm": "CRM", "erp": "ERP", "devsecops": "DevSecOps",
+                  "elearning": "eLearning", "nft": "NFT", "3d": "3D", "and": "and", "of": "of", "for": "for"}
+# Slugs whose label isn't their words
+INDUSTRY_LABELS = {"e-commerce": "E-commerce", "crypto-web3": "Crypto / Web3", "hard-tech": "Hard Tech"}
+
+# Sections that follow the founders block on a company page.
+FOUNDER_SECTION_END = ("jobs", "latest news", "company launches", "news", "launches", "founder videos")
+# Words of sub-headings inside the founders block ("Active Founders", "Former Founders", "Team")
+# that are section titles, not people.
+FOUNDER_SECTION_WORDS = {"founder", "founders", "team", "leadership", "people"}
+
+def _plain(text: str) -> str:
+    """Strip markdown link syntax and emphasis from a line."""
+    text = LINK_RE.sub(lambda m: m.group(1), text)
+    return re.sub(r"[*_`]+", "", text).strip()
+
+def normalize_batch(label: str) -> Optional[str]:
+    """Map a batch label ('W09', 'Winter 2009', 'Winter%202009') to the W##/S##/F##/X## code."""
+    label = label.replace("%20", " ").replace("+", " ").strip()
+    if BATCH_CODE_RE.match(label.upper()):
+        return label.upper()
+    match = BATCH_NAME_RE.match(label)
+    if match:
+        return f"{SEASONS[match.group(1).lower()]}{match.group(2)}"
+    if label.lower() == "unspecified":
+        return "Unspecified"
+    return None
+
+def industry_label(slug: str) -> str:
+    """Display label of an industry slug, as the directory shows it: 'developer-tools' -> 'Developer Tools'."""
+    slug = slug.replace("%20", " ").replace("+", " ")
+    if slug.lower() in INDUSTRY_LABELS:
+        return INDUSTRY_LABELS[slug.lower()]
+    words = slug.replace("-", " ").split()
+    return " ".join(INDUSTRY_WORDS.get(word.lower(), word.capitalize()) for word in words)
+
+def _labelled_value(lines, label):
+    """Value of a 'Label:' field, either on the same line or on the next non-empty line."""
+    for i, line in enumerate(lines):
+        plain = _plain(line)
+        if plain.lower().startswith(f"{label.lower()}:"):
+            value = plain[len(label) + 1:].strip()
+            if value:
+                return value
+            for following in lines[i + 1:]:
+                if following.strip():
+                    return _plain(following)
+            return ""
+    return None
+
+def _founder_section(lines):
+    """Lines of the founders block: from the first '... Founders' heading to the next page section."""
+    start = None
+    level = None
+    for i, line in enumerate(lines):
+        heading = HEADING_RE.match(line)
+        if heading and "founder" in heading.group(2).lower():
+            start, level = i + 1, len(heading.group(1))
+            break
+    if start is None:
+        return None
+    end = len(lines)
+    for i in range(start, len(lines)):
+        heading = HEADING_RE.match(lines[i])
+        if not heading:
+            continue
+        title = _plain(heading.group(2)).lower()
+        if "founder" in title:
+            continue
+        if len(heading.group(1)) <= level or title in FOUNDER_SECTION_END:
+            end = i
+            break
+    return lines[start:end]
+
+def _parse_founders(section):
+    """Founders are headings (or bold lines) followed by their social links."""
+    founders = []
+    for line in section:
+        heading = HEADING_RE.match(line)
+        bold = re.match(r"^\*\*(.+?)\*\*$", line.strip())
+        name = _plain(heading.group(2)) if heading else (_plain(bold.group(1)) if bold else None)
+        if name:
+            # Skip role suffixes such as "Brian Chesky, Founder/CEO".
+            name = name.split(",")[0].strip()
+            parts = name.split()
+            # Sub-headings such as "Former Founders" title a group of founders, they aren't one.
+            if FOUNDER_SECTION_WORDS.intersection(re.findall(r"[a-z]+", name.lower())):
+                continue
+            if len(parts) >= 2:
+                founders.append({"first_name": parts[0], "last_name": " ".join(parts[1:]),
+                                 "founder_linkedin_url": None, "founder_twitter_url": None})
+            continue
+        if not founders:
+            continue
+        linkedin = LINKEDIN_RE.search(line)
+        twitter = TWITTER_RE.search(line)
+        if linkedin and founders[-1]["founder_linkedin_url"] is None:
+            founders[-1]["founder_linkedin_url"] = linkedin.group(0)
+        if twitter and founders[-1]["founder_twitter_url"] is None:
+            founders[-1]["founder_twitter_url"] = twitter.group(0)
+    return founders
+
+def parse_company_details(markdown: str):
+    """
+    Rule-based extraction of a YC company page into the YC_Company schema.
+
+    Returns the same dict as extract_company_details(), or None when a required field is missing
+    or the result fails validation, in which case the caller should fall back to the LLM.
+    """
+    lines = [line.rstrip() for line in markdown.splitlines()]
+
+    name = None
+    for line in lines:
+        heading = HEADING_RE.match(line)
+        if heading and len(heading.group(1)) == 1:
+            name = _plain(heading.group(2))
+            break
+    if not name:
+        return None
+
+    batch_match = BATCH_LINK_RE.search(markdown)
+    batch = normalize_batch(batch_match.group(1)) if batch_match else None
+    if batch is None:
+        return None
+
+    # The status pill is the first standalone status word on the page; pills may share a line
+    # with the batch and industry links, so each link text and the text between links is a token.
+    status = None
+    for line in lines:
+        for token in LINK_RE.sub(lambda m: f"\n{m.group(1)}\n", line).split("\n"):
+            token = re.sub(r"[^A-Za-z]", "", token)
+            if token in STATUSES:
+                status = token
+                break
+        if status:
+            break
+    if status is None:
+        return None
+
+    # Industry pills link to /companies/industry/<slug>; their text is the label the LLM reads
+    # off the page, so that is what's kept (the slug's label when the link has no text).
+    industries = []
+    for text, slug in INDUSTRY_LINK_RE.findall(markdown):
+        tag = _plain(text) or industry_label(slug.split("/")[-1])
+        if tag not in industries:
+            industries.append(tag)
+    industry = ", ".join(industries) if industries else None
+
+    team_size = _labelled_value(lines, "Team Size")
+    if team_size is not None:
+        team_size = team_size.replace(",", "")
+        if not team_size.isdigit():
+            return None
+        team_size = int(team_size)
+
+    city = _labelled_value(lines, "Location")
+    if city is not None:
+        city = city.split(",")[0].strip() or None
+
+    # Without a founders block the page may still list founders in a layout this parser doesn't
+    # know, so it goes to the LLM rather than losing them.
+    section = _founder_section(lines)
+    if section is None:
+        return None
+    founders = _parse_founders(section)
+    if not founders:
+        return None
+
+    try:
+        company = YC_Company(name=name, batch=batch, status=status, industry=industry,
+                             team_size=team_size, city=city, founders=founders)
+    except ValidationError:
+        return None
+    return company.model_dump()
+
+class FastPathExtractor:
+    """Counts how often the rule-based parser handles a page without the LLM."""
+
+    def __init__(self):
+        self.hits = 0
+        self.fallbacks = 0
+
+    def extract(self, markdown: str):
+        company_extract = parse_company_details(markdown)
+        if company_extract is None:
+            self.fallbacks += 1
+        else:
+            self.hits += 1
+        return company_extract
+
+    def stats(self) -> str:
+        attempts = self.hits + self.fallbacks
+        hit_rate = self.hits / attempts * 100 if attempts else 0.0
+        return (f"Fast-path parser: {self.hits} parsed, {self.fallbacks} sent to the LLM "
+                f"({hit_rate:.1f}% hit rate)")
@@ -0,0 +1,99 @@
+import os
+import json
+from datetime import datetime, timezone
+import pandas as pd
+
+from tools.snapshots import load_snapshot_table
+
+ROLLUPS_FILE = "YC_Rollups.json"
+ROLLUP_COLUMNS = ["Name", "Batch", "Status", "Industry", "Team Size", "Location"]
+QUANTILES = {"p25": 0.25, "median": 0.5, "p75": 0.75}
+
+def _records(df):
+    """Records with plain Python values; missing values become None"""
+    df = df.astype(object)
+    return df.where(df.notna(), None).to_dict(orient="records")
+
+def batch_sizes(companies):
+    """Companies per batch, in the order batches first appear in the snapshot"""
+    counts = companies.groupby("Batch", sort=False, observed=True).size()
+    return _records(counts.rename("companies").reset_index().rename(columns={"Batch": "batch"}))
+
+def status_counts(companies):
+    counts = companies["Status"].value_counts()
+    total = counts.sum()
+    return _records(pd.DataFrame({
+        "status": counts.index.astype(str),
+        "companies": counts.to_numpy(),
+        "share": (counts / total).round(4).to_numpy(),
+    }))
+
+def status_by_batch(companies):
+    """Status mix per batch: counts and each status's share of the batch"""
+    counts = companies.groupby(["Batch", "Status"], sort=False, observed=True).size().rename("companies").reset_index()
+    counts["share"] = (counts["companies"] / counts.groupby("Batch", observed=True)["companies"].transform("sum")).round(4)
+    return _records(counts.rename(columns={"Batch": "batch", "Status": "status"}))
+
+def _team_size_stats(companies, keys):
+    """Team-size distribution per group, like groupby(keys)["Team Size"].describe()"""
+    grouped = companies.dropna(subset=["Team Size"]).groupby(keys, sort=False, observed=True)["Team Size"]
+    stats = grouped.agg(["count", "sum", "mean", "min", "max"])
+    for name, q in QUANTILES.items():
+        stats[name] = grouped.quantile(q)
+    stats["mean"] = stats["mean"].round(2)
+    stats = stats[["count", "sum", "mean", "min", "p25", "median", "p75", "max"]].reset_index()
+    return _records(stats.rename(columns={"Batch": "batch", "Status": "status"}))
+
+def team_size_by_status(companies):
+    return _team_size_stats(companies, ["Status"])
+
+def team_size_by_batch_status(companies):
+    return _team_size_stats(companies, ["Batch", "Status"])
+
+def industry_counts(companies):
+    """Companies per industry tag (a company with several tags counts once for each)"""
+    tags = companies["Industry"].explode().dropna()
+    counts = tags.value_counts()
+    return _records(pd.DataFrame({"industry": counts.index, "companies": counts.to_numpy()}))
+
+def city_counts(companies):
+    counts = companies["Location"].dropna().value_counts()
+    return _records(pd.DataFrame({"city": counts.index, "companies": counts.to_numpy()}))
+
+ROLLUPS = {
+    "batch_sizes": batch_sizes,
+    "status_counts": status_counts,
+    "status_by_batch": status_by_batch,
+    "team_size_by_status": team_size_by_status,
+    "team_size_by_batch_status": team_size_by_batch_status,
+    "industry_counts": industry_counts,
+    "city_counts": city_counts,
+}
+
+def compute_rollups(companies):
+    return {name: rollup(companies) for name, rollup in ROLLUPS.items()}
+
+def write_rollups(directory):
+    """Materialize every rollup for one snapshot into YC_Rollups.json. Returns the file written."""
+    companies = load_snapshot_table(directory, "YC_Companies", columns=ROLLUP_COLUMNS)
+    payload = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "companies": len(companies),
+        "tables": compute_rollups(companies),
+    }
+    path = os.path.join(directory, ROLLUPS_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return path
+
+def read_rollups(directory):
+    """The snapshot's rollups, regenerated first if they are missing or older than its data"""
+    path = os.path.join(directory, ROLLUPS_FILE)
+    sources = [os.path.join(directory, f"YC_Companies.{ext}") for ext in ("csv", "parquet")]
+    newest = max((os.path.getmtime(source) for source in sources if os.path.exists(source)), default=0)
+    if not os.path.exists(path) or os.path.getmtime(path) < newest:
+        write_rollups(directory)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,366 @@
+import asyncio
+import collections
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+# Status codes worth retrying; 429 also means "slow down"
+THROTTLE_STATUSES = {429}
+RETRY_STATUSES = {408, 425, 500, 502, 503, 504}
+# Exception class names (from requests, selenium, litellm, openai, ...) treated the same way
+THROTTLE_ERRORS = ("RateLimit",)
+TRANSIENT_ERRORS = ("Timeout", "ConnectionError", "APIConnectionError", "ServiceUnavailable", "InternalServerError")
+
+# Per-lane defaults; a lane is a host ("www.ycombinator.com") or an LLM provider ("llm:openai")
+DEFAULT_LANE = {"rate": 4.0, "burst": None, "tokens_per_minute": None,
+                "max_concurrency": 8, "max_retries": 5, "backoff_base": 0.5, "backoff_cap": 60.0}
+
+class RetryableError(Exception):
+    """A response that should be retried, e.g. an HTTP 429 or 503 that didn't raise by itself"""
+
+    def __init__(self, message, throttled=False, retry_after=None):
+        super().__init__(message)
+        self.throttled = throttled
+        self.retry_after = retry_after
+
+def _retry_after(headers):
+    """Seconds from a Retry-After header, when it holds a number"""
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return max(0.0, float(value)) if value is not None else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+def check_status(response):
+    """
+    Raise RetryableError for a throttled or failing response (anything with a `status_code`, such
+    as a requests response or a crawl4ai result). Use as the `check` of Lane.call / Lane.acall.
+    """
+    status = getattr(response, "status_code", None)
+    if status in THROTTLE_STATUSES or status in RETRY_STATUSES:
+        headers = getattr(response, "headers", None) or getattr(response, "response_headers", None)
+        raise RetryableError(f"HTTP {status}", throttled=status in THROTTLE_STATUSES,
+                             retry_after=_retry_after(headers))
+
+def classify(exc):
+    """
+    ("throttled" | "transient" | None, retry_after) for an exception. Follows wrapped causes, so a
+    rate limit error re-raised by instructor or tenacity is still recognised.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, RetryableError):
+            return ("throttled" if exc.throttled else "transient"), exc.retry_after
+        response = getattr(exc, "response", None)
+        status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+        retry_after = _retry_after(getattr(response, "headers", None))
+        name = type(exc).__name__
+        if status in THROTTLE_STATUSES or any(part in name for part in THROTTLE_ERRORS):
+            return "throttled", retry_after
+        if status in RETRY_STATUSES or isinstance(exc, (TimeoutError, ConnectionError)) \
+                or any(part in name for part in TRANSIENT_ERRORS):
+            return "transient", retry_after
+        wrapped = exc.args[0] if exc.args and isinstance(exc.args[0], BaseException) else None
+        exc = exc.__cause__ or wrapped or exc.__context__
+    return None, None
+
+def backoff_delay(attempt, base=0.5, cap=60.0, retry_after=None):
+    """Exponential backoff with full jitter, never shorter than the server's Retry-After"""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    return max(delay, retry_after or 0)
+
+class TokenBucket:
+    """
+    Requests per second with bursts of up to `burst`. Callers reserve tokens up front and sleep
+    off any deficit, so waiting callers are served in order. The rate drops when the endpoint
+    throttles us and climbs back towards `rate` as calls succeed.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.max_rate = float(rate)
+        self.min_rate = self.max_rate / 16
+        self.rate = self.max_rate
+        self.burst = float(burst or max(1.0, self.max_rate))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, cost):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= cost
+            return max(0.0, -self.tokens / self.rate, self.paused_until - now)
+
+    def acquire(self, cost=1):
+        wait = self._reserve(cost)
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self, cost=1):
+        wait = self._reserve(cost)
+        if wait:
+            await asyncio.sleep(wait)
+
+    def throttle(self, pause=None):
+        """Halve the rate, and stop handing out tokens for `pause` seconds (a Retry-After)"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            if pause:
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+
+    def recover(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+class _Waiter:
+    __slots__ = ("wake", "granted")
+
+    def __init__(self, wake):
+        self.wake = wake
+        self.granted = False
+
+class AdaptiveConcurrency:
+    """
+    An in-flight limit that adapts to the endpoint (additive increase, multiplicative decrease).
+
+    The limit grows by about one per round of successful calls while their latency stays close to
+    the best seen, shrinks a little when latency climbs, and halves on throttling or when the error
+    rate passes `max_error_rate`. Both threads (acquire) and coroutines (aacquire) can wait on it.
+    """
+
+    def __init__(self, max_limit, initial=None, min_limit=1, latency_tolerance=2.0,
+                 max_error_rate=0.2, cooldown=1.0):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = min(min_limit, self.max_limit)
+        self.limit = float(initial or max(self.min_limit, self.max_limit // 2))
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.latency = None
+        self.baseline = None
+        self.error_rate = 0.0
+        self._decreased_at = 0.0
+        self._waiters = collections.deque()
+        self._lock = threading.Lock()
+
+    def _capacity(self):
+        return max(self.min_limit, int(self.limit))
+
+    def _wake_locked(self):
+        while self._waiters and self.in_flight < self._capacity():
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+            self.in_flight += 1
+            waiter.wake()
+
+    def acquire(self):
+        with self._lock:
+            if not self._waiters and self.in_flight < self._capacity():
+                self.in_flight += 1
+                return
+            event = threading.Event()
+            self._waiters.append(_Waiter(event.set))
+        event.wait()
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        with self._lock:
+            if not self._waiters and self.in_flight < self._capacity():
+                self.in_flight += 1
+                return
+            waiter = _Waiter(wake)
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    self.in_flight -= 1
+                    self._wake_locked()
+                else:
+                    self._waiters.remove(waiter)
+            raise
+
+    def _decrease_locked(self, factor):
+        now = time.monotonic()
+        # One decrease per cooldown, so a burst of failures from the same moment counts once
+        if now - self._decreased_at >= self.cooldown:
+            self.limit = max(self.min_limit, self.limit * factor)
+            self._decreased_at = now
+
+    def release(self, latency, outcome="ok"):
+        """Free a slot and feed back how the call went: "ok", "transient", "throttled" or None (no feedback)."""
+        with self._lock:
+            self.in_flight -= 1
+            if outcome is None:
+                pass
+            elif outcome == "ok":
+                self.error_rate *= 0.95
+                self.latency = latency if self.latency is None else 0.9 * self.latency + 0.1 * latency
+                if self.baseline is None or self.latency < self.baseline:
+                    self.baseline = self.latency
+                else:
+                    # Let the baseline drift up slowly if the endpoint got slower for good
+                    self.baseline += (self.latency - self.baseline) * 0.01
+                if self.latency > self.baseline * self.latency_tolerance:
+                    self._decrease_locked(0.9)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            else:
+                self.error_rate = 0.95 * self.error_rate + 0.05
+                if outcome == "throttled" or self.error_rate > self.max_error_rate:
+                    self._decrease_locked(0.5)
+            self._wake_locked()
+
+class Lane:
+    """
+    Everything calls to one host or LLM provider go through: a token bucket for requests per
+    second (plus one for tokens per minute on LLM lanes), an adaptive concurrency limit, and
+    retries with exponential backoff and jitter for throttling and transient errors.
+    """
+
+    def __init__(self, name, rate=None, burst=None, tokens_per_minute=None, max_concurrency=8,
+                 max_retries=5, backoff_base=0.5, backoff_cap=60.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.token_bucket = TokenBucket(tokens_per_minute / 60, tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._lock = threading.Lock()
+        self.counts = collections.Counter()
+
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def _failed(self, exc, attempt, started):
+        """Feed a failure back into the limits; returns the delay before retrying, or None to give up"""
+        kind, retry_after = classify(exc)
+        self.concurrency.release(time.monotonic() - started, kind or "ok")
+        if kind == "throttled":
+            self._count("throttled")
+            for bucket in (self.bucket, self.token_bucket):
+                if bucket is not None:
+                    bucket.throttle(retry_after)
+        if kind is None or attempt >= self.max_retries:
+            self._count("failed")
+            return None
+        self._count("retries")
+        return backoff_delay(attempt, self.backoff_base, self.backoff_cap, retry_after)
+
+    def _succeeded(self, started):
+        self.concurrency.release(time.monotonic() - started, "ok")
+        self._count("ok")
+        for bucket in (self.bucket, self.token_bucket):
+            if bucket is not None:
+                bucket.recover()
+
+    def call(self, fn, *args, check=None, tokens=0, **kwargs):
+        """fn(*args, **kwargs) within the lane's limits. `check` may raise RetryableError for a bad result."""
+        attempt = 0
+        while True:
+            self.concurrency.acquire()
+            if self.bucket is not None:
+                self.bucket.acquire()
+            if self.token_bucket is not None and tokens:
+                self.token_bucket.acquire(tokens)
+            started = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+                if check is not None:
+                    check(result)
+            except Exception as e:
+                delay = self._failed(e, attempt, started)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self._succeeded(started)
+            return result
+
+    async def acall(self, fn, *args, check=None, tokens=0, **kwargs):
+        """Async version of call() for coroutine functions"""
+        attempt = 0
+        while True:
+            await self.concurrency.aacquire()
+            started = time.monotonic()
+            try:
+                if self.bucket is not None:
+                    await self.bucket.aacquire()
+                if self.token_bucket is not None and tokens:
+                    await self.token_bucket.aacquire(tokens)
+                started = time.monotonic()
+                result = await fn(*args, **kwargs)
+                if check is not None:
+                    check(result)
+            except asyncio.CancelledError:
+                self.concurrency.release(time.monotonic() - started, None)
+                raise
+            except Exception as e:
+                delay = self._failed(e, attempt, started)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self._succeeded(started)
+            return result
+
+    def stats(self):
+        stats = dict(self.counts)
+        stats["concurrency"] = round(self.concurrency.limit, 1)
+        if self.bucket is not None:
+            stats["rate"] = round(self.bucket.rate, 2)
+        if self.concurrency.latency is not None:
+            stats["latency_ms"] = round(self.concurrency.latency * 1000)
+        return stats
+
+def llm_provider(model):
+    """Provider of a litellm model name: "openai/gpt-4o-mini" -> "openai" """
+    return model.split("/", 1)[0] if "/" in model else "openai"
+
+class Scheduler:
+    """
+    Hands out one shared Lane per host or LLM provider, so every worker calling the same endpoint
+    shares its rate limit and concurrency. `limits` overrides DEFAULT_LANE per lane name.
+    """
+
+    def __init__(self, limits=None, **defaults):
+        self.defaults = {**DEFAULT_LANE, **defaults}
+        self.limits = limits or {}
+        self._lanes = {}
+        self._lock = threading.Lock()
+
+    def lane(self, name):
+        with self._lock:
+            if name not in self._lanes:
+                self._lanes[name] = Lane(name, **{**self.defaults, **self.limits.get(name, {})})
+            return self._lanes[name]
+
+    def for_url(self, url):
+        return self.lane(urlparse(url).netloc)
+
+    def for_model(self, model):
+        return self.lane(f"llm:{llm_provider(model)}")
+
+    def stats(self):
+        with self._lock:
+            lanes = dict(self._lanes)
+        return {name: lane.stats() for name, lane in lanes.items()}
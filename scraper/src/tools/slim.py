@@ -0,0 +1,123 @@
+import re
+
+from .extract import estimate_tokens
+from .metrics import METRICS
+from .parse import HEADING_RE, LINK_RE, BATCH_LINK_RE, INDUSTRY_LINK_RE, LINKEDIN_RE, TWITTER_RE, STATUSES, _plain
+
+# Tokens per page sent to the LLM after slimming
+PAGE_TOKEN_BUDGET = 1500
+
+# Page sections the YC_Company schema never uses ("Jobs at Airbnb" included); dropped with everything nested under them
+DROP_SECTIONS = ("jobs", "open jobs", "latest news", "news", "company launches", "launches",
+                 "founder videos", "videos", "more companies", "similar companies", "related companies")
+IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+FIELD_RE = re.compile(r"^\W*(team size|location|founded|status|batch|group partner)\s*:", re.IGNORECASE)
+# Links whose URL carries information the extraction needs; all other links are reduced to their text
+KEEP_LINK_RES = (BATCH_LINK_RE, INDUSTRY_LINK_RE, LINKEDIN_RE, TWITTER_RE)
+
+# Priority of a line when filling the budget: facts first, then the founders, then page text
+FACT, FOUNDERS, HEADER, BODY = range(4)
+
+def compact_line(line):
+    """A line without images, and with links reduced to their text unless the URL is needed"""
+    line = IMAGE_RE.sub("", line)
+    line = LINK_RE.sub(lambda m: m.group(0) if any(r.search(m.group(0)) for r in KEEP_LINK_RES) else m.group(1), line)
+    line = re.sub(r"\s+", " ", line).strip()
+    return line if re.search(r"\w", line) else ""
+
+def is_fact(line):
+    """Lines holding a schema field: batch or industry tags, a status pill, labelled fields, social links"""
+    if any(r.search(line) for r in KEEP_LINK_RES) or FIELD_RE.match(_plain(line)):
+        return True
+    return re.sub(r"[^A-Za-z]", "", _plain(line)) in STATUSES
+
+def prioritized_lines(markdown):
+    """
+    (index, priority, line) for the lines worth sending, in page order. Navigation before the
+    company name keeps only its facts; dropped sections are skipped entirely.
+    """
+    lines = []
+    seen = set()
+    started = False
+    section = None        # HEADER / FOUNDERS / BODY for the current section
+    founders_level = None
+    drop_level = None     # heading level of a section being dropped
+    value_pending = False # a "Label:" line whose value is on the next line
+    for index, raw in enumerate(markdown.splitlines()):
+        heading = HEADING_RE.match(raw.strip())
+        if heading:
+            level = len(heading.group(1))
+            title = _plain(heading.group(2)).lower().rstrip(":")
+            if drop_level is not None and level > drop_level:
+                continue
+            drop_level = None
+            if started and any(title == drop or title.startswith(f"{drop} ") for drop in DROP_SECTIONS):
+                drop_level = level
+                continue
+            if level == 1 and not started:
+                started = True
+                section = HEADER
+                lines.append((index, FACT, compact_line(raw)))
+                continue
+            if started:
+                # Founder names are usually headings nested under the founders heading
+                if "founder" in title:
+                    section, founders_level = FOUNDERS, level
+                elif not (section == FOUNDERS and level > founders_level):
+                    section = BODY
+        elif drop_level is not None:
+            continue
+        line = compact_line(raw)
+        if not line or line in seen:
+            continue
+        seen.add(line)
+        # Founder names (headings in the founders block) are kept along with their links
+        if is_fact(line) or value_pending or (heading and section == FOUNDERS):
+            value_pending = bool(FIELD_RE.match(_plain(line))) and _plain(line).endswith(":")
+            lines.append((index, FACT, line))
+        elif started:
+            lines.append((index, section, line))
+    return lines
+
+def slim_markdown(markdown, token_budget=PAGE_TOKEN_BUDGET):
+    """
+    Trim a company page to what the YC_Company schema uses (name, tags, status, fields, founders
+    and their social links) within `token_budget` estimated tokens. Facts are kept first, then the
+    founders block, the header text and the rest of the page while the budget lasts. The kept
+    lines stay in page order.
+    """
+    lines = prioritized_lines(markdown)
+    kept = []
+    remaining = token_budget
+    for index, priority, line in sorted(lines, key=lambda item: (item[1], item[0])):
+        tokens = estimate_tokens(line)
+        if tokens <= remaining:
+            kept.append((index, line))
+            remaining -= tokens
+    return "\n".join(line for _, line in sorted(kept))
+
+class PageSlimmer:
+    """Slims pages before they go to the LLM, logging and totalling tokens before and after"""
+
+    def __init__(self, token_budget=PAGE_TOKEN_BUDGET, log=print):
+        self.token_budget = token_budget
+        self.log = log
+        self.pages = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+
+    def slim(self, company_url, markdown):
+        with METRICS.timer("slim"):
+            slimmed = slim_markdown(markdown, self.token_budget)
+        before, after = estimate_tokens(markdown), estimate_tokens(slimmed)
+        self.pages += 1
+        self.tokens_in += before
+        self.tokens_out += after
+        if self.log is not None:
+            self.log(f"Slimmed {company_url}: {before} -> {after} tokens", flush=True)
+        return slimmed
+
+    def stats(self) -> str:
+        saved = (1 - self.tokens_out / self.tokens_in) * 100 if self.tokens_in else 0.0
+        return (f"Page slimming: {self.pages} pages, {self.tokens_in} -> {self.tokens_out} "
+                f"estimated input tokens ({saved:.1f}% fewer)")
@@ -0,0 +1,87 @@
+import os
+from pathlib import Path
+import pandas as pd
+
+SNAPSHOT_TABLES = ("YC_Companies", "YC_Founders")
+CATEGORY_COLUMNS = ["Batch", "Status"]
+INTEGER_COLUMNS = ["Team Size"]
+LIST_COLUMNS = ["Industry"]
+# Each list column also keeps its CSV text in "<column> Text", so readers that serve the string
+# (the API) give the same bytes from Parquet as from CSV, whatever separator a row was written with.
+TEXT_SUFFIX = " Text"
+
+def split_tags(value):
+    """'saas, b2b' -> ['saas', 'b2b']. Missing values stay missing."""
+    if not isinstance(value, str):
+        return None
+    return [tag.strip() for tag in value.split(",") if tag.strip()]
+
+def join_tags(value):
+    """Inverse of split_tags, for writers and readers that expect the CSV string form."""
+    if value is None or (not isinstance(value, str) and not hasattr(value, "__len__")):
+        return None
+    return value if isinstance(value, str) else ", ".join(value)
+
+def type_snapshot_frame(df):
+    """Apply the snapshot schema: categorical Batch/Status, integer Team Size, list-typed Industry (and its text)."""
+    df = df.copy()
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].str.strip().astype("category")
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("Int64")
+    for column in LIST_COLUMNS:
+        if column in df.columns:
+            df[f"{column}{TEXT_SUFFIX}"] = df[column].astype("string")
+            df[column] = df[column].map(split_tags)
+    return df
+
+def read_snapshot_csv(path, columns=None):
+    # dtype=str keeps every column as written; "None" and empty cells become missing values.
+    return type_snapshot_frame(pd.read_csv(path, dtype=str, usecols=columns))
+
+def parquet_is_current(csv_path, parquet_path):
+    """A Parquet copy is used when it exists and is not older than its CSV."""
+    if not os.path.exists(parquet_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
+
+def load_snapshot_table(directory, table, columns=None):
+    """
+    Load YC_Companies or YC_Founders from a snapshot directory with the snapshot schema.
+
+    Prefers `<table>.parquet` and reads only `columns` from it; falls back to `<table>.csv`.
+    """
+    csv_path = os.path.join(directory, f"{table}.csv")
+    parquet_path = os.path.join(directory, f"{table}.parquet")
+    if parquet_is_current(csv_path, parquet_path):
+        return pd.read_parquet(parquet_path, columns=columns)
+    return read_snapshot_csv(csv_path, columns=columns)
+
+def write_snapshot_parquet(df, path):
+    """Write a typed snapshot frame to a temp file and rename it, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path, index=False, compression="zstd")
+    os.replace(tmp_path, path)
+
+def convert_snapshot(directory):
+    """Write a Parquet copy of each snapshot CSV in `directory`. Returns the files written."""
+    written = []
+    for table in SNAPSHOT_TABLES:
+        csv_path = os.path.join(directory, f"{table}.csv")
+        if not os.path.exists(csv_path):
+            continue
+        parquet_path = os.path.join(directory, f"{table}.parquet")
+        write_snapshot_parquet(read_snapshot_csv(csv_path), parquet_path)
+        written.append(parquet_path)
+    return written
+
+def snapshot_directories(data_dir):
+    """Dated snapshot directories (YYYY-MM-DD) under data_dir, oldest first."""
+    return sorted(
+        str(path) for path in Path(data_dir).iterdir()
+        if path.is_dir() and len(path.name) == 10 and path.name[:4].isdigit()
+    )
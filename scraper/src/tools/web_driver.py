@@ -1,6 +1,10 @@
 from selenium import webdriver
+from contextlib import contextmanager
+import threading
 import time
 
+from .metrics import METRICS
+
 def setup_driver():
     '''
     Set up and return a configured WebDriver instance.
@@ -14,6 +18,7 @@ def setup_driver():
     driver = webdriver.Chrome(options=chrome_options)
     return driver
 
+@METRICS.timed("scroll")
 def scroll_to_bottom(driver, pause_before=0.4, pause_after=0.2):
     """Scroll to the bottom of the page with a pause, returning when fully loaded."""
     last_height = driver.execute_script("return document.body.scrollHeight")
@@ -25,4 +30,118 @@ def scroll_to_bottom(driver, pause_before=0.4, pause_after=0.2):
         new_height = driver.execute_script("return document.body.scrollHeight")
         if new_height == last_height:
             break
-        last_height = new_height
\ No newline at end of file
+        last_height = new_height
+
+def reset_driver(driver):
+    """Clear cookies and storage left by the previous job and park the driver on a blank page."""
+    driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    driver.delete_all_cookies()
+    driver.get("about:blank")
+
+class DriverPool:
+    '''
+    Keeps up to `size` warm WebDriver instances and hands them out to jobs.
+
+    Drivers are reset between uses, and quit and replaced after an error or after `max_uses` jobs.
+    '''
+
+    def __init__(self, size, max_uses=10, factory=setup_driver):
+        self.size = size
+        self.max_uses = max_uses
+        self.factory = factory
+        self._idle = []
+        self._lock = threading.Lock()
+        # Notified whenever a driver is returned or retired, so waiters re-check for room
+        self._available = threading.Condition(self._lock)
+        self._uses = {}
+        self._broken = set()
+        self._live = 0
+        self.created = 0
+        self.leases = 0
+        self.recycled = 0
+        self.errors = 0
+
+    def _acquire(self):
+        """An idle driver, or a new one while fewer than `size` are live; otherwise wait for either"""
+        with self._available:
+            while not self._idle and self._live >= self.size:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._live += 1
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._available:
+                self._live -= 1
+                self._available.notify()
+            raise
+        with self._lock:
+            self.created += 1
+            self._uses[id(driver)] = 0
+        return driver
+
+    def _retire(self, driver):
+        with self._available:
+            self._live -= 1
+            self._uses.pop(id(driver), None)
+            self._broken.discard(id(driver))
+            self.recycled += 1
+            self._available.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _release(self, driver):
+        with self._lock:
+            self._uses[id(driver)] += 1
+            retire = id(driver) in self._broken or self._uses[id(driver)] >= self.max_uses
+        if not retire:
+            try:
+                reset_driver(driver)
+            except Exception:
+                retire = True
+        if retire:
+            self._retire(driver)
+        else:
+            with self._available:
+                self._idle.append(driver)
+                self._available.notify()
+
+    def mark_broken(self, driver):
+        """Recycle this driver instead of returning it to the pool."""
+        with self._lock:
+            self._broken.add(id(driver))
+            self.errors += 1
+
+    @contextmanager
+    def driver(self):
+        driver = self._acquire()
+        with self._lock:
+            self.leases += 1
+        try:
+            yield driver
+        except Exception:
+            self.mark_broken(driver)
+            raise
+        finally:
+            self._release(driver)
+
+    def close(self):
+        with self._lock:
+            drivers, self._idle = self._idle, []
+        for driver in drivers:
+            self._retire(driver)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "live": self._live,
+                "idle": len(self._idle),
+                "created": self.created,
+                "leases": self.leases,
+                "recycled": self.recycled,
+                "errors": self.errors,
+            }
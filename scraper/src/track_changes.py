@@ -0,0 +1,18 @@
+import argparse
+
+from tools.changes import update_change_log
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff consecutive snapshots into the change log.")
+    parser.add_argument('--data-dir', type=str, default='../data', help="Directory holding the dated snapshots")
+    parser.add_argument('--rebuild', action='store_true', help="Re-diff every pair of snapshots, not just new or changed ones")
+    args = parser.parse_args(argv)
+
+    written = update_change_log(args.data_dir, rebuild=args.rebuild)
+    for path in written:
+        print(f"Changes saved to {path}", flush=True)
+    if not written:
+        print("Change log is up to date", flush=True)
+
+if __name__ == "__main__":
+    main()
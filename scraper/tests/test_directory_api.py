@@ -0,0 +1,91 @@
+"""
+Runs the directory client against saved responses (tests/fixtures/directory), so the HTTP
+backend of get_yc_urls.py is checked without the network.
+
+The fixtures are synthetic, not recorded from ycombinator.com: they were written through
+RecordingSession from a stand-in session that answers in the format the client expects (the
+directory page's Algolia settings, then search results), with slugs from the 2025-03-20 snapshot
+and "fixture-search-key" as the key. They check the client's paging, slug handling and batch
+label fallback, but not that the live directory still answers in that format.
+
+To replace them with real responses, run get_yc_urls.py --backend http --record-fixtures <dir>
+for S05, W06 and X99 and copy the files here, replacing the search key in the directory page
+with "fixture-search-key".
+"""
+from pathlib import Path
+
+import pytest
+
+from tools.directory_api import (
+    DIRECTORY_URL, DirectoryClient, FixtureSession, RecordingSession, batch_facet_values, fixture_name,
+)
+from tools.scheduler import Scheduler
+
+FIXTURES = Path(__file__).parent / "fixtures" / "directory"
+COMPANY = "https://www.ycombinator.com/companies/"
+
+class CountingSession:
+    def __init__(self, session):
+        self.session = session
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append(("GET", url))
+        return self.session.get(url, **kwargs)
+
+    def post(self, url, data=None, **kwargs):
+        self.calls.append(("POST", url))
+        return self.session.post(url, data=data, **kwargs)
+
+def test_batch_facet_values():
+    assert batch_facet_values("W06") == ["W06", "Winter 2006"]
+    assert batch_facet_values("S21") == ["S21", "Summer 2021"]
+    assert batch_facet_values("Unspecified") == ["Unspecified"]
+
+def test_batch_urls_follow_result_pages():
+    client = DirectoryClient(FixtureSession(FIXTURES))
+    urls = client.get_batch_urls("S05")
+    # Two result pages; the hit without a slug is skipped
+    assert urls == [COMPANY + slug for slug in
+                    ["reddit", "kiko", "clickfacts", "textpayme", "loopt", "infogami", "memamp", "simmery"]]
+
+def test_batch_urls_fall_back_to_season_label():
+    session = CountingSession(FixtureSession(FIXTURES))
+    urls = DirectoryClient(session).get_batch_urls("W06")
+    assert urls == [COMPANY + slug for slug in
+                    ["wufoo", "project-wedding", "clustrix", "inkling", "audiobeta", "flagr", "snipshot"]]
+    # "W06" has no hits, then "Winter 2006" does
+    assert [method for method, _ in session.calls] == ["GET", "POST", "POST"]
+
+def test_unknown_batch_has_no_urls():
+    assert DirectoryClient(FixtureSession(FIXTURES)).get_batch_urls("X99") == []
+
+def test_credentials_fetched_once():
+    session = CountingSession(FixtureSession(FIXTURES))
+    client = DirectoryClient(session)
+    client.get_batch_urls("S05")
+    client.get_batch_urls("W06")
+    assert session.calls.count(("GET", DIRECTORY_URL)) == 1
+    assert client.credentials() == ("45BWZJ1SGC", "fixture-search-key")
+
+def test_replay_through_scheduler():
+    scheduler = Scheduler(rate=100, max_concurrency=2)
+    client = DirectoryClient(FixtureSession(FIXTURES), scheduler=scheduler)
+    assert len(client.get_batch_urls("S05")) == 8
+    assert scheduler.stats()
+
+def test_missing_fixture_raises(tmp_path):
+    client = DirectoryClient(FixtureSession(tmp_path))
+    with pytest.raises(FileNotFoundError, match="No recorded fixture"):
+        client.get_batch_urls("S05")
+
+def test_recorded_fixtures_replay(tmp_path):
+    recorded = DirectoryClient(RecordingSession(FixtureSession(FIXTURES), tmp_path)).get_batch_urls("W06")
+    # The directory page and both searches, saved under the names FixtureSession looks up
+    names = {path.name for path in tmp_path.iterdir()}
+    assert len(names) == 3 and names <= {path.name for path in FIXTURES.iterdir()}
+    assert DirectoryClient(FixtureSession(tmp_path)).get_batch_urls("W06") == recorded
+
+def test_fixture_names_depend_on_request():
+    assert fixture_name("GET", DIRECTORY_URL) != fixture_name("POST", DIRECTORY_URL)
+    assert fixture_name("POST", DIRECTORY_URL, "a") != fixture_name("POST", DIRECTORY_URL, "b")
@@ -0,0 +1,45 @@
+"""
+Checks how tools.founders merges founder rows across snapshots into identities.
+"""
+import pandas as pd
+
+from tools.founders import linkedin_key, resolve_founders, twitter_key
+
+def appearances(*rows):
+    return pd.DataFrame(rows, columns=["Date", "Company", "Founder's First Name", "Founder's Last Name",
+                                       "Founder's LinkedIn", "Founder's Twitter"])
+
+def test_same_name_at_different_companies_stays_apart():
+    ids = resolve_founders(appearances(
+        ("2025-02-01", "acme", "John", "Smith", None, None),
+        ("2025-02-01", "globex", "John", "Smith", None, None),
+        ("2025-03-10", "acme", "John", "Smith", None, None),
+    ))
+    assert ids[0] == ids[2] and ids[0] != ids[1]
+
+def test_name_only_row_is_not_merged_with_a_profile_elsewhere():
+    ids = resolve_founders(appearances(
+        ("2025-02-01", "acme", "John", "Smith", "https://linkedin.com/in/jsmith", None),
+        ("2025-02-01", "globex", "John", "Smith", None, None),
+    ))
+    assert ids[0] != ids[1]
+
+def test_shared_profile_links_companies():
+    ids = resolve_founders(appearances(
+        ("2025-02-01", "acme", "John", "Smith", "https://www.linkedin.com/in/JSmith/", None),
+        ("2025-03-10", "globex", "Jon", "Smith", "https://uk.linkedin.com/in/jsmith?trk=x", None),
+    ))
+    assert ids == ["jsmith", "jsmith"]
+
+def test_respelling_at_same_company_is_one_founder():
+    ids = resolve_founders(appearances(
+        ("2025-02-01", "acme", "Jonathon", "Smith", None, None),
+        ("2025-03-10", "acme", "Jonathan", "Smith", None, None),
+    ))
+    assert ids[0] == ids[1]
+
+def test_profile_keys():
+    assert linkedin_key("linkedin.com/company/acme") is None
+    assert linkedin_key("https://www.linkedin.com/in/Tom-B/") == "in/tom-b"
+    assert twitter_key("https://x.com/@Handle") == "handle"
+    assert twitter_key("https://twitter.com/intent/follow") is None
@@ -0,0 +1,122 @@
+"""
+Checks the rule-based fast path (tools.parse) on company pages written the way crawl4ai renders
+them, including the cases where it has to hand the page to the LLM by returning None.
+"""
+from tools.parse import FastPathExtractor, industry_label, normalize_batch, parse_company_details
+
+PAGE = """\
+[Companies](https://www.ycombinator.com/companies)
+
+# Airbnb
+
+Book accommodations around the world.
+
+[W09](https://www.ycombinator.com/companies?batch=W09) [Public](https://www.ycombinator.com/companies?status=Public) [Consumer](https://www.ycombinator.com/companies/industry/consumer) [](https://www.ycombinator.com/companies/industry/b2b)
+
+Founded: 2008
+
+Team Size: 6,132
+
+Location: San Francisco, CA
+
+## Active Founders
+
+### Brian Chesky, Founder/CEO
+
+[](https://www.linkedin.com/in/brianchesky/ "LinkedIn profile") [](https://twitter.com/bchesky "Twitter account")
+
+### Nathan Blecharczyk
+
+[](https://linkedin.com/in/blecharczyk)
+
+### Former Founders
+
+**Joe Gebbia**
+
+[](https://x.com/jgebbia)
+
+## Latest News
+
+### Airbnb Reports Results
+
+[Read more](https://news.airbnb.com/results)
+"""
+
+def test_parses_company_fields():
+    company = parse_company_details(PAGE)
+    assert company["name"] == "Airbnb"
+    assert company["batch"] == "W09"
+    assert company["status"] == "Public"
+    assert company["team_size"] == 6132
+    assert company["city"] == "San Francisco"
+
+def test_industry_keeps_link_text_and_labels_empty_links():
+    assert parse_company_details(PAGE)["industry"] == "Consumer, B2B"
+
+def test_founders_and_links():
+    founders = parse_company_details(PAGE)["founders"]
+    assert [(f["first_name"], f["last_name"]) for f in founders] == [
+        ("Brian", "Chesky"), ("Nathan", "Blecharczyk"), ("Joe", "Gebbia")]
+    assert str(founders[0]["founder_linkedin_url"]) == "https://www.linkedin.com/in/brianchesky/"
+    assert str(founders[0]["founder_twitter_url"]) == "https://twitter.com/bchesky"
+    assert str(founders[1]["founder_linkedin_url"]) == "https://linkedin.com/in/blecharczyk"
+    assert founders[2]["founder_linkedin_url"] is None
+    assert str(founders[2]["founder_twitter_url"]) == "https://x.com/jgebbia"
+
+def test_section_headings_are_not_founders():
+    names = {f["last_name"] for f in parse_company_details(PAGE)["founders"]}
+    assert "Founders" not in names
+    markdown = PAGE.replace("### Brian Chesky, Founder/CEO", "### Team")
+    assert [f["first_name"] for f in parse_company_details(markdown)["founders"]] == ["Nathan", "Joe"]
+
+def test_batch_labels_are_normalized():
+    markdown = PAGE.replace("batch=W09", "batch=Winter%202009")
+    assert parse_company_details(markdown)["batch"] == "W09"
+    assert normalize_batch("Summer 2021") == "S21"
+    assert normalize_batch("fall 24") == "F24"
+    assert normalize_batch("x25") == "X25"
+    assert normalize_batch("unspecified") == "Unspecified"
+    assert normalize_batch("Batch 9") is None
+
+def test_industry_label():
+    assert industry_label("developer-tools") == "Developer Tools"
+    assert industry_label("b2b") == "B2B"
+    assert industry_label("crypto-web3") == "Crypto / Web3"
+    assert industry_label("Real%20Estate") == "Real Estate"
+
+def test_optional_fields_may_be_missing():
+    markdown = PAGE.replace("Team Size: 6,132", "").replace("Location: San Francisco, CA", "")
+    markdown = markdown.replace("[Consumer](https://www.ycombinator.com/companies/industry/consumer) ", "")
+    markdown = markdown.replace(" [](https://www.ycombinator.com/companies/industry/b2b)", "")
+    company = parse_company_details(markdown)
+    assert (company["team_size"], company["city"], company["industry"]) == (None, None, None)
+
+def test_team_size_on_next_line():
+    markdown = PAGE.replace("Team Size: 6,132", "Team Size:\n\n12")
+    assert parse_company_details(markdown)["team_size"] == 12
+
+def test_falls_back_without_founders_block():
+    markdown = PAGE.split("## Active Founders")[0] + "## Latest News\n"
+    assert parse_company_details(markdown) is None
+
+def test_falls_back_without_named_founders():
+    markdown = PAGE.split("## Active Founders")[0] + "## Active Founders\n\n### Former Founders\n"
+    assert parse_company_details(markdown) is None
+
+def test_falls_back_on_non_numeric_team_size():
+    assert parse_company_details(PAGE.replace("Team Size: 6,132", "Team Size: about 10")) is None
+
+def test_falls_back_without_batch():
+    assert parse_company_details(PAGE.replace("[W09](https://www.ycombinator.com/companies?batch=W09) ", "")) is None
+    assert parse_company_details(PAGE.replace("batch=W09", "batch=Batch%209")) is None
+
+def test_falls_back_without_name_or_status():
+    assert parse_company_details(PAGE.replace("# Airbnb", "Airbnb")) is None
+    assert parse_company_details(PAGE.replace("[Public]", "[Listed]")) is None
+
+def test_fast_path_extractor_counts():
+    extractor = FastPathExtractor()
+    extractor.extract(PAGE)
+    extractor.extract("# Nothing here")
+    assert (extractor.hits, extractor.fallbacks) == (1, 1)
+    assert "50.0% hit rate" in extractor.stats()